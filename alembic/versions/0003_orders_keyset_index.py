@@ -0,0 +1,25 @@
+"""orders keyset index
+
+Revision ID: 0003_orders_keyset_index
+Revises: 0002_rate_limit_counters
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_orders_keyset_index"
+down_revision: Union[str, Sequence[str], None] = "0002_rate_limit_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_orders_usuario_id_id", "orders", ["usuario_id", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orders_usuario_id_id", table_name="orders")
@@ -0,0 +1,47 @@
+"""store summary counters
+
+Revision ID: 0004_store_summary
+Revises: 0003_orders_keyset_index
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_store_summary"
+down_revision: Union[str, Sequence[str], None] = "0003_orders_keyset_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "store_summary",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("usuarios", sa.Integer(), nullable=False),
+        sa.Column("produtos", sa.Integer(), nullable=False),
+        sa.Column("pedidos", sa.Integer(), nullable=False),
+        sa.Column("faturamento", sa.Float(), nullable=False),
+        sa.Column("saldo_total", sa.Float(), nullable=False),
+        sa.Column("reconciled_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.execute(
+        """
+        INSERT INTO store_summary (id, usuarios, produtos, pedidos, faturamento, saldo_total)
+        SELECT
+            1,
+            (SELECT COUNT(*) FROM users),
+            (SELECT COUNT(*) FROM products),
+            (SELECT COUNT(*) FROM orders),
+            (SELECT COALESCE(SUM(total), 0) FROM orders),
+            (SELECT COALESCE(SUM(saldo), 0) FROM users)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("store_summary")
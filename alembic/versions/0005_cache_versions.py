@@ -0,0 +1,37 @@
+"""cache versions
+
+Revision ID: 0005_cache_versions
+Revises: 0004_store_summary
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_cache_versions"
+down_revision: Union[str, Sequence[str], None] = "0004_store_summary"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    cache_versions = op.create_table(
+        "cache_versions",
+        sa.Column("namespace", sa.String(length=40), primary_key=True, nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+    )
+    op.bulk_insert(
+        cache_versions,
+        [
+            {"namespace": "catalog", "version": 0},
+            {"namespace": "site_config", "version": 0},
+        ],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cache_versions")
@@ -0,0 +1,91 @@
+"""order item snapshot
+
+Revision ID: 0006_order_item_snapshot
+Revises: 0005_cache_versions
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_order_item_snapshot"
+down_revision: Union[str, Sequence[str], None] = "0005_cache_versions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("order_items") as batch_op:
+        batch_op.add_column(sa.Column("nome", sa.String(length=120), nullable=True))
+        batch_op.add_column(sa.Column("preco", sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column("quantidade", sa.Integer(), nullable=False, server_default="1"))
+        batch_op.alter_column("product_id", existing_type=sa.Integer(), nullable=True)
+
+    # One line per (order, product): the first row keeps the unit count, the rest go away.
+    op.execute(
+        """
+        UPDATE order_items
+        SET quantidade = (
+            SELECT COUNT(*) FROM order_items AS same
+            WHERE same.order_id = order_items.order_id AND same.product_id = order_items.product_id
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM order_items
+        WHERE id NOT IN (
+            SELECT keep_id FROM (
+                SELECT MIN(id) AS keep_id FROM order_items GROUP BY order_id, product_id
+            ) AS kept
+        )
+        """
+    )
+
+    # The price paid was never stored, so existing lines are backfilled with the current
+    # catalog price; lines whose product is already gone keep a placeholder.
+    op.execute(
+        """
+        UPDATE order_items
+        SET nome = COALESCE(
+                (SELECT products.nome FROM products WHERE products.id = order_items.product_id),
+                'Produto removido'
+            ),
+            preco = COALESCE(
+                (SELECT products.preco FROM products WHERE products.id = order_items.product_id),
+                0
+            )
+        """
+    )
+    op.execute("UPDATE order_items SET product_id = NULL WHERE product_id NOT IN (SELECT id FROM products)")
+
+    with op.batch_alter_table("order_items") as batch_op:
+        batch_op.alter_column("nome", existing_type=sa.String(length=120), nullable=False)
+        batch_op.alter_column("preco", existing_type=sa.Float(), nullable=False)
+
+
+def downgrade() -> None:
+    # Lines of deleted products cannot point back to a product and are dropped; the
+    # others are expanded back to one row per unit.
+    op.execute("DELETE FROM order_items WHERE product_id IS NULL")
+    bind = op.get_bind()
+    lines = bind.execute(
+        sa.text("SELECT order_id, product_id, nome, preco, quantidade FROM order_items WHERE quantidade > 1")
+    ).all()
+    for order_id, product_id, nome, preco, quantidade in lines:
+        bind.execute(
+            sa.text(
+                "INSERT INTO order_items (order_id, product_id, nome, preco, quantidade) "
+                "VALUES (:order_id, :product_id, :nome, :preco, 1)"
+            ),
+            [{"order_id": order_id, "product_id": product_id, "nome": nome, "preco": preco}] * (quantidade - 1),
+        )
+    with op.batch_alter_table("order_items") as batch_op:
+        batch_op.alter_column("product_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_column("quantidade")
+        batch_op.drop_column("preco")
+        batch_op.drop_column("nome")
@@ -0,0 +1,46 @@
+"""balance ledger
+
+Revision ID: 0008_balance_ledger
+Revises: 0007_idempotency_keys
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_balance_ledger"
+down_revision: Union[str, Sequence[str], None] = "0007_idempotency_keys"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "balance_ledger",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("balance_after", sa.Float(), nullable=False),
+        sa.Column("order_id", sa.Integer(), sa.ForeignKey("orders.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_balance_ledger_user_id_id", "balance_ledger", ["user_id", "id"], unique=False)
+
+    # Past recharges and purchases were never recorded: each user starts the ledger with one
+    # adjustment carrying the current balance.
+    op.execute(
+        """
+        INSERT INTO balance_ledger (user_id, kind, amount, balance_after, created_at)
+        SELECT id, 'adjustment', saldo, saldo, CURRENT_TIMESTAMP FROM users WHERE saldo <> 0
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_balance_ledger_user_id_id", table_name="balance_ledger")
+    op.drop_table("balance_ledger")
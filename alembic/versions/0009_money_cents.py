@@ -0,0 +1,55 @@
+"""money as integer cents
+
+Revision ID: 0009_money_cents
+Revises: 0008_balance_ledger
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_money_cents"
+down_revision: Union[str, Sequence[str], None] = "0008_balance_ledger"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONEY_COLUMNS = {
+    "users": ("saldo",),
+    "products": ("preco",),
+    "orders": ("total",),
+    "order_items": ("preco",),
+    "balance_ledger": ("amount", "balance_after"),
+    "store_summary": ("faturamento", "saldo_total"),
+}
+
+
+def upgrade() -> None:
+    for table, columns in MONEY_COLUMNS.items():
+        op.execute(f"UPDATE {table} SET " + ", ".join(f"{column} = ROUND({column} * 100)" for column in columns))
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.Float(),
+                    type_=sa.BigInteger(),
+                    existing_nullable=False,
+                    postgresql_using=f"{column}::bigint",
+                )
+
+
+def downgrade() -> None:
+    for table, columns in MONEY_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.BigInteger(),
+                    type_=sa.Float(),
+                    existing_nullable=False,
+                    postgresql_using=f"{column}::double precision",
+                )
+        op.execute(f"UPDATE {table} SET " + ", ".join(f"{column} = {column} / 100.0" for column in columns))
@@ -0,0 +1,46 @@
+"""store summary shards
+
+Revision ID: 0010_store_summary_shards
+Revises: 0009_money_cents
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_store_summary_shards"
+down_revision: Union[str, Sequence[str], None] = "0009_money_cents"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SUMMARY_SHARDS = 16
+
+
+def upgrade() -> None:
+    # Row 1 keeps the current totals; the other shards start at zero.
+    for shard in range(2, SUMMARY_SHARDS + 1):
+        op.execute(
+            f"""
+            INSERT INTO store_summary (id, usuarios, produtos, pedidos, faturamento, saldo_total)
+            SELECT {shard}, 0, 0, 0, 0, 0
+            WHERE NOT EXISTS (SELECT 1 FROM store_summary WHERE id = {shard})
+            """
+        )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        UPDATE store_summary SET
+            usuarios = (SELECT SUM(usuarios) FROM store_summary),
+            produtos = (SELECT SUM(produtos) FROM store_summary),
+            pedidos = (SELECT SUM(pedidos) FROM store_summary),
+            faturamento = (SELECT SUM(faturamento) FROM store_summary),
+            saldo_total = (SELECT SUM(saldo_total) FROM store_summary)
+        WHERE id = 1
+        """
+    )
+    op.execute("DELETE FROM store_summary WHERE id <> 1")
@@ -25,8 +25,8 @@
 
         const baseUrl = resolveApiBaseUrl();
 
-        async function request({ endpoint, method = 'GET', body = null, auth = true }) {
-            const headers = {};
+        async function request({ endpoint, method = 'GET', body = null, auth = true, headers: extraHeaders = {} }) {
+            const headers = { ...extraHeaders };
             if (body !== null) {
                 headers['Content-Type'] = 'application/json';
             }
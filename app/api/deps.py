@@ -4,11 +4,12 @@ from fastapi import Depends, Header, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from app.db.models import Account
-from app.db.session import get_db
+from app.db.session import DbSession, get_session, run_db
+from app.services import identity_cache
 from app.services.auth_service import get_account_from_token
 
 
-def extract_token(authorization: str | None = Header(default=None)) -> str:
+async def extract_token(authorization: str | None = Header(default=None)) -> str:
     if not authorization:
         raise HTTPException(status_code=401, detail="Token ausente.")
 
@@ -18,12 +19,7 @@ def extract_token(authorization: str | None = Header(default=None)) -> str:
     return token.strip()
 
 
-def get_current_account(
-    request: Request,
-    db: Session = Depends(get_db),
-    token: str = Depends(extract_token),
-) -> Account:
-    auth_payload = getattr(request.state, "auth_payload", None)
+def _resolve_account(db: Session, auth_payload: dict | None, token: str) -> Account:
     if isinstance(auth_payload, dict):
         subject = auth_payload.get("sub")
         try:
@@ -31,20 +27,29 @@ def get_current_account(
         except (TypeError, ValueError):
             account_id = None
         if account_id:
-            account = db.get(Account, account_id)
+            account = identity_cache.get_account(db, account_id)
             if account:
                 return account
 
     return get_account_from_token(db, token)
 
 
-def get_admin_account(account: Account = Depends(get_current_account)) -> Account:
+async def get_current_account(
+    request: Request,
+    db: DbSession = Depends(get_session),
+    token: str = Depends(extract_token),
+) -> Account:
+    auth_payload = getattr(request.state, "auth_payload", None)
+    return await run_db(db, _resolve_account, auth_payload, token)
+
+
+async def get_admin_account(account: Account = Depends(get_current_account)) -> Account:
     if account.role != "admin":
         raise HTTPException(status_code=403, detail="Acesso restrito a administradores.")
     return account
 
 
-def get_user_account(account: Account = Depends(get_current_account)) -> Account:
+async def get_user_account(account: Account = Depends(get_current_account)) -> Account:
     if account.role != "user":
         raise HTTPException(status_code=403, detail="Acesso restrito a usuarios.")
     if not account.usuario_id:
@@ -1,125 +1,185 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
 
 from app.api.deps import get_admin_account
+from app.core.money import MAX_AMOUNT
+from app.core.responses import FastJSONRoute
 from app.db.models import Account
-from app.db.session import get_db
-from app.schemas.admin import ProdutoCreatePayload, ProdutoUpdatePayload, SiteConfigPayload
-from app.services import admin_service
+from app.db.session import DbSession, get_session, run_db
+from app.schemas.admin import (
+    ProdutoCreatePayload,
+    ProdutoUpdatePayload,
+    ResumoResponse,
+    SiteConfigPayload,
+    SiteConfigResponse,
+)
+from app.schemas.common import Page
+from app.schemas.shop import PedidoResponse, ProdutoResponse, UsuarioResponse
+from app.services import admin_service, export_service
+from app.services.export_service import ExportFormat
 
-router = APIRouter(prefix="/admin", tags=["admin"])
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=FastJSONRoute)
 
 
-@router.get("/resumo")
-def admin_summary(_: Account = Depends(get_admin_account), db: Session = Depends(get_db)):
-    return admin_service.get_summary(db)
+@router.get("/resumo", response_model=ResumoResponse)
+async def admin_summary(_: Account = Depends(get_admin_account), db: DbSession = Depends(get_session)):
+    return await run_db(db, admin_service.get_summary)
 
 
-@router.get("/usuarios")
-def admin_list_users(_: Account = Depends(get_admin_account), db: Session = Depends(get_db)):
-    return admin_service.list_users(db)
+@router.get("/usuarios", response_model=list[UsuarioResponse])
+async def admin_list_users(_: Account = Depends(get_admin_account), db: DbSession = Depends(get_session)):
+    return await run_db(db, admin_service.list_users)
 
 
-@router.get("/usuarios/paginated")
-def admin_list_users_paginated(
+@router.get("/usuarios/export")
+async def admin_export_users(
+    export_format: ExportFormat = Query(default="ndjson", alias="format"),
+    _: Account = Depends(get_admin_account),
+):
+    return export_service.export_users(export_format)
+
+
+@router.get("/usuarios/paginated", response_model=Page[UsuarioResponse])
+async def admin_list_users_paginated(
     page: int = Query(default=1, ge=1),
     size: int = Query(default=10, ge=1, le=100),
     search: str | None = Query(default=None, min_length=1, max_length=80),
+    after: str | None = Query(default=None, min_length=1, max_length=200),
+    before: str | None = Query(default=None, min_length=1, max_length=200),
+    with_total: bool | None = Query(default=None),
     _: Account = Depends(get_admin_account),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    return admin_service.list_users_paginated(db=db, page=page, size=size, search=search)
+    return await run_db(
+        db,
+        admin_service.list_users_paginated,
+        page=page,
+        size=size,
+        search=search,
+        after=after,
+        before=before,
+        with_total=with_total,
+    )
 
 
-@router.get("/produtos")
-def admin_list_products(_: Account = Depends(get_admin_account), db: Session = Depends(get_db)):
-    return admin_service.list_products(db)
+@router.get("/produtos", response_model=list[ProdutoResponse])
+async def admin_list_products(_: Account = Depends(get_admin_account), db: DbSession = Depends(get_session)):
+    return await run_db(db, admin_service.list_products)
 
 
-@router.get("/produtos/paginated")
-def admin_list_products_paginated(
+@router.get("/produtos/export")
+async def admin_export_products(
+    export_format: ExportFormat = Query(default="ndjson", alias="format"),
+    _: Account = Depends(get_admin_account),
+):
+    return export_service.export_products(export_format)
+
+
+@router.get("/produtos/paginated", response_model=Page[ProdutoResponse])
+async def admin_list_products_paginated(
     page: int = Query(default=1, ge=1),
     size: int = Query(default=10, ge=1, le=100),
     search: str | None = Query(default=None, min_length=1, max_length=80),
-    min_preco: float | None = Query(default=None, ge=0),
-    max_preco: float | None = Query(default=None, ge=0),
+    min_preco: float | None = Query(default=None, ge=0, le=MAX_AMOUNT),
+    max_preco: float | None = Query(default=None, ge=0, le=MAX_AMOUNT),
+    after: str | None = Query(default=None, min_length=1, max_length=200),
+    before: str | None = Query(default=None, min_length=1, max_length=200),
+    with_total: bool | None = Query(default=None),
     _: Account = Depends(get_admin_account),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    return admin_service.list_products_paginated(
-        db=db,
+    return await run_db(
+        db,
+        admin_service.list_products_paginated,
         page=page,
         size=size,
         search=search,
         min_preco=min_preco,
         max_preco=max_preco,
+        after=after,
+        before=before,
+        with_total=with_total,
     )
 
 
-@router.post("/produtos")
-def admin_create_product(
+@router.post("/produtos", response_model=ProdutoResponse)
+async def admin_create_product(
     payload: ProdutoCreatePayload,
     _: Account = Depends(get_admin_account),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    return admin_service.create_product(db, payload)
+    return await run_db(db, admin_service.create_product, payload)
 
 
-@router.patch("/produtos/{produto_id}")
-def admin_update_product(
+@router.patch("/produtos/{produto_id}", response_model=ProdutoResponse)
+async def admin_update_product(
     produto_id: int,
     payload: ProdutoUpdatePayload,
     _: Account = Depends(get_admin_account),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    return admin_service.update_product(db, produto_id, payload)
+    return await run_db(db, admin_service.update_product, produto_id, payload)
 
 
-@router.delete("/produtos/{produto_id}")
-def admin_delete_product(
+@router.delete("/produtos/{produto_id}", response_model=ProdutoResponse)
+async def admin_delete_product(
     produto_id: int,
     _: Account = Depends(get_admin_account),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    return admin_service.delete_product(db, produto_id)
+    return await run_db(db, admin_service.delete_product, produto_id)
 
 
-@router.get("/pedidos")
-def admin_list_orders(_: Account = Depends(get_admin_account), db: Session = Depends(get_db)):
-    return admin_service.list_orders(db)
+@router.get("/pedidos", response_model=list[PedidoResponse])
+async def admin_list_orders(_: Account = Depends(get_admin_account), db: DbSession = Depends(get_session)):
+    return await run_db(db, admin_service.list_orders)
+
+
+@router.get("/pedidos/export")
+async def admin_export_orders(
+    export_format: ExportFormat = Query(default="ndjson", alias="format"),
+    _: Account = Depends(get_admin_account),
+):
+    return export_service.export_orders(export_format)
 
 
-@router.get("/pedidos/paginated")
-def admin_list_orders_paginated(
+@router.get("/pedidos/paginated", response_model=Page[PedidoResponse])
+async def admin_list_orders_paginated(
     page: int = Query(default=1, ge=1),
     size: int = Query(default=10, ge=1, le=100),
     usuario_id: int | None = Query(default=None, ge=1),
-    min_total: float | None = Query(default=None, ge=0),
-    max_total: float | None = Query(default=None, ge=0),
+    min_total: float | None = Query(default=None, ge=0, le=MAX_AMOUNT),
+    max_total: float | None = Query(default=None, ge=0, le=MAX_AMOUNT),
+    after: str | None = Query(default=None, min_length=1, max_length=200),
+    before: str | None = Query(default=None, min_length=1, max_length=200),
+    with_total: bool | None = Query(default=None),
     _: Account = Depends(get_admin_account),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    return admin_service.list_orders_paginated(
-        db=db,
+    return await run_db(
+        db,
+        admin_service.list_orders_paginated,
         page=page,
         size=size,
         usuario_id=usuario_id,
         min_total=min_total,
         max_total=max_total,
+        after=after,
+        before=before,
+        with_total=with_total,
     )
 
 
-@router.get("/site-config")
-def admin_get_site_config(_: Account = Depends(get_admin_account), db: Session = Depends(get_db)):
-    return admin_service.get_site_config(db)
+@router.get("/site-config", response_model=SiteConfigResponse)
+async def admin_get_site_config(_: Account = Depends(get_admin_account), db: DbSession = Depends(get_session)):
+    return await run_db(db, admin_service.get_site_config)
 
 
-@router.patch("/site-config")
-def admin_update_site_config(
+@router.patch("/site-config", response_model=SiteConfigResponse)
+async def admin_update_site_config(
     payload: SiteConfigPayload,
     _: Account = Depends(get_admin_account),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    return admin_service.update_site_config(db, payload)
+    return await run_db(db, admin_service.update_site_config, payload)
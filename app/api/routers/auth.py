@@ -1,16 +1,23 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Body, Cookie, Depends, HTTPException, Response
-from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_account
 from app.core.config import get_settings
+from app.core.responses import FastJSONRoute
 from app.db.models import Account
-from app.db.session import get_db
-from app.schemas.auth import LoginPayload, RefreshTokenPayload, RegisterUserPayload
+from app.db.session import DbSession, get_session, run_db
+from app.schemas.auth import (
+    CadastroResponse,
+    ContaAtualResponse,
+    LoginPayload,
+    RefreshTokenPayload,
+    RegisterUserPayload,
+    SessaoResponse,
+)
 from app.services import auth_service
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=FastJSONRoute)
 settings = get_settings()
 
 
@@ -30,51 +37,55 @@ def _clear_refresh_cookie(response: Response) -> None:
     response.delete_cookie(key=settings.refresh_cookie_name, path="/auth")
 
 
-@router.post("/register-user")
-def register_user(payload: RegisterUserPayload, db: Session = Depends(get_db)):
-    return auth_service.register_user(db, payload)
+@router.post("/register-user", response_model=CadastroResponse, response_model_exclude_none=True)
+async def register_user(payload: RegisterUserPayload, db: DbSession = Depends(get_session)):
+    return await auth_service.register_user_async(db, payload)
 
 
-@router.post("/login-user")
-def login_user(payload: LoginPayload, response: Response, db: Session = Depends(get_db)):
-    result = auth_service.login_by_role(db, payload, role="user")
+@router.post("/login-user", response_model=SessaoResponse, response_model_exclude_none=True)
+async def login_user(payload: LoginPayload, response: Response, db: DbSession = Depends(get_session)):
+    result = await auth_service.login_by_role_async(db, payload, role="user")
     _set_refresh_cookie(response, result["refresh_token"])
     result.pop("refresh_token", None)
     return result
 
 
-@router.post("/login-admin")
-def login_admin(payload: LoginPayload, response: Response, db: Session = Depends(get_db)):
-    result = auth_service.login_by_role(db, payload, role="admin")
+@router.post("/login-admin", response_model=SessaoResponse, response_model_exclude_none=True)
+async def login_admin(payload: LoginPayload, response: Response, db: DbSession = Depends(get_session)):
+    result = await auth_service.login_by_role_async(db, payload, role="admin")
     _set_refresh_cookie(response, result["refresh_token"])
     result.pop("refresh_token", None)
     return result
 
 
-@router.get("/me")
-def auth_me(account: Account = Depends(get_current_account)):
-    return {"account": auth_service.account_public_payload(account)}
+@router.get("/me", response_model=ContaAtualResponse, response_model_exclude_none=True)
+async def auth_me(account: Account = Depends(get_current_account), db: DbSession = Depends(get_session)):
+    return await run_db(db, auth_service.get_account_profile, account)
 
 
 @router.post("/logout")
-def auth_logout(response: Response, account: Account = Depends(get_current_account), db: Session = Depends(get_db)):
-    auth_service.logout_account(db, account)
+async def auth_logout(
+    response: Response,
+    account: Account = Depends(get_current_account),
+    db: DbSession = Depends(get_session),
+):
+    await run_db(db, auth_service.logout_account, account)
     _clear_refresh_cookie(response)
     return {"ok": True}
 
 
-@router.post("/refresh")
-def auth_refresh(
+@router.post("/refresh", response_model=SessaoResponse, response_model_exclude_none=True)
+async def auth_refresh(
     response: Response,
     payload: RefreshTokenPayload | None = Body(default=None),
     refresh_cookie: str | None = Cookie(default=None, alias=settings.refresh_cookie_name),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
     refresh_token = refresh_cookie or (payload.refresh_token if payload else None)
     if not refresh_token:
         raise HTTPException(status_code=401, detail="Refresh token ausente.")
 
-    result = auth_service.refresh_session(db, refresh_token)
+    result = await run_db(db, auth_service.refresh_session, refresh_token)
     _set_refresh_cookie(response, result["refresh_token"])
     result.pop("refresh_token", None)
     return result
@@ -1,43 +1,74 @@
 from __future__ import annotations
 
-from pathlib import Path
-
-from fastapi import APIRouter
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
 
 from app.core.config import get_settings
+from app.core.http_cache import is_not_modified, not_modified_response
+from app.core.static_assets import AssetStore, StaticAsset, choose_encoding
 
 router = APIRouter(tags=["frontend"])
-PROJECT_ROOT = get_settings().project_root
-
-
-def _file_response(path: Path, media_type: str | None = None):
-    if media_type:
-        return FileResponse(path, media_type=media_type)
-    return FileResponse(path)
+settings = get_settings()
+PROJECT_ROOT = settings.project_root
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+asset_store = AssetStore(
+    PROJECT_ROOT,
+    {
+        "index.html": "text/html; charset=utf-8",
+        "script.js": "application/javascript",
+        "apiClient.js": "application/javascript",
+        "style.css": "text/css; charset=utf-8",
+    },
+    entrypoint="index.html",
+    reload=settings.static_reload,
+)
+
+
+def _asset_response(request: Request, asset: StaticAsset | None, cache_control: str) -> Response:
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Arquivo nao encontrado.")
+
+    encoding = choose_encoding(asset, request.headers.get("accept-encoding"))
+    etag = asset.etag_for(encoding)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": asset.last_modified,
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if is_not_modified(request, etag, asset.modified_at):
+        return not_modified_response(headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=asset.bodies[encoding], media_type=asset.media_type, headers=headers)
 
 
 @router.get("/")
-def frontend_index():
-    return _file_response(PROJECT_ROOT / "index.html")
+async def frontend_index(request: Request):
+    return _asset_response(request, asset_store.get("index.html"), settings.static_cache_control)
 
 
 @router.get("/script.js")
-def frontend_script():
-    return _file_response(PROJECT_ROOT / "script.js", media_type="application/javascript")
+async def frontend_script(request: Request):
+    return _asset_response(request, asset_store.get("script.js"), settings.static_cache_control)
 
 
 @router.get("/apiClient.js")
-def frontend_api_client():
-    return _file_response(PROJECT_ROOT / "apiClient.js", media_type="application/javascript")
+async def frontend_api_client(request: Request):
+    return _asset_response(request, asset_store.get("apiClient.js"), settings.static_cache_control)
 
 
 @router.get("/style.css")
-def frontend_style():
-    return _file_response(PROJECT_ROOT / "style.css", media_type="text/css")
+async def frontend_style(request: Request):
+    return _asset_response(request, asset_store.get("style.css"), settings.static_cache_control)
+
+
+@router.get("/static/{asset_path:path}", include_in_schema=False)
+async def frontend_hashed_asset(asset_path: str, request: Request):
+    return _asset_response(request, asset_store.get_hashed(f"/static/{asset_path}"), IMMUTABLE_CACHE_CONTROL)
 
 
 @router.get("/favicon.ico", include_in_schema=False)
-def favicon():
+async def favicon():
     return {"ok": True}
-
@@ -1,74 +1,124 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, Query, Request
 
 from app.api.deps import get_user_account
+from app.core.money import MAX_AMOUNT
+from app.core.responses import FastJSONRoute
 from app.db.models import Account
-from app.db.session import get_db
-from app.schemas.shop import CheckoutPayload, RecargaPayload
-from app.services import shop_service
-
-router = APIRouter(prefix="/shop", tags=["shop"])
-
-
-@router.get("/produtos")
-def shop_list_products(db: Session = Depends(get_db)):
-    return shop_service.list_products(db)
+from app.db.session import DbSession, get_session, run_db
+from app.schemas.common import Page
+from app.schemas.shop import (
+    CheckoutPayload,
+    PedidoResponse,
+    ProdutoResponse,
+    RecargaPayload,
+    SaldoResponse,
+    UsuarioResponse,
+)
+from app.services import catalog_cache, export_service, shop_service
+from app.services.export_service import ExportFormat
+
+router = APIRouter(prefix="/shop", tags=["shop"], route_class=FastJSONRoute)
+
+
+@router.get("/produtos", response_model=list[ProdutoResponse])
+async def shop_list_products(request: Request, db: DbSession = Depends(get_session)):
+    return await catalog_cache.cached_json(
+        request,
+        catalog_cache.CATALOG,
+        "produtos",
+        lambda: run_db(db, shop_service.list_products),
+    )
 
 
-@router.get("/produtos/paginated")
-def shop_list_products_paginated(
+@router.get("/produtos/paginated", response_model=Page[ProdutoResponse])
+async def shop_list_products_paginated(
+    request: Request,
     page: int = Query(default=1, ge=1),
     size: int = Query(default=10, ge=1, le=100),
     search: str | None = Query(default=None, min_length=1, max_length=80),
-    min_preco: float | None = Query(default=None, ge=0),
-    max_preco: float | None = Query(default=None, ge=0),
-    db: Session = Depends(get_db),
+    min_preco: float | None = Query(default=None, ge=0, le=MAX_AMOUNT),
+    max_preco: float | None = Query(default=None, ge=0, le=MAX_AMOUNT),
+    after: str | None = Query(default=None, min_length=1, max_length=200),
+    before: str | None = Query(default=None, min_length=1, max_length=200),
+    with_total: bool | None = Query(default=None),
+    db: DbSession = Depends(get_session),
 ):
-    return shop_service.list_products_paginated(
-        db=db,
-        page=page,
-        size=size,
-        search=search,
-        min_preco=min_preco,
-        max_preco=max_preco,
+    cache_key = ("produtos/paginated", page, size, search, min_preco, max_preco, after, before, with_total)
+    return await catalog_cache.cached_json(
+        request,
+        catalog_cache.CATALOG,
+        cache_key,
+        lambda: run_db(
+            db,
+            shop_service.list_products_paginated,
+            page=page,
+            size=size,
+            search=search,
+            min_preco=min_preco,
+            max_preco=max_preco,
+            after=after,
+            before=before,
+            with_total=with_total,
+        ),
     )
 
 
-@router.get("/me")
-def shop_me(account: Account = Depends(get_user_account), db: Session = Depends(get_db)):
-    return shop_service.get_user_profile(db, account)
+@router.get("/me", response_model=UsuarioResponse)
+async def shop_me(account: Account = Depends(get_user_account), db: DbSession = Depends(get_session)):
+    return await run_db(db, shop_service.get_user_profile, account)
 
 
-@router.post("/recarga")
-def shop_recharge(
+@router.post("/recarga", response_model=SaldoResponse)
+async def shop_recharge(
     payload: RecargaPayload,
     account: Account = Depends(get_user_account),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    return shop_service.recharge_balance(db, account, payload.valor)
+    return await run_db(db, shop_service.recharge_balance, account, payload.valor)
 
 
-@router.post("/pedidos")
-def shop_checkout(
+@router.post("/pedidos", response_model=PedidoResponse)
+async def shop_checkout(
     payload: CheckoutPayload,
+    idempotency_key: str | None = Header(default=None, min_length=1, max_length=200),
     account: Account = Depends(get_user_account),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    return shop_service.checkout(db, account, payload.produtos_ids)
+    return await run_db(db, shop_service.checkout, account, payload.produtos_ids, idempotency_key)
 
 
-@router.get("/pedidos")
-def shop_list_orders(account: Account = Depends(get_user_account), db: Session = Depends(get_db)):
-    return shop_service.list_user_orders(db, account)
+@router.get("/pedidos", response_model=list[PedidoResponse])
+async def shop_list_orders(account: Account = Depends(get_user_account), db: DbSession = Depends(get_session)):
+    return await run_db(db, shop_service.list_user_orders, account)
 
 
-@router.get("/pedidos/paginated")
-def shop_list_orders_paginated(
+@router.get("/pedidos/export")
+async def shop_export_orders(
+    export_format: ExportFormat = Query(default="ndjson", alias="format"),
+    account: Account = Depends(get_user_account),
+):
+    return export_service.export_user_orders(int(account.usuario_id), export_format)
+
+
+@router.get("/pedidos/paginated", response_model=Page[PedidoResponse])
+async def shop_list_orders_paginated(
     page: int = Query(default=1, ge=1),
     size: int = Query(default=10, ge=1, le=100),
+    after: str | None = Query(default=None, min_length=1, max_length=200),
+    before: str | None = Query(default=None, min_length=1, max_length=200),
+    with_total: bool | None = Query(default=None),
     account: Account = Depends(get_user_account),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    return shop_service.list_user_orders_paginated(db=db, account=account, page=page, size=size)
+    return await run_db(
+        db,
+        shop_service.list_user_orders_paginated,
+        account=account,
+        page=page,
+        size=size,
+        after=after,
+        before=before,
+        with_total=with_total,
+    )
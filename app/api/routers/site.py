@@ -1,21 +1,50 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
-from app.services import admin_service
+from app.core import metrics
+from app.core.config import get_settings
+from app.core.responses import FastJSONRoute
+from app.db.session import DbSession, get_session, run_db
+from app.schemas.admin import SiteConfigResponse
+from app.services import admin_service, catalog_cache
+
+settings = get_settings()
+router = APIRouter(tags=["site"], route_class=FastJSONRoute)
 
-router = APIRouter(tags=["site"])
+
+def _ping(db: Session) -> None:
+    db.execute(text("SELECT 1"))
 
 
-@router.get("/site-config")
-def get_site_config(db: Session = Depends(get_db)):
-    return admin_service.get_site_config(db)
+@router.get("/site-config", response_model=SiteConfigResponse)
+async def get_site_config(request: Request, db: DbSession = Depends(get_session)):
+    return await catalog_cache.cached_json(
+        request,
+        catalog_cache.SITE_CONFIG,
+        "site-config",
+        lambda: run_db(db, admin_service.get_site_config),
+    )
 
 
 @router.get("/health", tags=["site"])
-def healthcheck(db: Session = Depends(get_db)):
-    db.execute(text("SELECT 1"))
+async def healthcheck(db: DbSession = Depends(get_session)):
+    await run_db(db, _ping)
     return {"status": "ok"}
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.metrics_token and not hmac.compare_digest(
+        request.headers.get("authorization", ""),
+        f"Bearer {settings.metrics_token}",
+    ):
+        raise HTTPException(status_code=401, detail="Token de metricas invalido.")
+    snapshots = metrics.collect_snapshots(settings.metrics_multiproc_dir, 3 * settings.metrics_flush_seconds)
+    return Response(metrics.render(snapshots), media_type=metrics.CONTENT_TYPE)
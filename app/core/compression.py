@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import zlib
+
+from app.core.http_cache import parse_accept_encoding
+
+try:  # optional codecs: negotiated only when the package is installed
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/",
+)
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int = 6) -> None:
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        # Z_SYNC_FLUSH on intermediate chunks so streamed rows reach the client right away.
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality: int = 4) -> None:
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        chunk = self.compressor.process(data)
+        return chunk + (self.compressor.finish() if final else self.compressor.flush())
+
+
+class ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self, level: int = 3) -> None:
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        chunk = self.compressor.compress(data)
+        if final:
+            return chunk + self.compressor.flush()
+        return chunk + self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+
+ENCODERS = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+
+# Server preference when the client accepts several with the same q-value.
+ENCODING_PREFERENCE = ("zstd", "br", "gzip")
+
+
+def available_encodings() -> tuple[str, ...]:
+    return tuple(name for name in ENCODING_PREFERENCE if name in ENCODERS)
+
+
+def negotiate_encoding(accept_encoding: str | None, allowed: tuple[str, ...]) -> str | None:
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for name in allowed:
+        quality = accepted.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith(COMPRESSIBLE_TYPES)
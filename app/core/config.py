@@ -14,6 +14,16 @@ class Settings:
     project_root: Path
     environment: str
     database_url: str
+    database_replica_urls: list[str]
+    replica_stickiness_seconds: float
+    db_pool_size: int
+    db_max_overflow: int
+    db_pool_timeout_seconds: float
+    db_pool_recycle_seconds: int
+    db_pool_pre_ping: bool
+    db_statement_timeout_ms: int
+    sqlite_busy_timeout_ms: int
+    sqlite_wal: bool
     jwt_secret_key: str
     jwt_algorithm: str
     access_token_expire_minutes: int
@@ -27,8 +37,31 @@ class Settings:
     rate_limit_enabled: bool
     rate_limit_requests: int
     rate_limit_window_seconds: int
+    rate_limit_backend: str
     auto_create_schema: bool
     refresh_cookie_name: str
+    async_db_enabled: bool
+    token_cache_size: int
+    identity_cache_ttl_seconds: float
+    password_hash_workers: int
+    password_hash_queue_size: int
+    summary_reconcile_seconds: float
+    ledger_check_seconds: float
+    response_cache_max_bytes: int
+    response_cache_ttl_seconds: float
+    cache_version_poll_seconds: float
+    api_cache_control: str
+    static_cache_control: str
+    static_reload: bool
+    compression_enabled: bool
+    compression_min_bytes: int
+    compression_gzip_level: int
+    idempotency_key_ttl_seconds: float
+    metrics_enabled: bool
+    metrics_token: str
+    metrics_multiproc_dir: str
+    metrics_flush_seconds: float
+    slow_query_ms: float
 
 
 def _read_bool(value: str | None, default: bool = False) -> bool:
@@ -54,6 +87,10 @@ def get_settings() -> Settings:
     if not database_url:
         database_url = f"sqlite:///{(PROJECT_ROOT / 'loja.db').as_posix()}"
 
+    rate_limit_backend = os.getenv("LOJACONTROL_RATE_LIMIT_BACKEND", "memory").strip().lower()
+    if rate_limit_backend not in {"memory", "database"}:
+        rate_limit_backend = "memory"
+
     cors_origins = _read_csv_list(os.getenv("LOJACONTROL_CORS_ORIGINS"))
     if not cors_origins:
         cors_origins = [
@@ -67,6 +104,16 @@ def get_settings() -> Settings:
         project_root=PROJECT_ROOT,
         environment=environment,
         database_url=database_url,
+        database_replica_urls=_read_csv_list(os.getenv("LOJACONTROL_DATABASE_REPLICA_URLS")),
+        replica_stickiness_seconds=float(os.getenv("LOJACONTROL_REPLICA_STICKINESS_SECONDS", "5")),
+        db_pool_size=int(os.getenv("LOJACONTROL_DB_POOL_SIZE", "5")),
+        db_max_overflow=int(os.getenv("LOJACONTROL_DB_MAX_OVERFLOW", "10")),
+        db_pool_timeout_seconds=float(os.getenv("LOJACONTROL_DB_POOL_TIMEOUT_SECONDS", "30")),
+        db_pool_recycle_seconds=int(os.getenv("LOJACONTROL_DB_POOL_RECYCLE_SECONDS", "1800")),
+        db_pool_pre_ping=_read_bool(os.getenv("LOJACONTROL_DB_POOL_PRE_PING"), True),
+        db_statement_timeout_ms=int(os.getenv("LOJACONTROL_DB_STATEMENT_TIMEOUT_MS", "0")),
+        sqlite_busy_timeout_ms=int(os.getenv("LOJACONTROL_SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        sqlite_wal=_read_bool(os.getenv("LOJACONTROL_SQLITE_WAL"), True),
         jwt_secret_key=os.getenv("LOJACONTROL_JWT_SECRET", "change-this-secret"),
         jwt_algorithm=os.getenv("LOJACONTROL_JWT_ALGORITHM", "HS256"),
         access_token_expire_minutes=int(os.getenv("LOJACONTROL_ACCESS_TOKEN_EXPIRE_MINUTES", "720")),
@@ -80,8 +127,33 @@ def get_settings() -> Settings:
         rate_limit_enabled=_read_bool(os.getenv("LOJACONTROL_RATE_LIMIT_ENABLED"), True),
         rate_limit_requests=int(os.getenv("LOJACONTROL_RATE_LIMIT_REQUESTS", "120")),
         rate_limit_window_seconds=int(os.getenv("LOJACONTROL_RATE_LIMIT_WINDOW_SECONDS", "60")),
+        rate_limit_backend=rate_limit_backend,
         auto_create_schema=_read_bool(os.getenv("LOJACONTROL_AUTO_CREATE_SCHEMA"), True),
         refresh_cookie_name=os.getenv("LOJACONTROL_REFRESH_COOKIE_NAME", "lc_refresh_token"),
+        async_db_enabled=_read_bool(os.getenv("LOJACONTROL_ASYNC_DB"), False),
+        token_cache_size=int(os.getenv("LOJACONTROL_TOKEN_CACHE_SIZE", "4096")),
+        identity_cache_ttl_seconds=float(os.getenv("LOJACONTROL_IDENTITY_CACHE_TTL_SECONDS", "5")),
+        password_hash_workers=int(
+            os.getenv("LOJACONTROL_PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+        ),
+        password_hash_queue_size=int(os.getenv("LOJACONTROL_PASSWORD_HASH_QUEUE_SIZE", "64")),
+        summary_reconcile_seconds=float(os.getenv("LOJACONTROL_SUMMARY_RECONCILE_SECONDS", "300")),
+        ledger_check_seconds=float(os.getenv("LOJACONTROL_LEDGER_CHECK_SECONDS", "3600")),
+        response_cache_max_bytes=int(os.getenv("LOJACONTROL_RESPONSE_CACHE_MAX_BYTES", str(8 * 1024 * 1024))),
+        response_cache_ttl_seconds=float(os.getenv("LOJACONTROL_RESPONSE_CACHE_TTL_SECONDS", "60")),
+        cache_version_poll_seconds=float(os.getenv("LOJACONTROL_CACHE_VERSION_POLL_SECONDS", "2")),
+        api_cache_control=os.getenv("LOJACONTROL_API_CACHE_CONTROL", "public, no-cache"),
+        static_cache_control=os.getenv("LOJACONTROL_STATIC_CACHE_CONTROL", "public, no-cache"),
+        static_reload=_read_bool(os.getenv("LOJACONTROL_STATIC_RELOAD"), environment == "development"),
+        compression_enabled=_read_bool(os.getenv("LOJACONTROL_COMPRESSION_ENABLED"), True),
+        compression_min_bytes=int(os.getenv("LOJACONTROL_COMPRESSION_MIN_BYTES", "1024")),
+        compression_gzip_level=int(os.getenv("LOJACONTROL_COMPRESSION_GZIP_LEVEL", "6")),
+        idempotency_key_ttl_seconds=float(os.getenv("LOJACONTROL_IDEMPOTENCY_KEY_TTL_SECONDS", "86400")),
+        metrics_enabled=_read_bool(os.getenv("LOJACONTROL_METRICS_ENABLED"), False),
+        metrics_token=os.getenv("LOJACONTROL_METRICS_TOKEN", ""),
+        metrics_multiproc_dir=os.getenv("LOJACONTROL_METRICS_MULTIPROC_DIR", ""),
+        metrics_flush_seconds=float(os.getenv("LOJACONTROL_METRICS_FLUSH_SECONDS", "5")),
+        slow_query_ms=float(os.getenv("LOJACONTROL_SLOW_QUERY_MS", "200")),
     )
     validate_settings(settings)
     return settings
@@ -101,3 +173,5 @@ def validate_settings(settings: Settings) -> None:
         raise RuntimeError("CORS em produção precisa de origens explícitas (sem '*').")
     if settings.auto_create_schema:
         raise RuntimeError("LOJACONTROL_AUTO_CREATE_SCHEMA deve ser 0 em produção.")
+    if settings.metrics_enabled and len(settings.metrics_token) < 32:
+        raise RuntimeError("LOJACONTROL_METRICS_TOKEN precisa de 32+ caracteres com /metrics habilitado em produção.")
@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 
@@ -34,7 +35,8 @@ def register_exception_handlers(app: FastAPI) -> None:
             status_code=422,
             content={
                 "detail": "Payload invalido.",
-                "errors": exc.errors(),
+                # Errors raised by custom validators carry the exception itself in `ctx`.
+                "errors": jsonable_encoder(exc.errors(), custom_encoder={Exception: str}),
                 "request_id": request_id,
             },
             headers={"X-Request-ID": request_id or ""},
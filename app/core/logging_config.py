@@ -38,10 +38,19 @@ class JsonLogFormatter(logging.Formatter):
         if duration_ms is not None:
             payload["duration_ms"] = duration_ms
 
+        db_queries = getattr(record, "db_queries", None)
+        if db_queries is not None:
+            payload["db_queries"] = db_queries
+            payload["db_time_ms"] = getattr(record, "db_time_ms", None)
+
         user_id = getattr(record, "user_id", None)
         if user_id is not None:
             payload["user_id"] = user_id
 
+        details = getattr(record, "details", None)
+        if details is not None:
+            payload["details"] = details
+
         if record.exc_info:
             payload["exception"] = self.formatException(record.exc_info)
 
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import glob
+import json
+import math
+import os
+import time
+from threading import Lock
+from typing import Any, Callable, Iterable
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = Lock()
+
+    def _key(self, labels: dict[str, object]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> dict[tuple[str, ...], Any]:
+        raise NotImplementedError
+
+    def snapshot(self) -> dict[str, Any]:
+        # Plain JSON-friendly form, shared by the exposition and the multiprocess files.
+        return {
+            "name": self.name,
+            "type": self.type,
+            "documentation": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": [[list(key), value] for key, value in self.samples().items()],
+        }
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def samples(self) -> dict[tuple[str, ...], float]:
+        with self.lock:
+            return dict(self.values)
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.values: dict[tuple[str, ...], float] = {}
+        self.functions: dict[tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: object) -> None:
+        with self.lock:
+            self.values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: object) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels: object) -> None:
+        # Read at collection time, e.g. the size of a pool owned by someone else.
+        with self.lock:
+            self.functions[self._key(labels)] = function
+
+    def samples(self) -> dict[tuple[str, ...], float]:
+        with self.lock:
+            samples = dict(self.values)
+            functions = dict(self.functions)
+        for key, function in functions.items():
+            samples[key] = float(function())
+        return samples
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count, sum]
+        self.values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        with self.lock:
+            series = self.values.get(key)
+            if series is None:
+                series = [0.0] * (len(self.buckets) + 2)
+                self.values[key] = series
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def samples(self) -> dict[tuple[str, ...], list[float]]:
+        with self.lock:
+            return {key: list(series) for key, series in self.values.items()}
+
+    def snapshot(self) -> dict[str, Any]:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.metrics: dict[str, Metric] = {}
+
+    def _get_or_create(self, cls: type[Metric], name: str, *args, **kwargs) -> Metric:
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = cls(name, *args, **kwargs)
+                self.metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def collect(self) -> list[Metric]:
+        with self.lock:
+            return list(self.metrics.values())
+
+
+registry = MetricsRegistry()
+
+THREADPOOL_SIZE = registry.gauge("lojacontrol_threadpool_size", "Threads disponiveis para rotas e servicos sincronos.")
+THREADPOOL_IN_USE = registry.gauge("lojacontrol_threadpool_in_use", "Threads do pool ocupadas.")
+THREADPOOL_WAITING = registry.gauge("lojacontrol_threadpool_waiting", "Tarefas esperando uma thread livre.")
+
+
+def watch_threadpool() -> None:
+    # Must run inside the event loop: anyio keeps one default limiter per loop.
+    import anyio.to_thread
+
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    THREADPOOL_SIZE.set_function(lambda: limiter.total_tokens)
+    THREADPOOL_IN_USE.set_function(lambda: limiter.borrowed_tokens)
+    THREADPOOL_WAITING.set_function(lambda: limiter.statistics().tasks_waiting)
+
+
+# Multiprocess mode: with several uvicorn workers each process periodically writes its own
+# snapshot to `<directory>/metrics-<pid>.json`, and whichever worker answers /metrics merges
+# its live values with the files of the others. Counters and histograms of workers that are
+# gone keep counting (like prometheus_client); gauges only come from files refreshed within
+# `stale_after_seconds`. The directory must be emptied before the workers start.
+def _snapshot_path(directory: str) -> str:
+    return os.path.join(directory, f"metrics-{os.getpid()}.json")
+
+
+def write_snapshot(directory: str, source: MetricsRegistry = registry) -> None:
+    path = _snapshot_path(directory)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as handle:
+        json.dump([metric.snapshot() for metric in source.collect()], handle)
+    os.replace(temporary_path, path)
+
+
+def _merge(families: dict[str, dict[str, Any]], snapshots: list[dict[str, Any]], live: bool) -> None:
+    for snapshot in snapshots:
+        if snapshot["type"] == "gauge" and not live:
+            continue
+        family = families.setdefault(snapshot["name"], {**snapshot, "samples": {}})
+        if family["type"] != snapshot["type"] or family.get("buckets") != snapshot.get("buckets"):
+            continue
+        merged = family["samples"]
+        for key, value in snapshot["samples"]:
+            key = tuple(key)
+            current = merged.get(key)
+            if current is None:
+                merged[key] = list(value) if isinstance(value, list) else value
+            elif isinstance(current, list):
+                merged[key] = [left + right for left, right in zip(current, value)]
+            else:
+                merged[key] = current + value
+
+
+def collect_snapshots(
+    directory: str | None = None,
+    stale_after_seconds: float = 60.0,
+    source: MetricsRegistry = registry,
+) -> list[dict[str, Any]]:
+    local = [metric.snapshot() for metric in source.collect()]
+    if not directory:
+        return local
+
+    families: dict[str, dict[str, Any]] = {}
+    _merge(families, local, live=True)
+    own_path = _snapshot_path(directory)
+    now = time.time()
+    for path in sorted(glob.glob(os.path.join(directory, "metrics-*.json"))):
+        if path == own_path:
+            continue
+        try:
+            live = now - os.path.getmtime(path) <= stale_after_seconds
+            with open(path, encoding="utf-8") as handle:
+                snapshots = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        _merge(families, snapshots, live)
+    return [
+        {**family, "samples": [[list(key), value] for key, value in family["samples"].items()]}
+        for family in families.values()
+    ]
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape(value: str, quote: bool = True) -> str:
+    value = value.replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quote else value
+
+
+def _format_labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def render(snapshots: list[dict[str, Any]]) -> str:
+    # Prometheus text exposition format 0.0.4.
+    lines: list[str] = []
+    for family in sorted(snapshots, key=lambda item: item["name"]):
+        name = family["name"]
+        lines.append(f"# HELP {name} {_escape(family['documentation'], quote=False)}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for key, value in sorted(family["samples"], key=lambda item: item[0]):
+            labels = list(zip(family["labelnames"], key))
+            if family["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                continue
+            buckets = family["buckets"]
+            cumulative = 0.0
+            for bound, count in zip(buckets, value):
+                cumulative += count
+                bucket_labels = _format_labels(labels + [("le", _format_value(bound))])
+                lines.append(f"{name}_bucket{bucket_labels} {_format_value(cumulative)}")
+            cumulative += value[len(buckets)]
+            lines.append(f"{name}_bucket{_format_labels(labels + [('le', '+Inf')])} {_format_value(cumulative)}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value[-1])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {_format_value(cumulative)}")
+    return "\n".join(lines) + "\n"
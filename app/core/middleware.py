@@ -1,106 +1,338 @@
 from __future__ import annotations
 
+import hashlib
 import logging
+import math
 import time
 import uuid
-from collections import defaultdict
-from threading import Lock
-from typing import DefaultDict
+from functools import partial
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.core.security import decode_access_token
+from app.core.compression import ENCODERS, GzipEncoder, available_encodings, is_compressible, negotiate_encoding
+from app.core.metrics import registry
+from app.core.query_stats import QueryStats, current_query_stats
+from app.core.rate_limit import (
+    DEFAULT_RATE_LIMIT_POLICIES,
+    InMemoryRateLimitBackend,
+    RateLimitBackend,
+    RateLimitPolicy,
+    resolve_policy,
+)
+from app.core.security import decode_access_token, sign_write_marker
 
 logger = logging.getLogger("app.middleware")
 
+HTTP_REQUESTS = registry.counter(
+    "lojacontrol_http_requests_total",
+    "Requisicoes HTTP por metodo, rota (template) e status.",
+    labelnames=("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION_SECONDS = registry.histogram(
+    "lojacontrol_http_request_duration_seconds",
+    "Latencia das requisicoes HTTP por metodo e rota (template).",
+    labelnames=("method", "route"),
+)
+HTTP_REQUESTS_IN_PROGRESS = registry.gauge("lojacontrol_http_requests_in_progress", "Requisicoes HTTP em andamento.")
+RATE_LIMIT_DECISIONS = registry.counter(
+    "lojacontrol_rate_limit_decisions_total",
+    "Decisoes do rate limiter por politica.",
+    labelnames=("policy", "result"),
+)
+RATE_LIMIT_TRACKED_KEYS = registry.gauge(
+    "lojacontrol_rate_limit_tracked_keys",
+    "Chaves mantidas pelo rate limiter em memoria.",
+)
 
-class AuthContextMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        request.state.request_id = uuid.uuid4().hex
-        request.state.auth_payload = None
 
-        authorization = request.headers.get("Authorization")
+def _header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _state(scope: Scope) -> dict:
+    return scope.setdefault("state", {})
+
+
+def _route_template(scope: Scope) -> str:
+    # Set by the router on the shared scope; the template keeps label cardinality bounded.
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class AuthContextMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = _state(scope)
+        state.setdefault("request_id", uuid.uuid4().hex)
+        state["auth_payload"] = None
+
+        authorization = _header(scope, b"authorization")
         if authorization:
             prefix, _, token = authorization.partition(" ")
             if prefix.lower() == "bearer" and token.strip():
                 try:
-                    request.state.auth_payload = decode_access_token(token.strip())
+                    state["auth_payload"] = decode_access_token(token.strip())
                 except ValueError:
-                    request.state.auth_payload = None
+                    state["auth_payload"] = None
+
+        await self.app(scope, receive, send)
 
-        return await call_next(request)
 
+class RequestLoggingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
         started_at = time.perf_counter()
-        response = None
+        state = _state(scope)
+        state["request_id"] = uuid.uuid4().hex
+        status_code = 500
+        query_stats = QueryStats(request_id=state["request_id"])
+        query_stats_token = current_query_stats.set(query_stats)
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = state.get("request_id") or ""
+                # Statements issued while a streamed body is still being sent only reach the log.
+                headers.append("Server-Timing", query_stats.server_timing())
+            await send(message)
+
         try:
-            response = await call_next(request)
-            response.headers["X-Request-ID"] = getattr(request.state, "request_id", "")
-            return response
+            await self.app(scope, receive, send_with_request_id)
         finally:
-            duration_ms = round((time.perf_counter() - started_at) * 1000, 2)
-            auth_payload = getattr(request.state, "auth_payload", None)
+            current_query_stats.reset(query_stats_token)
+            duration = time.perf_counter() - started_at
+            duration_ms = round(duration * 1000, 2)
+            route = _route_template(scope)
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=status_code)
+            HTTP_REQUEST_DURATION_SECONDS.observe(duration, method=scope["method"], route=route)
+            auth_payload = state.get("auth_payload")
             user_id = auth_payload.get("sub") if isinstance(auth_payload, dict) else None
             logger.info(
                 "http_request",
                 extra={
-                    "request_id": getattr(request.state, "request_id", None),
-                    "method": request.method,
-                    "path": request.url.path,
-                    "status_code": response.status_code if response else 500,
+                    "request_id": state.get("request_id"),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status_code": status_code,
                     "duration_ms": duration_ms,
                     "user_id": user_id,
+                    "db_queries": query_stats.count,
+                    "db_time_ms": query_stats.duration_ms,
                 },
             )
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, requests_limit: int, window_seconds: int):
-        super().__init__(app)
+class ReadYourWritesMiddleware:
+    # Answers every write with a signed "read from the primary until" cookie. The marker
+    # travels with the client, so the window holds whichever worker serves the next read.
+    def __init__(self, app: ASGIApp, cookie_name: str, window_seconds: float, secure: bool = False) -> None:
+        self.app = app
+        self.cookie_name = cookie_name
+        self.window_seconds = math.ceil(window_seconds)
+        self.cookie_flags = "; Path=/; HttpOnly; SameSite=Lax" + ("; Secure" if secure else "")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS") or self.window_seconds <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_marker(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                marker = sign_write_marker(math.ceil(time.time()) + self.window_seconds)
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{self.cookie_name}={marker}; Max-Age={self.window_seconds}{self.cookie_flags}",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_marker)
+
+
+class RateLimitMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        requests_limit: int,
+        window_seconds: int,
+        backend: RateLimitBackend | None = None,
+        policies: tuple[RateLimitPolicy, ...] = DEFAULT_RATE_LIMIT_POLICIES,
+    ) -> None:
+        self.app = app
         self.requests_limit = requests_limit
         self.window_seconds = window_seconds
-        self.lock = Lock()
-        self.hits: DefaultDict[str, list[float]] = defaultdict(list)
+        self.backend = backend or InMemoryRateLimitBackend()
+        self.policies = policies
+        if isinstance(self.backend, InMemoryRateLimitBackend):
+            RATE_LIMIT_TRACKED_KEYS.set_function(lambda: len(self.backend.counters))
 
     @staticmethod
-    def _client_key(request: Request) -> str:
-        forwarded = request.headers.get("x-forwarded-for")
+    def _client_key(scope: Scope) -> str:
+        forwarded = _header(scope, b"x-forwarded-for")
         if forwarded:
             return forwarded.split(",")[0].strip()
-        return request.client.host if request.client else "unknown"
-
-    async def dispatch(self, request: Request, call_next):
-        if request.url.path in {"/docs", "/openapi.json", "/redoc"}:
-            return await call_next(request)
-
-        now = time.time()
-        key = self._client_key(request)
-
-        with self.lock:
-            timestamps = self.hits[key]
-            threshold = now - self.window_seconds
-            while timestamps and timestamps[0] < threshold:
-                timestamps.pop(0)
-
-            if len(timestamps) >= self.requests_limit:
-                return JSONResponse(
-                    status_code=429,
-                    content={"detail": "Muitas requisicoes. Tente novamente em instantes."},
-                    headers={
-                        "Retry-After": str(self.window_seconds),
-                        "X-Request-ID": getattr(request.state, "request_id", ""),
-                    },
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def _identity_key(self, scope: Scope, policy: RateLimitPolicy) -> str:
+        # The identifier comes from the client (X-Forwarded-For), so it is hashed to a fixed
+        # length that always fits `rate_limit_counters.key`.
+        if policy.key_by == "identity":
+            auth_payload = _state(scope).get("auth_payload")
+            subject = auth_payload.get("sub") if isinstance(auth_payload, dict) else None
+            if subject:
+                return f"sub:{hashlib.sha256(str(subject).encode()).hexdigest()}"
+        return f"ip:{hashlib.sha256(self._client_key(scope).encode()).hexdigest()}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        policy = resolve_policy(self.policies, scope["method"], scope["path"])
+        if policy is None or policy.exempt:
+            await self.app(scope, receive, send)
+            return
+
+        limit = max(1, int(self.requests_limit * policy.limit_factor))
+        window_seconds = policy.window_seconds or self.window_seconds
+        key = f"{policy.name}:{self._identity_key(scope, policy)}"
+        if self.backend.blocking:
+            result = await run_in_threadpool(self.backend.hit, key, limit, window_seconds, policy.cost)
+        else:
+            result = self.backend.hit(key, limit, window_seconds, policy.cost)
+
+        RATE_LIMIT_DECISIONS.inc(policy=policy.name, result="allowed" if result.allowed else "rejected")
+        if not result.allowed:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Muitas requisicoes. Tente novamente em instantes."},
+                headers={
+                    "Retry-After": str(result.retry_after),
+                    "X-Request-ID": _state(scope).get("request_id") or "",
+                    "X-RateLimit-Policy": policy.name,
+                },
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_limits(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = str(result.limit)
+                headers["X-RateLimit-Remaining"] = str(result.remaining)
+                headers["X-RateLimit-Window-Seconds"] = str(window_seconds)
+                headers["X-RateLimit-Policy"] = policy.name
+            await send(message)
+
+        await self.app(scope, receive, send_with_limits)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        encodings: tuple[str, ...] | None = None,
+        gzip_level: int = 6,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = tuple(name for name in (encodings or available_encodings()) if name in ENCODERS)
+        self.encoders = {**ENCODERS, "gzip": partial(GzipEncoder, gzip_level)}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(_header(scope, b"accept-encoding"), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        encoder = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, encoder, passthrough
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                passthrough = (
+                    message["status"] < 200
+                    or message["status"] in (204, 304)
+                    or "content-encoding" in headers
+                    or "no-transform" in headers.get("cache-control", "")
+                    or not is_compressible(headers.get("content-type", ""))
                 )
+                if passthrough:
+                    await send(message)
+                else:
+                    # Held back until the first body chunk decides whether compressing pays off.
+                    start_message = message
+                return
 
-            timestamps.append(now)
-            remaining = max(0, self.requests_limit - len(timestamps))
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                headers = MutableHeaders(scope=start_message)
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    start_message = None
+                    await send(message)
+                    return
+
+                encoder = self.encoders[encoding]()
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                del headers["content-length"]
+                if not more_body:
+                    body = encoder.compress(body, final=True)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    start_message = None
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start_message)
+                start_message = None
+
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": encoder.compress(body, final=not more_body),
+                    "more_body": more_body,
+                }
+            )
 
-        response: Response = await call_next(request)
-        response.headers["X-RateLimit-Limit"] = str(self.requests_limit)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Window-Seconds"] = str(self.window_seconds)
-        return response
+        await self.app(scope, receive, send_compressed)
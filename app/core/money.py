@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any
+
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+# Upper bound (in reais) for any amount accepted from the API: 10^11 cents leaves room for
+# balances and store-wide totals to grow without ever reaching BIGINT.
+MAX_AMOUNT = 1_000_000_000
+
+
+class Money(TypeDecorator):
+    # Every amount (saldo, preco, total, ledger) is stored and handled as integer cents;
+    # reais only exist at the API edge (`to_cents` on input, `to_reais` on output), so sums
+    # and comparisons are exact both in Python and in SQL.
+    impl = BigInteger
+    cache_ok = True
+
+    def process_result_value(self, value: Any, dialect: Any) -> int | None:
+        # SUM(bigint) comes back as numeric on Postgres.
+        return None if value is None else int(value)
+
+
+def to_cents(value: float | int | str | Decimal) -> int:
+    return int((Decimal(str(value)) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def to_reais(cents: int) -> float:
+    return cents / 100
+
+
+def require_cents(value: float) -> float:
+    # Reject fractions of a cent instead of letting `to_cents` round them away; str() keeps
+    # the decimal the client sent (10.005 stays 10.005, not 10.00499...).
+    if (Decimal(str(value)) * 100) % 1:
+        raise ValueError("O valor deve ter no maximo 2 casas decimais.")
+    return value
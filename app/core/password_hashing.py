@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, TypeVar
+
+from app.core.config import get_settings
+from app.core.metrics import registry
+
+settings = get_settings()
+T = TypeVar("T")
+
+HASH_BUCKETS = (0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+
+HASH_QUEUE_DEPTH = registry.gauge(
+    "lojacontrol_password_hash_queue_depth",
+    "Operacoes de hash de senha aguardando um worker.",
+)
+HASH_IN_FLIGHT = registry.gauge(
+    "lojacontrol_password_hash_in_flight",
+    "Operacoes de hash de senha em execucao.",
+)
+HASH_WAIT_SECONDS = registry.histogram(
+    "lojacontrol_password_hash_wait_seconds",
+    "Tempo na fila antes do hash de senha.",
+    buckets=HASH_BUCKETS,
+)
+HASH_DURATION_SECONDS = registry.histogram(
+    "lojacontrol_password_hash_duration_seconds",
+    "Duracao do hash/verificacao de senha.",
+    labelnames=("operation",),
+    buckets=HASH_BUCKETS,
+)
+HASH_REJECTED = registry.counter(
+    "lojacontrol_password_hash_rejected_total",
+    "Operacoes de hash recusadas com a fila cheia.",
+)
+
+
+class PasswordHashPoolSaturated(RuntimeError):
+    pass
+
+
+class PasswordHashPool:
+    # bcrypt/PBKDF2 get their own small executor so a login burst queues here
+    # instead of taking every threadpool slot; past `max_pending` callers fail fast.
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        self.lock = Lock()
+        self.pending = 0
+        self.running = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self.pending - self.running
+
+    def _execute(self, fn: Callable[..., T], submitted_at: float, args: tuple[Any, ...]) -> T:
+        started_at = time.perf_counter()
+        HASH_WAIT_SECONDS.observe(started_at - submitted_at)
+        with self.lock:
+            self.running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self.lock:
+                self.running -= 1
+            HASH_DURATION_SECONDS.observe(time.perf_counter() - started_at, operation=fn.__name__.lstrip("_"))
+
+    def _release(self, _future: Future) -> None:
+        with self.lock:
+            self.pending -= 1
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self.lock:
+            if self.pending >= self.max_pending:
+                HASH_REJECTED.inc()
+                raise PasswordHashPoolSaturated("Fila de hash de senha cheia.")
+            self.pending += 1
+
+        future = self.executor.submit(self._execute, fn, time.perf_counter(), args)
+        # Released when the job finishes, even if the awaiting request was cancelled.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+
+password_hash_pool = PasswordHashPool(
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_queue_size,
+)
+HASH_QUEUE_DEPTH.set_function(lambda: password_hash_pool.queue_depth)
+HASH_IN_FLIGHT.set_function(lambda: password_hash_pool.running)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import re
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+_BIND_PARAMETER = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|(?<![\w.])\d+(?:\.\d+)?\b")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(slots=True)
+class QueryStats:
+    request_id: str | None = None
+    count: int = 0
+    duration: float = 0.0
+
+    @property
+    def duration_ms(self) -> float:
+        return round(self.duration * 1000, 2)
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration_ms};desc="{self.count} queries"'
+
+
+# Set by RequestLoggingMiddleware for the whole request. The engine hooks in app.db.session add to
+# the same object from the threadpool or the async greenlet, since both run in a copy of the context.
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+def normalize_sql(statement: str, max_length: int = 2000) -> str:
+    # One shape per query: literals and bind parameters become `?`, expanded IN lists `(?...)`.
+    normalized = _BIND_PARAMETER.sub("?", statement)
+    normalized = _LITERAL.sub("?", normalized)
+    normalized = _PARAMETER_LIST.sub("(?...)", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    return normalized[:max_length]
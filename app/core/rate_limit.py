@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import math
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from threading import Lock
+
+from sqlalchemy import case, delete, update
+from sqlalchemy.engine import Engine
+
+from app.core.config import Settings
+from app.db.models import RateLimitCounter
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    name: str
+    path: str
+    methods: frozenset[str] | None = None
+    exact: bool = False
+    limit_factor: float = 1.0
+    window_seconds: int | None = None
+    cost: int = 1
+    key_by: str = "ip"
+    exempt: bool = False
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods is not None and method not in self.methods:
+            return False
+        if self.exact:
+            return path == self.path
+        return path.startswith(self.path)
+
+
+_GET = frozenset({"GET", "HEAD"})
+_POST = frozenset({"POST"})
+
+# First match wins. Limits are a factor of LOJACONTROL_RATE_LIMIT_REQUESTS so a
+# single setting scales every budget; `cost` weighs expensive calls inside a budget.
+DEFAULT_RATE_LIMIT_POLICIES: tuple[RateLimitPolicy, ...] = (
+    RateLimitPolicy("docs", "/docs", exempt=True),
+    RateLimitPolicy("openapi", "/openapi.json", exact=True, exempt=True),
+    RateLimitPolicy("redoc", "/redoc", exact=True, exempt=True),
+    RateLimitPolicy("favicon", "/favicon.ico", exact=True, exempt=True),
+    RateLimitPolicy("metrics", "/metrics", methods=_GET, exact=True),
+    RateLimitPolicy("login", "/auth/login-", methods=_POST, limit_factor=0.1),
+    RateLimitPolicy("register", "/auth/register-user", methods=_POST, limit_factor=0.05),
+    RateLimitPolicy("refresh", "/auth/refresh", methods=_POST, limit_factor=0.25),
+    RateLimitPolicy("checkout", "/shop/pedidos", methods=_POST, exact=True, limit_factor=0.25, key_by="identity"),
+    RateLimitPolicy("recharge", "/shop/recarga", methods=_POST, limit_factor=0.25, key_by="identity"),
+    RateLimitPolicy("admin-orders-dump", "/admin/pedidos", methods=_GET, exact=True, cost=10, key_by="identity"),
+    RateLimitPolicy("admin-users-dump", "/admin/usuarios", methods=_GET, exact=True, cost=5, key_by="identity"),
+    RateLimitPolicy("admin-orders-export", "/admin/pedidos/export", methods=_GET, exact=True, cost=10, key_by="identity"),
+    RateLimitPolicy("admin-users-export", "/admin/usuarios/export", methods=_GET, exact=True, cost=5, key_by="identity"),
+    RateLimitPolicy("admin", "/admin/", key_by="identity"),
+    RateLimitPolicy("shop-orders-export", "/shop/pedidos/export", methods=_GET, exact=True, cost=5, key_by="identity"),
+    RateLimitPolicy("catalog", "/shop/produtos", methods=_GET, limit_factor=10),
+    RateLimitPolicy("shop-account", "/shop/", key_by="identity"),
+    RateLimitPolicy("auth-session", "/auth/", key_by="identity"),
+    RateLimitPolicy("site-config", "/site-config", methods=_GET, exact=True, limit_factor=10),
+    RateLimitPolicy("health", "/health", methods=_GET, exact=True, limit_factor=10),
+    RateLimitPolicy("frontend", "/", methods=_GET, exact=True, limit_factor=10),
+    RateLimitPolicy("frontend-script", "/script.js", methods=_GET, exact=True, limit_factor=10),
+    RateLimitPolicy("frontend-api-client", "/apiClient.js", methods=_GET, exact=True, limit_factor=10),
+    RateLimitPolicy("frontend-style", "/style.css", methods=_GET, exact=True, limit_factor=10),
+    RateLimitPolicy("frontend-static", "/static/", methods=_GET, limit_factor=10),
+    RateLimitPolicy("default", "/"),
+)
+
+
+def resolve_policy(policies: tuple[RateLimitPolicy, ...], method: str, path: str) -> RateLimitPolicy | None:
+    for policy in policies:
+        if policy.matches(method, path):
+            return policy
+    return None
+
+
+def _window_position(now: float, window_seconds: int) -> tuple[int, float]:
+    window_index = int(now // window_seconds)
+    elapsed_fraction = (now - window_index * window_seconds) / window_seconds
+    return window_index, elapsed_fraction
+
+
+def _evaluate(
+    current: int,
+    previous: int,
+    elapsed_fraction: float,
+    limit: int,
+    window_seconds: int,
+    cost: int,
+) -> RateLimitResult:
+    # Sliding window counter: the previous window weighs in proportionally to
+    # how much of it still overlaps the sliding window ending now.
+    estimated = previous * (1 - elapsed_fraction) + current
+    if estimated + cost <= limit:
+        remaining = max(0, math.floor(limit - estimated - cost))
+        return RateLimitResult(allowed=True, limit=limit, remaining=remaining, retry_after=0)
+
+    if current + cost > limit or previous == 0:
+        wait = (1 - elapsed_fraction) * window_seconds
+    else:
+        needed_fraction = 1 - (limit - current - cost) / previous
+        wait = (needed_fraction - elapsed_fraction) * window_seconds
+    return RateLimitResult(allowed=False, limit=limit, remaining=0, retry_after=max(1, math.ceil(wait)))
+
+
+class RateLimitBackend(ABC):
+    blocking = False
+
+    @abstractmethod
+    def hit(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: int,
+        cost: int = 1,
+        now: float | None = None,
+    ) -> RateLimitResult:
+        raise NotImplementedError
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    def __init__(self, sweep_interval_seconds: int = 60) -> None:
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.lock = Lock()
+        # key -> [window_index, current, previous, expires_at]
+        self.counters: dict[str, list] = {}
+        self.next_sweep_at = 0.0
+
+    def _sweep(self, now: float) -> None:
+        expired = [key for key, entry in self.counters.items() if entry[3] <= now]
+        for key in expired:
+            del self.counters[key]
+        self.next_sweep_at = now + self.sweep_interval_seconds
+
+    def hit(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: int,
+        cost: int = 1,
+        now: float | None = None,
+    ) -> RateLimitResult:
+        now = time.time() if now is None else now
+        window_index, elapsed_fraction = _window_position(now, window_seconds)
+
+        with self.lock:
+            if now >= self.next_sweep_at:
+                self._sweep(now)
+
+            entry = self.counters.get(key)
+            if entry is None:
+                entry = [window_index, 0, 0, 0.0]
+                self.counters[key] = entry
+            elif entry[0] != window_index:
+                entry[2] = entry[1] if entry[0] == window_index - 1 else 0
+                entry[1] = 0
+                entry[0] = window_index
+
+            result = _evaluate(entry[1], entry[2], elapsed_fraction, limit, window_seconds, cost)
+            if result.allowed:
+                entry[1] += cost
+            entry[3] = (window_index + 2) * window_seconds
+        return result
+
+
+class DatabaseRateLimitBackend(RateLimitBackend):
+    # Shared across uvicorn workers through the `rate_limit_counters` table. Both
+    # statements are atomic single-row upserts/updates, so no explicit locking is needed.
+    blocking = True
+
+    def __init__(self, engine: Engine, sweep_interval_seconds: int = 60) -> None:
+        self.engine = engine
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.next_sweep_at = 0.0
+        if engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        self._insert = insert
+
+    def _roll_window_statement(self, key: str, window_index: int, expires_at: float):
+        table = RateLimitCounter.__table__
+        statement = self._insert(table).values(
+            key=key,
+            window_index=window_index,
+            current=0,
+            previous=0,
+            expires_at=expires_at,
+        )
+        return statement.on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={
+                "previous": case(
+                    (table.c.window_index == window_index, table.c.previous),
+                    (table.c.window_index == window_index - 1, table.c.current),
+                    else_=0,
+                ),
+                "current": case((table.c.window_index == window_index, table.c.current), else_=0),
+                "window_index": window_index,
+                "expires_at": expires_at,
+            },
+        ).returning(table.c.current, table.c.previous)
+
+    def hit(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: int,
+        cost: int = 1,
+        now: float | None = None,
+    ) -> RateLimitResult:
+        now = time.time() if now is None else now
+        window_index, elapsed_fraction = _window_position(now, window_seconds)
+        expires_at = float((window_index + 2) * window_seconds)
+        table = RateLimitCounter.__table__
+
+        with self.engine.begin() as conn:
+            if now >= self.next_sweep_at:
+                conn.execute(delete(table).where(table.c.expires_at <= now))
+                self.next_sweep_at = now + self.sweep_interval_seconds
+
+            current, previous = conn.execute(self._roll_window_statement(key, window_index, expires_at)).one()
+            decay = 1 - elapsed_fraction
+            incremented = conn.execute(
+                update(table)
+                .where(
+                    table.c.key == key,
+                    table.c.window_index == window_index,
+                    table.c.previous * decay + table.c.current + cost <= limit,
+                )
+                .values(current=table.c.current + cost)
+                .returning(table.c.current, table.c.previous)
+            ).first()
+
+        if incremented is not None:
+            current, previous = incremented
+            remaining = max(0, math.floor(limit - (previous * decay + current)))
+            return RateLimitResult(allowed=True, limit=limit, remaining=remaining, retry_after=0)
+        return _evaluate(current, previous, elapsed_fraction, limit, window_seconds, cost)
+
+
+def create_rate_limit_backend(settings: Settings) -> RateLimitBackend:
+    if settings.rate_limit_backend == "database":
+        from app.db.session import engine
+
+        return DatabaseRateLimitBackend(engine)
+    return InMemoryRateLimitBackend()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Hashable, NamedTuple
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+
+
+class ResponseCache:
+    # Pre-serialized response bodies keyed by (namespace, version, key). Invalidating a
+    # namespace bumps its version, so a body computed from data read before the bump can
+    # still be stored but will never be served. `ttl_seconds` bounds how long an entry can
+    # outlive a change this process never heard about (<= 0 keeps entries until evicted).
+    def __init__(self, max_bytes: int, max_entries: int = 4096, ttl_seconds: float = 0) -> None:
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.lock = Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.versions: dict[str, int] = {}
+        self.remote_versions: dict[str, int] | None = None
+        # cache key -> (entry, expires_at)
+        self._data: OrderedDict[tuple[str, int, Hashable], tuple[CachedResponse, float]] = OrderedDict()
+
+    def version(self, namespace: str) -> int:
+        return self.versions.get(namespace, 0)
+
+    def get(self, namespace: str, key: Hashable) -> CachedResponse | None:
+        with self.lock:
+            cache_key = (namespace, self.versions.get(namespace, 0), key)
+            item = self._data.get(cache_key)
+            if item is not None and item[1] <= time.monotonic():
+                self.total_bytes -= len(self._data.pop(cache_key)[0].body)
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(cache_key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, namespace: str, version: int, key: Hashable, entry: CachedResponse) -> None:
+        if self.max_bytes <= 0 or len(entry.body) > self.max_bytes:
+            return
+
+        with self.lock:
+            if version != self.versions.get(namespace, 0):
+                return
+            cache_key = (namespace, version, key)
+            previous = self._data.pop(cache_key, None)
+            if previous is not None:
+                self.total_bytes -= len(previous[0].body)
+            expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else float("inf")
+            self._data[cache_key] = (entry, expires_at)
+            self.total_bytes += len(entry.body)
+            while self.total_bytes > self.max_bytes or len(self._data) > self.max_entries:
+                _, (evicted, _) = self._data.popitem(last=False)
+                self.total_bytes -= len(evicted.body)
+
+    def invalidate(self, namespace: str) -> None:
+        with self.lock:
+            self.versions[namespace] = self.versions.get(namespace, 0) + 1
+            for cache_key in [item for item in self._data if item[0] == namespace]:
+                self.total_bytes -= len(self._data.pop(cache_key)[0].body)
+
+    def sync_versions(self, remote_versions: dict[str, int]) -> bool:
+        # Versions written by other workers; any change after the first sync invalidates
+        # the local namespace. Returns whether something was invalidated.
+        previous = self.remote_versions
+        self.remote_versions = dict(remote_versions)
+        if previous is None:
+            return False
+        changed = False
+        for namespace, remote_version in remote_versions.items():
+            if previous.get(namespace) != remote_version:
+                self.invalidate(namespace)
+                changed = True
+        return changed
+
+    def clear(self) -> None:
+        with self.lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import inspect
+import json
+from functools import wraps
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import ResponseValidationError
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter, ValidationError
+from starlette.responses import JSONResponse, Response
+
+try:  # optional: falls back to the stdlib encoder when orjson is missing
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    # Anything the encoder does not know natively (Decimal, pydantic models, sets...)
+    # goes through jsonable_encoder, so the output matches the stock JSONResponse.
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _renders_itself(endpoint: Callable[..., Any]) -> bool:
+    # Routes that take a `Response` parameter rely on FastAPI merging its headers and
+    # cookies, so they keep the stock path.
+    if not inspect.iscoroutinefunction(endpoint):
+        return False
+    try:
+        signature = inspect.signature(endpoint, eval_str=True)
+    except (NameError, TypeError):
+        return False
+    return not any(
+        inspect.isclass(parameter.annotation) and issubclass(parameter.annotation, Response)
+        for parameter in signature.parameters.values()
+    )
+
+
+class FastJSONRoute(APIRoute):
+    # FastAPI runs every plain return value through jsonable_encoder before the response
+    # class sees it, which dominates the cost of large order lists. This route validates
+    # the value against the response_model with a TypeAdapter built once per route and
+    # lets pydantic-core dump the JSON, so extra fields are dropped and ill-typed ones
+    # fail as they would on the stock path.
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        self.response_adapter: TypeAdapter[Any] | None = None
+        renders_itself = _renders_itself(endpoint)
+        if renders_itself:
+            endpoint = _render_json(endpoint, kwargs.get("status_code") or 200, self)
+        super().__init__(path, endpoint, **kwargs)
+        if renders_itself and self.response_model is not None:
+            self.response_adapter = TypeAdapter(self.response_model)
+
+
+def _serialize(adapter: TypeAdapter[Any], content: Any, exclude_none: bool = False) -> bytes:
+    # Response structs are validated from their plain form: pydantic accepts dataclass
+    # instances as they are, which would let a wrongly typed field through.
+    try:
+        value = adapter.validate_python(adapter.dump_python(content, warnings=False))
+    except ValidationError as exc:
+        errors = [{**error, "loc": ("response", *error["loc"])} for error in exc.errors(include_url=False)]
+        raise ResponseValidationError(errors, body=content) from None
+    return adapter.dump_json(value, exclude_none=exclude_none)
+
+
+def _render_json(endpoint: Callable[..., Any], status_code: int, route: FastJSONRoute) -> Callable[..., Any]:
+    @wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        content = await endpoint(*args, **kwargs)
+        if isinstance(content, Response):
+            return content
+        if route.response_adapter is None:
+            return FastJSONResponse(content, status_code=status_code)
+        return Response(
+            _serialize(route.response_adapter, content, route.response_model_exclude_none),
+            status_code=status_code,
+            media_type="application/json",
+        )
+
+    return wrapper
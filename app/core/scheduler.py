@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Callable
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger("app.scheduler")
+
+
+class PeriodicTask:
+    # Runs a blocking job every `interval_seconds` in the threadpool for the lifetime of the app.
+    def __init__(self, name: str, job: Callable[[], object], interval_seconds: float) -> None:
+        self.name = name
+        self.job = job
+        self.interval_seconds = interval_seconds
+        self.task: asyncio.Task | None = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await run_in_threadpool(self.job)
+            except Exception:
+                logger.exception("periodic_task_failed", extra={"details": {"task": self.name}})
+
+    def start(self) -> None:
+        if self.interval_seconds > 0 and self.task is None:
+            self.task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def stop(self) -> None:
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
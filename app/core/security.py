@@ -9,9 +9,12 @@ from typing import Any, Dict
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.config import get_settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Verified access-token claims keyed by a digest of the token; entries expire at the token's `exp`.
+token_claims_cache = TTLCache(maxsize=get_settings().token_cache_size)
 
 
 def now_utc() -> datetime:
@@ -34,6 +37,23 @@ def verify_legacy_pbkdf2_password(password: str, salt: str, password_hash: str)
     return hmac.compare_digest(digest, password_hash)
 
 
+def sign_write_marker(expires_at: int) -> str:
+    signature = hmac.new(
+        get_settings().jwt_secret_key.encode("utf-8"),
+        f"write-marker:{expires_at}".encode("ascii"),
+        hashlib.sha256,
+    ).hexdigest()
+    return f"{expires_at}.{signature}"
+
+
+def write_marker_active(value: str | None, now: float) -> bool:
+    # `value` comes from a client cookie: only a marker we signed, not yet expired, counts.
+    expires_at, _, _ = (value or "").partition(".")
+    if not expires_at.isdigit():
+        return False
+    return int(expires_at) > now and hmac.compare_digest(value, sign_write_marker(int(expires_at)))
+
+
 def create_access_token(subject: int, role: str) -> str:
     settings = get_settings()
     expires_at = now_utc() + timedelta(minutes=settings.access_token_expire_minutes)
@@ -80,9 +100,18 @@ def decode_token(token: str) -> Dict[str, Any]:
 
 
 def decode_access_token(token: str) -> Dict[str, Any]:
+    cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+    cached = token_claims_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     payload = decode_token(token)
     if payload.get("type") != "access":
         raise ValueError("Tipo de token invalido.")
+
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)):
+        token_claims_cache.set(cache_key, payload, expires_at=float(expires_at))
     return payload
 
 
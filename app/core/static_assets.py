@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import gzip
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import formatdate
+from pathlib import Path
+from threading import Lock
+
+from app.core.http_cache import compute_etag, parse_accept_encoding
+
+try:  # optional: brotli is only used when installed
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+HASHED_PREFIX = "/static/"
+MIN_COMPRESS_BYTES = 512
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    name: str
+    media_type: str
+    hashed_url: str
+    etag: str
+    modified_at: datetime
+    last_modified: str
+    # encoding ("identity", "br", "gzip") -> body
+    bodies: dict[str, bytes]
+
+    def etag_for(self, encoding: str) -> str:
+        if encoding == "identity":
+            return self.etag
+        return f'{self.etag[:-1]}-{encoding}"'
+
+
+def choose_encoding(asset: StaticAsset, accept_encoding: str | None) -> str:
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = "identity", 0.0
+    for encoding in ("br", "gzip"):
+        quality = accepted.get(encoding, wildcard)
+        if encoding in asset.bodies and quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _compress(body: bytes) -> dict[str, bytes]:
+    bodies = {"identity": body}
+    if len(body) < MIN_COMPRESS_BYTES:
+        return bodies
+    variants = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=11)
+    for encoding, compressed in variants.items():
+        if len(compressed) < len(body):
+            bodies[encoding] = compressed
+    return bodies
+
+
+class AssetStore:
+    # Frontend files kept in memory with precompressed variants. With `reload=True` the
+    # files are re-stat'ed on access and rebuilt when any of them changes (development).
+    def __init__(self, root: Path, files: dict[str, str], entrypoint: str, reload: bool = False) -> None:
+        self.root = root
+        self.files = files
+        self.entrypoint = entrypoint
+        self.reload = reload
+        self.lock = Lock()
+        self.assets: dict[str, StaticAsset] = {}
+        self.hashed: dict[str, StaticAsset] = {}
+        self.signature: tuple[tuple[int, int], ...] | None = None
+
+    def _signature(self) -> tuple[tuple[int, int], ...]:
+        stats = [(self.root / name).stat() for name in self.files]
+        return tuple((item.st_mtime_ns, item.st_size) for item in stats)
+
+    def _build(self, name: str, body: bytes, mtime: float) -> StaticAsset:
+        path = self.root / name
+        etag = compute_etag(body)
+        return StaticAsset(
+            name=name,
+            media_type=self.files[name],
+            hashed_url=f"{HASHED_PREFIX}{path.stem}.{etag[1:11]}{path.suffix}",
+            etag=etag,
+            modified_at=datetime.fromtimestamp(mtime, timezone.utc),
+            last_modified=formatdate(mtime, usegmt=True),
+            bodies=_compress(body),
+        )
+
+    def _rewrite_entrypoint(self, html: bytes, assets: dict[str, StaticAsset]) -> bytes:
+        text = html.decode("utf-8")
+        for name, asset in assets.items():
+            text = re.sub(rf'(\b(?:src|href)=")(?:\./)?{re.escape(name)}(")', rf"\g<1>{asset.hashed_url}\g<2>", text)
+        return text.encode("utf-8")
+
+    def load(self) -> None:
+        with self.lock:
+            signature = self._signature()
+            raw = {name: (self.root / name).read_bytes() for name in self.files}
+            mtimes = {name: (self.root / name).stat().st_mtime for name in self.files}
+            assets = {
+                name: self._build(name, body, mtimes[name]) for name, body in raw.items() if name != self.entrypoint
+            }
+            if self.entrypoint in raw:
+                # The entrypoint links the hashed URLs, so it changes whenever an asset does.
+                html = self._rewrite_entrypoint(raw[self.entrypoint], assets)
+                assets[self.entrypoint] = self._build(self.entrypoint, html, max(mtimes.values()))
+            self.assets = assets
+            self.hashed = {asset.hashed_url: asset for asset in assets.values() if asset.name != self.entrypoint}
+            self.signature = signature
+
+    def _ensure_fresh(self) -> None:
+        if self.signature is None or (self.reload and self._signature() != self.signature):
+            self.load()
+
+    def get(self, name: str) -> StaticAsset | None:
+        self._ensure_fresh()
+        return self.assets.get(name)
+
+    def get_hashed(self, url_path: str) -> StaticAsset | None:
+        self._ensure_fresh()
+        return self.hashed.get(url_path)
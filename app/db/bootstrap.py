@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from collections import Counter
 from datetime import datetime, timezone
 from typing import Any
 
@@ -8,10 +9,13 @@ from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.core.config import LEGACY_DATA_FILE, get_settings
+from app.core.money import to_cents
 from app.core.security import hash_password
 from app.db.base import Base
 from app.db.models import Account, Order, OrderItem, Product, SiteConfig, User
 from app.db.session import SessionLocal, engine
+from app.services.balance_service import open_balances
+from app.services.summary_service import reconcile_summary
 
 DEFAULT_SITE_CONFIG = {
     "site_name": "LojaControl",
@@ -27,10 +31,10 @@ def _normalize_email(email: str) -> str:
     return email.strip().lower()
 
 
-def _to_float(value: Any, default: float = 0.0) -> float:
+def _to_cents(value: Any, default: int = 0) -> int:
     try:
-        return round(float(value), 2)
-    except (TypeError, ValueError):
+        return to_cents(value)
+    except (ArithmeticError, TypeError, ValueError):
         return default
 
 
@@ -114,7 +118,7 @@ def _import_legacy_users(db: Session, legacy_users: list[dict[str, Any]]) -> Non
         if user:
             user.nome = nome
             user.email = email
-            user.saldo = _to_float(item.get("saldo", 0))
+            user.saldo = _to_cents(item.get("saldo", 0))
             continue
 
         db.add(
@@ -122,7 +126,7 @@ def _import_legacy_users(db: Session, legacy_users: list[dict[str, Any]]) -> Non
                 id=user_id if user_id else None,
                 nome=nome,
                 email=email,
-                saldo=_to_float(item.get("saldo", 0)),
+                saldo=_to_cents(item.get("saldo", 0)),
             )
         )
 
@@ -143,7 +147,7 @@ def _import_legacy_products(db: Session, legacy_products: list[dict[str, Any]])
         if product:
             product.nome = nome
             product.descricao = str(item.get("descricao", "")).strip()
-            product.preco = _to_float(item.get("preco", 0))
+            product.preco = _to_cents(item.get("preco", 0))
             continue
 
         db.add(
@@ -151,7 +155,7 @@ def _import_legacy_products(db: Session, legacy_products: list[dict[str, Any]])
                 id=product_id if product_id else None,
                 nome=nome,
                 descricao=str(item.get("descricao", "")).strip(),
-                preco=_to_float(item.get("preco", 0)),
+                preco=_to_cents(item.get("preco", 0)),
             )
         )
 
@@ -203,7 +207,8 @@ def _import_legacy_accounts(db: Session, legacy_accounts: list[dict[str, Any]])
 
 
 def _import_legacy_orders(db: Session, legacy_orders: list[dict[str, Any]]) -> None:
-    price_by_product_id = {item.id: float(item.preco) for item in db.scalars(select(Product))}
+    products = {item.id: item for item in db.scalars(select(Product))}
+    price_by_product_id = {product_id: item.preco for product_id, item in products.items()}
 
     for item in legacy_orders:
         if not isinstance(item, dict):
@@ -230,8 +235,8 @@ def _import_legacy_orders(db: Session, legacy_orders: list[dict[str, Any]]) -> N
         if not valid_product_ids:
             continue
 
-        calculated_total = round(sum(price_by_product_id[pid] for pid in valid_product_ids), 2)
-        provided_total = _to_float(item.get("total"), calculated_total)
+        calculated_total = sum(price_by_product_id[pid] for pid in valid_product_ids)
+        provided_total = _to_cents(item.get("total"), calculated_total)
 
         order = Order(
             id=order_id if order_id else None,
@@ -242,8 +247,16 @@ def _import_legacy_orders(db: Session, legacy_orders: list[dict[str, Any]]) -> N
         db.add(order)
         db.flush()
 
-        for product_id in valid_product_ids:
-            db.add(OrderItem(order_id=order.id, product_id=product_id))
+        for product_id, quantity in Counter(valid_product_ids).items():
+            db.add(
+                OrderItem(
+                    order_id=order.id,
+                    product_id=product_id,
+                    nome=products[product_id].nome,
+                    preco=price_by_product_id[product_id],
+                    quantidade=quantity,
+                )
+            )
 
     db.flush()
 
@@ -252,6 +265,7 @@ def _import_legacy_data(db: Session, payload: dict[str, Any]) -> None:
     legacy_users = payload.get("usuarios")
     if isinstance(legacy_users, list):
         _import_legacy_users(db, legacy_users)
+        open_balances(db)
 
     legacy_products = payload.get("produtos")
     if isinstance(legacy_products, list):
@@ -326,3 +340,6 @@ def initialize_database() -> None:
         except Exception:
             db.rollback()
             raise
+
+        # Legacy import and out-of-band edits bypass the incremental counters.
+        reconcile_summary(db)
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, ForeignKey, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.money import Money
 from app.db.base import Base
 
 
@@ -14,7 +15,7 @@ class User(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     nome: Mapped[str] = mapped_column(String(80), nullable=False)
     email: Mapped[str] = mapped_column(String(120), nullable=False, unique=True, index=True)
-    saldo: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    saldo: Mapped[int] = mapped_column(Money, nullable=False, default=0)
 
     account: Mapped["Account"] = relationship(back_populates="user", uselist=False)
     orders: Mapped[list["Order"]] = relationship(back_populates="user", cascade="all, delete-orphan")
@@ -45,17 +46,18 @@ class Product(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     nome: Mapped[str] = mapped_column(String(120), nullable=False)
     descricao: Mapped[str] = mapped_column(String(300), nullable=False, default="")
-    preco: Mapped[float] = mapped_column(Float, nullable=False)
+    preco: Mapped[int] = mapped_column(Money, nullable=False)
 
-    order_items: Mapped[list["OrderItem"]] = relationship(back_populates="product")
+    order_items: Mapped[list["OrderItem"]] = relationship(back_populates="product", passive_deletes=True)
 
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (Index("ix_orders_usuario_id_id", "usuario_id", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     usuario_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
-    total: Mapped[float] = mapped_column(Float, nullable=False)
+    total: Mapped[int] = mapped_column(Money, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
@@ -72,10 +74,33 @@ class OrderItem(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"), nullable=False, index=True)
-    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False, index=True)
+    # Null once the product is deleted; the line keeps its name/price snapshot.
+    product_id: Mapped[int | None] = mapped_column(ForeignKey("products.id"), nullable=True, index=True)
+    nome: Mapped[str] = mapped_column(String(120), nullable=False)
+    preco: Mapped[int] = mapped_column(Money, nullable=False)
+    quantidade: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
 
     order: Mapped[Order] = relationship(back_populates="items")
-    product: Mapped[Product] = relationship(back_populates="order_items")
+    product: Mapped[Product | None] = relationship(back_populates="order_items")
+
+
+class BalanceLedger(Base):
+    # Append-only: every change to users.saldo adds one row (recharge, purchase, adjustment)
+    # in the same transaction, so the balance always equals the sum of `amount`.
+    __tablename__ = "balance_ledger"
+    __table_args__ = (Index("ix_balance_ledger_user_id_id", "user_id", "id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    amount: Mapped[int] = mapped_column(Money, nullable=False)
+    balance_after: Mapped[int] = mapped_column(Money, nullable=False)
+    order_id: Mapped[int | None] = mapped_column(ForeignKey("orders.id"), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
 
 
 class SiteConfig(Base):
@@ -90,6 +115,25 @@ class SiteConfig(Base):
     highlight_color: Mapped[str] = mapped_column(String(7), nullable=False)
 
 
+class StoreSummary(Base):
+    __tablename__ = "store_summary"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    usuarios: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    produtos: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    pedidos: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    faturamento: Mapped[int] = mapped_column(Money, nullable=False, default=0)
+    saldo_total: Mapped[int] = mapped_column(Money, nullable=False, default=0)
+    reconciled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    namespace: Mapped[str] = mapped_column(String(40), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
 
@@ -106,3 +150,25 @@ class RefreshToken(Base):
     )
 
     account: Mapped[Account] = relationship(back_populates="refresh_tokens")
+
+
+class RateLimitCounter(Base):
+    __tablename__ = "rate_limit_counters"
+
+    key: Mapped[str] = mapped_column(String(200), primary_key=True)
+    window_index: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    current: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    previous: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    expires_at: Mapped[float] = mapped_column(Float, nullable=False, index=True)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (UniqueConstraint("account_id", "key", name="uq_idempotency_keys_account_id_key"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id"), nullable=False)
+    key: Mapped[str] = mapped_column(String(200), nullable=False)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
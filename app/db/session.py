@@ -1,21 +1,300 @@
 from __future__ import annotations
 
-from sqlalchemy import create_engine
+import fnmatch
+import itertools
+import logging
+import re
+import time
+from typing import Any, Callable, Sequence, TypeVar, Union
+
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
 
 from app.core.config import get_settings
+from app.core.metrics import registry
+from app.core.query_stats import current_query_stats, normalize_sql
+from app.core.security import write_marker_active
 
 settings = get_settings()
-connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
+slow_query_logger = logging.getLogger("app.db.slow_query")
+
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+POOL_CHECKOUT_WAIT_SECONDS = registry.histogram(
+    "lojacontrol_db_pool_checkout_wait_seconds",
+    "Espera por uma conexao do pool (inclui abrir uma nova).",
+    labelnames=("engine",),
+    buckets=POOL_WAIT_BUCKETS,
+)
+POOL_TIMEOUTS = registry.counter(
+    "lojacontrol_db_pool_timeouts_total",
+    "Checkouts que estouraram LOJACONTROL_DB_POOL_TIMEOUT_SECONDS.",
+    labelnames=("engine",),
+)
+POOL_IN_USE = registry.gauge("lojacontrol_db_pool_in_use", "Conexoes emprestadas pelo pool.", labelnames=("engine",))
+POOL_IDLE = registry.gauge("lojacontrol_db_pool_idle", "Conexoes paradas no pool.", labelnames=("engine",))
+POOL_OVERFLOW = registry.gauge(
+    "lojacontrol_db_pool_overflow",
+    "Conexoes alem de pool_size (negativo enquanto o pool ainda nao encheu).",
+    labelnames=("engine",),
+)
+QUERY_DURATION_SECONDS = registry.histogram(
+    "lojacontrol_db_query_duration_seconds",
+    "Tempo de execucao de cada statement SQL.",
+    labelnames=("engine",),
+    buckets=POOL_WAIT_BUCKETS,
+)
+
+
+class _TimedPool:
+    metrics_label = "primary"
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc(engine=self.metrics_label)
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT_SECONDS.observe(time.perf_counter() - started_at, engine=self.metrics_label)
+
+
+def _timed_pool_class(base: type[QueuePool], label: str) -> type[QueuePool]:
+    # A subclass per engine so the label survives Pool.recreate() (dispose, fork).
+    return type(base.__name__, (_TimedPool, base), {"metrics_label": label})
+
+
+def _is_sqlite_file(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def engine_options(database_url: str, label: str, is_async: bool = False) -> dict[str, Any]:
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    options: dict[str, Any] = {}
+    if backend == "sqlite":
+        if not is_async:
+            options["connect_args"] = {"check_same_thread": False}
+        if not _is_sqlite_file(database_url):
+            # In-memory databases keep SQLAlchemy's single-connection pools.
+            return options
+    else:
+        options["pool_pre_ping"] = settings.db_pool_pre_ping
+        options["pool_recycle"] = settings.db_pool_recycle_seconds
+        if backend == "postgresql" and settings.db_statement_timeout_ms > 0:
+            options["connect_args"] = {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+
+    options.update(
+        poolclass=_timed_pool_class(AsyncAdaptedQueuePool if is_async else QueuePool, label),
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+    )
+    return options
+
+
+def _configure_sqlite_connection(dbapi_connection, _connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}")
+    if settings.sqlite_wal:
+        # WAL lets readers run alongside the single writer; NORMAL only fsyncs at checkpoints.
+        cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.execute("PRAGMA synchronous = NORMAL")
+    cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context.query_started_at = time.perf_counter()
+
+
+def _query_timer(label: str) -> Callable[..., None]:
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - context.query_started_at
+        QUERY_DURATION_SECONDS.observe(elapsed, engine=label)
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += elapsed
+        if 0 < settings.slow_query_ms <= elapsed * 1000:
+            slow_query_logger.warning(
+                "slow_query",
+                extra={
+                    "request_id": stats.request_id if stats is not None else None,
+                    "duration_ms": round(elapsed * 1000, 2),
+                    "details": {"engine": label, "sql": normalize_sql(statement), "executemany": executemany},
+                },
+            )
+
+    return after_cursor_execute
+
+
+def instrument_engine(sync_engine: Engine, database_url: str, label: str) -> None:
+    if _is_sqlite_file(database_url):
+        event.listen(sync_engine, "connect", _configure_sqlite_connection)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _query_timer(label))
+    if isinstance(sync_engine.pool, QueuePool):
+        POOL_IN_USE.set_function(lambda: sync_engine.pool.checkedout(), engine=label)
+        POOL_IDLE.set_function(lambda: sync_engine.pool.checkedin(), engine=label)
+        POOL_OVERFLOW.set_function(lambda: sync_engine.pool.overflow(), engine=label)
+
+
+class RoutingSession(Session):
+    # Sessions start on the primary; `route_to_replica` pins one replica for the rest of the
+    # session. Flushes, INSERT/UPDATE/DELETE and SELECT ... FOR UPDATE still go to the primary.
+    def __init__(self, *args: Any, primary: Engine, replicas: Sequence[Engine] = (), **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.primary = primary
+        self.replicas = tuple(replicas)
+        self.replica: Engine | None = None
+
+    def route_to_replica(self) -> bool:
+        if not self.replicas:
+            return False
+        self.replica = self.replicas[next(_replica_cursor) % len(self.replicas)]
+        return True
 
-engine = create_engine(settings.database_url, connect_args=connect_args)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Engine:
+        if self.replica is None or self._flushing:
+            return self.primary
+        if isinstance(clause, UpdateBase) or getattr(clause, "_for_update_arg", None) is not None:
+            return self.primary
+        return self.replica
 
 
-def get_db():
+_replica_cursor = itertools.count()
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url, "primary"))
+instrument_engine(engine, settings.database_url, "primary")
+
+replica_engines: list[Engine] = []
+for index, replica_url in enumerate(settings.database_replica_urls):
+    replica_engines.append(create_engine(replica_url, **engine_options(replica_url, f"replica_{index}")))
+    instrument_engine(replica_engines[-1], replica_url, f"replica_{index}")
+
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    primary=engine,
+    replicas=replica_engines,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+DbSession = Union[Session, AsyncSession]
+T = TypeVar("T")
+
+# GET/HEAD on these paths may read from a replica; everything else uses the primary.
+# /admin/resumo is left out: it can reconcile (write, then re-read) through the same session.
+READ_ONLY_ROUTES = ("/shop/produtos*", "/admin/*/paginated", "/site-config")
+_read_only_route = re.compile("|".join(fnmatch.translate(pattern) for pattern in READ_ONLY_ROUTES))
+SAFE_METHODS = frozenset({"GET", "HEAD"})
+# Read-your-writes: ReadYourWritesMiddleware answers every write with this signed cookie, so the
+# client's next reads stay on the primary for LOJACONTROL_REPLICA_STICKINESS_SECONDS on any worker.
+WRITE_MARKER_COOKIE = "lc_primary_until"
+
+# Process-wide window opened by catalog cache invalidations (see `stick_to_primary`).
+_all_clients_primary_until = 0.0
+
+SESSION_ROUTES = registry.counter(
+    "lojacontrol_db_session_routes_total",
+    "Sessoes de requisicao por destino (primary ou replica).",
+    labelnames=("target",),
+)
+
+
+def stick_to_primary() -> None:
+    # A reload right after a catalog change must not repopulate the cache from a lagging replica.
+    global _all_clients_primary_until
+    if settings.database_replica_urls:
+        _all_clients_primary_until = time.monotonic() + settings.replica_stickiness_seconds
+
+
+def route_session(db: Session, request: Request) -> None:
+    if (
+        request.method in SAFE_METHODS
+        and _read_only_route.match(request.url.path)
+        and time.monotonic() >= _all_clients_primary_until
+        and not write_marker_active(request.cookies.get(WRITE_MARKER_COOKIE), time.time())
+        and db.route_to_replica()
+    ):
+        SESSION_ROUTES.inc(target="replica")
+        return
+    SESSION_ROUTES.inc(target="primary")
+
+
+def to_async_database_url(database_url: str) -> str:
+    scheme, separator, rest = database_url.partition("://")
+    if not separator:
+        return database_url
+
+    dialect = scheme.split("+", 1)[0]
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    if dialect in {"postgresql", "postgres"}:
+        return f"postgresql+psycopg://{rest}"
+    return database_url
+
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.async_db_enabled:
+    async_database_url = to_async_database_url(settings.database_url)
+    async_engine = create_async_engine(
+        async_database_url,
+        **engine_options(async_database_url, "primary_async", is_async=True),
+    )
+    instrument_engine(async_engine.sync_engine, async_database_url, "primary_async")
+    async_replica_engines = []
+    for index, replica_url in enumerate(settings.database_replica_urls):
+        async_replica_url = to_async_database_url(replica_url)
+        async_replica_engines.append(
+            create_async_engine(
+                async_replica_url,
+                **engine_options(async_replica_url, f"replica_{index}_async", is_async=True),
+            )
+        )
+        instrument_engine(async_replica_engines[-1].sync_engine, async_replica_url, f"replica_{index}_async")
+    AsyncSessionLocal = async_sessionmaker(
+        autoflush=False,
+        expire_on_commit=False,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        primary=async_engine.sync_engine,
+        replicas=[item.sync_engine for item in async_replica_engines],
+    )
+
+
+def get_db(request: Request):
     db: Session = SessionLocal()
+    route_session(db, request)
     try:
         yield db
     finally:
         db.close()
 
+
+async def get_async_db(request: Request):
+    async with AsyncSessionLocal() as db:
+        route_session(db.sync_session, request)
+        yield db
+
+
+get_session = get_async_db if settings.async_db_enabled else get_db
+
+
+async def run_db(db: DbSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    # AsyncSession.run_sync awaits every statement on the async driver, so one
+    # service implementation serves both modes.
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -9,8 +10,22 @@ from app.api.routers import admin, auth, frontend, shop, site
 from app.core.config import get_settings
 from app.core.errors import register_exception_handlers
 from app.core.logging_config import configure_logging
-from app.core.middleware import AuthContextMiddleware, RateLimitMiddleware, RequestLoggingMiddleware
+from app.core.metrics import watch_threadpool, write_snapshot
+from app.core.middleware import (
+    AuthContextMiddleware,
+    CompressionMiddleware,
+    RateLimitMiddleware,
+    ReadYourWritesMiddleware,
+    RequestLoggingMiddleware,
+)
+from app.core.rate_limit import create_rate_limit_backend
+from app.core.responses import FastJSONResponse
+from app.core.scheduler import PeriodicTask
 from app.db.bootstrap import initialize_database
+from app.db.session import WRITE_MARKER_COOKIE, async_engine
+from app.services.balance_service import run_ledger_check
+from app.services.catalog_cache import poll_versions
+from app.services.summary_service import run_reconciliation
 
 settings = get_settings()
 
@@ -20,13 +35,45 @@ def create_app() -> FastAPI:
     async def lifespan(_: FastAPI):
         configure_logging(settings)
         initialize_database()
+        frontend.asset_store.load()
+        summary_reconciler = PeriodicTask(
+            "summary-reconcile",
+            run_reconciliation,
+            settings.summary_reconcile_seconds,
+        )
+        summary_reconciler.start()
+        ledger_checker = PeriodicTask("balance-ledger-check", run_ledger_check, settings.ledger_check_seconds)
+        ledger_checker.start()
+        cache_version_poller = PeriodicTask("cache-version-poll", poll_versions, settings.cache_version_poll_seconds)
+        if settings.cache_version_poll_seconds > 0:
+            poll_versions()
+        cache_version_poller.start()
+        watch_threadpool()
+        metrics_writer = None
+        if settings.metrics_multiproc_dir:
+            os.makedirs(settings.metrics_multiproc_dir, exist_ok=True)
+            metrics_writer = PeriodicTask(
+                "metrics-snapshot",
+                lambda: write_snapshot(settings.metrics_multiproc_dir),
+                settings.metrics_flush_seconds,
+            )
+            metrics_writer.start()
         yield
+        if metrics_writer is not None:
+            await metrics_writer.stop()
+            write_snapshot(settings.metrics_multiproc_dir)
+        await cache_version_poller.stop()
+        await ledger_checker.stop()
+        await summary_reconciler.stop()
+        if async_engine is not None:
+            await async_engine.dispose()
 
     api = FastAPI(
         title="LojaControl API",
         description="API fullstack com autenticacao JWT, painel admin e fluxo de compras.",
         version="2.0.0",
         lifespan=lifespan,
+        default_response_class=FastJSONResponse,
         contact={"name": "Felipe", "email": "felipecardoso1328@gmail.com"},
         openapi_tags=[
             {"name": "auth", "description": "Cadastro, login e refresh de tokens"},
@@ -44,14 +91,30 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
-    api.add_middleware(AuthContextMiddleware)
-    api.add_middleware(RequestLoggingMiddleware)
+    # Pure ASGI middlewares, outermost last:
+    # logging -> auth context -> rate limit -> read-your-writes -> compression -> CORS.
+    if settings.compression_enabled:
+        api.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_min_bytes,
+            gzip_level=settings.compression_gzip_level,
+        )
+    if settings.database_replica_urls:
+        api.add_middleware(
+            ReadYourWritesMiddleware,
+            cookie_name=WRITE_MARKER_COOKIE,
+            window_seconds=settings.replica_stickiness_seconds,
+            secure=settings.environment == "production",
+        )
     if settings.rate_limit_enabled:
         api.add_middleware(
             RateLimitMiddleware,
             requests_limit=settings.rate_limit_requests,
             window_seconds=settings.rate_limit_window_seconds,
+            backend=create_rate_limit_backend(settings),
         )
+    api.add_middleware(AuthContextMiddleware)
+    api.add_middleware(RequestLoggingMiddleware)
 
     register_exception_handlers(api)
 
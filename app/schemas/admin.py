@@ -1,20 +1,23 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from app.schemas.common import Amount
+
 
 class ProdutoCreatePayload(BaseModel):
     nome: str = Field(min_length=2, max_length=120)
     descricao: str = Field(default="", max_length=300)
-    preco: float = Field(gt=0)
+    preco: Amount
 
 
 class ProdutoUpdatePayload(BaseModel):
     nome: Optional[str] = Field(default=None, min_length=2, max_length=120)
     descricao: Optional[str] = Field(default=None, max_length=300)
-    preco: Optional[float] = Field(default=None, gt=0)
+    preco: Optional[Amount] = None
 
 
 class SiteConfigPayload(BaseModel):
@@ -25,3 +28,21 @@ class SiteConfigPayload(BaseModel):
     accent_color: str = Field(pattern=r"^#[0-9A-Fa-f]{6}$")
     highlight_color: str = Field(pattern=r"^#[0-9A-Fa-f]{6}$")
 
+
+@dataclass(slots=True)
+class SiteConfigResponse:
+    site_name: str
+    tagline: str
+    hero_title: str
+    hero_subtitle: str
+    accent_color: str
+    highlight_color: str
+
+
+@dataclass(slots=True)
+class ResumoResponse:
+    usuarios: int
+    produtos: int
+    pedidos: int
+    faturamento: float
+    saldo_total: float
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+
 from pydantic import BaseModel, Field
 
+from app.schemas.common import OptionalAmount
+
 
 class RegisterUserPayload(BaseModel):
     nome: str = Field(min_length=2, max_length=80)
     email: str = Field(min_length=5, max_length=120)
     password: str = Field(min_length=6, max_length=100)
-    saldo_inicial: float = Field(default=0, ge=0)
+    saldo_inicial: OptionalAmount = 0
 
 
 class LoginPayload(BaseModel):
@@ -17,3 +21,33 @@ class LoginPayload(BaseModel):
 
 class RefreshTokenPayload(BaseModel):
     refresh_token: str = Field(min_length=20)
+
+
+@dataclass(slots=True)
+class ContaResponse:
+    id: int
+    nome: str
+    email: str
+    role: str
+    # Only user accounts with a profile carry these; the auth routes drop them when None.
+    usuario_id: int | None = None
+    saldo: float | None = None
+
+
+@dataclass(slots=True)
+class ContaAtualResponse:
+    account: ContaResponse
+
+
+@dataclass(slots=True)
+class CadastroResponse:
+    message: str
+    account: ContaResponse
+
+
+@dataclass(slots=True)
+class SessaoResponse:
+    token: str
+    access_token: str
+    token_type: str
+    account: ContaResponse
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Annotated, Generic, TypeVar
+
+from pydantic import AfterValidator, Field
+
+from app.core.money import MAX_AMOUNT, require_cents
+
+T = TypeVar("T")
+
+# Monetary inputs in reais, in whole cents; both bounds keep `to_cents` inside the BIGINT columns.
+Amount = Annotated[float, Field(gt=0, le=MAX_AMOUNT), AfterValidator(require_cents)]
+OptionalAmount = Annotated[float, Field(ge=0, le=MAX_AMOUNT), AfterValidator(require_cents)]
+
+
+# Response structs are slotted dataclasses: cheap to build per row; the routers declare them as
+# response_model, which keeps the OpenAPI schema exact and is applied by FastJSONRoute.
+@dataclass(slots=True)
+class Page(Generic[T]):
+    items: list[T]
+    total: int | None
+    page: int | None
+    size: int
+    pages: int | None
+    next_cursor: str | None
+    prev_cursor: str | None
@@ -1,12 +1,56 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+
 from pydantic import BaseModel, Field
 
+from app.schemas.common import Amount
+
 
 class CheckoutPayload(BaseModel):
     produtos_ids: list[int] = Field(min_length=1)
 
 
 class RecargaPayload(BaseModel):
-    valor: float = Field(gt=0)
+    valor: Amount
+
+
+@dataclass(slots=True)
+class ProdutoResponse:
+    id: int
+    nome: str
+    descricao: str
+    preco: float
+
+
+@dataclass(slots=True)
+class PedidoProdutoResponse:
+    # Snapshot taken at checkout; `id` is null once the product is deleted.
+    id: int | None
+    nome: str
+    preco: float
+    quantidade: int
+
+
+@dataclass(slots=True)
+class PedidoResponse:
+    id: int
+    usuario_id: int
+    usuario_nome: str
+    produtos_ids: list[int]
+    produtos: list[PedidoProdutoResponse]
+    total: float
+    created_at: str
+
+
+@dataclass(slots=True)
+class UsuarioResponse:
+    id: int
+    nome: str
+    email: str
+    saldo: float
+
 
+@dataclass(slots=True)
+class SaldoResponse:
+    saldo: float
@@ -5,7 +5,10 @@ from datetime import datetime, timezone
 from fastapi import HTTPException
 from sqlalchemy import select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.money import to_cents, to_reais
+from app.core.password_hashing import PasswordHashPoolSaturated, password_hash_pool
 from app.core.security import (
     create_token_pair,
     decode_access_token,
@@ -16,45 +19,48 @@ from app.core.security import (
     verify_password,
 )
 from app.db.models import Account, RefreshToken, User
-from app.schemas.auth import LoginPayload, RegisterUserPayload
+from app.db.session import DbSession, run_db
+from app.schemas.auth import CadastroResponse, ContaAtualResponse, ContaResponse, LoginPayload, RegisterUserPayload
+from app.services import balance_service, identity_cache, summary_service
 
 
 def normalize_email(email: str) -> str:
     return email.strip().lower()
 
 
-def _round_money(value: float) -> float:
-    return round(float(value), 2)
-
-
-def account_public_payload(account: Account) -> dict:
-    payload = {
-        "id": account.id,
-        "nome": account.nome,
-        "email": account.email,
-        "role": account.role,
-    }
-    if account.role == "user" and account.user:
-        payload["usuario_id"] = account.user.id
-        payload["saldo"] = _round_money(account.user.saldo)
+def account_public_payload(account: Account, user: User | None = None) -> ContaResponse:
+    payload = ContaResponse(account.id, account.nome, account.email, account.role)
+    if account.role == "user":
+        user = user if user is not None else account.user
+        if user:
+            payload.usuario_id = user.id
+            payload.saldo = to_reais(user.saldo)
     return payload
 
 
-def _verify_account_password(db: Session, account: Account, password: str) -> bool:
+def _check_account_password(account: Account, password: str) -> tuple[bool, str | None]:
     if account.password_algo == "pbkdf2":
         if not account.password_salt:
-            return False
+            return False, None
         valid = verify_legacy_pbkdf2_password(password, account.password_salt, account.password_hash)
-        if valid:
-            account.password_hash = hash_password(password)
-            account.password_algo = "bcrypt"
-            account.password_salt = None
-            db.add(account)
-            db.commit()
-            db.refresh(account)
-        return valid
+        return valid, hash_password(password) if valid else None
+
+    return verify_password(password, account.password_hash), None
+
+
+def _migrate_password_hash(account: Account, new_hash: str | None) -> None:
+    if not new_hash:
+        return
+    account.password_hash = new_hash
+    account.password_algo = "bcrypt"
+    account.password_salt = None
 
-    return verify_password(password, account.password_hash)
+
+def get_account_profile(db: Session, account: Account) -> ContaAtualResponse:
+    user = None
+    if account.role == "user" and account.usuario_id:
+        user = identity_cache.get_user(db, int(account.usuario_id))
+    return ContaAtualResponse(account_public_payload(account, user))
 
 
 def _to_aware_utc(value: datetime) -> datetime:
@@ -91,55 +97,100 @@ def _issue_token_bundle(db: Session, account: Account) -> dict:
     }
 
 
-def register_user(db: Session, payload: RegisterUserPayload) -> dict:
-    email = normalize_email(payload.email)
+def _ensure_email_available(db: Session, email: str) -> None:
     existing_account = db.scalar(select(Account).where(Account.email == email))
     if existing_account:
         raise HTTPException(status_code=409, detail="Ja existe uma conta com este e-mail.")
 
+
+def _create_user_account(db: Session, payload: RegisterUserPayload, password_hash: str) -> CadastroResponse:
+    email = normalize_email(payload.email)
     user = db.scalar(select(User).where(User.email == email))
     if not user:
         user = User(
             nome=payload.nome.strip(),
             email=email,
-            saldo=_round_money(payload.saldo_inicial),
+            saldo=to_cents(payload.saldo_inicial),
         )
         db.add(user)
         db.flush()
+        if user.saldo:
+            balance_service.record(db, user.id, "adjustment", user.saldo, user.saldo)
+        summary_delta = {"usuarios": 1, "saldo_total": user.saldo}
     else:
+        # A users row without an account (legacy import): its balance moves through the ledger,
+        # only if nothing changed it since it was read.
         user.nome = payload.nome.strip()
-        user.saldo = _round_money(payload.saldo_inicial)
+        delta = to_cents(payload.saldo_inicial) - user.saldo
+        if delta:
+            changed = balance_service.apply_change(db, user.id, "adjustment", delta, User.saldo == user.saldo)
+            if changed is None:
+                db.rollback()
+                raise HTTPException(status_code=409, detail="Saldo alterado durante o cadastro. Tente novamente.")
+            set_committed_value(user, "saldo", changed.saldo)
+        identity_cache.invalidate_user(user.id)
+        summary_delta = {"saldo_total": delta}
 
     account = Account(
         nome=payload.nome.strip(),
         email=email,
         role="user",
         usuario_id=user.id,
-        password_hash=hash_password(payload.password),
+        password_hash=password_hash,
         password_salt=None,
         password_algo="bcrypt",
     )
     db.add(account)
+    summary_service.apply_delta(db, **summary_delta)
     db.commit()
     db.refresh(account)
-    return {"message": "Conta criada com sucesso.", "account": account_public_payload(account)}
+    return CadastroResponse("Conta criada com sucesso.", account_public_payload(account))
 
 
-def login_by_role(db: Session, payload: LoginPayload, role: str) -> dict:
+async def _run_password_job(fn, *args):
+    # Every bcrypt/PBKDF2 call goes through the bounded pool; there is no inline path.
+    try:
+        return await password_hash_pool.run(fn, *args)
+    except PasswordHashPoolSaturated as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="Autenticacao sobrecarregada. Tente novamente em instantes.",
+            headers={"Retry-After": "1"},
+        ) from exc
+
+
+async def register_user_async(db: DbSession, payload: RegisterUserPayload) -> CadastroResponse:
+    await run_db(db, _ensure_email_available, normalize_email(payload.email))
+    password_hash = await _run_password_job(hash_password, payload.password)
+    return await run_db(db, _create_user_account, payload, password_hash)
+
+
+def _get_login_account(db: Session, payload: LoginPayload, role: str) -> Account:
     email = normalize_email(payload.email)
     account = db.scalar(select(Account).where(Account.email == email))
     if not account or account.role != role:
         raise HTTPException(status_code=401, detail="Credenciais invalidas.")
+    return account
 
-    if not _verify_account_password(db, account, payload.password):
-        raise HTTPException(status_code=401, detail="Credenciais invalidas.")
 
+def _complete_login(db: Session, account: Account, new_password_hash: str | None = None) -> dict:
+    _migrate_password_hash(account, new_password_hash)
     _cleanup_expired_refresh_tokens(db)
     bundle = _issue_token_bundle(db, account)
     db.commit()
+    if new_password_hash:
+        identity_cache.invalidate_account(account.id)
     return {**bundle, "account": account_public_payload(account)}
 
 
+async def login_by_role_async(db: DbSession, payload: LoginPayload, role: str) -> dict:
+    account = await run_db(db, _get_login_account, payload, role)
+    valid, new_password_hash = await _run_password_job(_check_account_password, account, payload.password)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Credenciais invalidas.")
+    return await run_db(db, _complete_login, account, new_password_hash)
+
+
 def refresh_session(db: Session, refresh_token: str) -> dict:
     try:
         payload = decode_refresh_token(refresh_token)
@@ -183,6 +234,7 @@ def logout_account(db: Session, account: Account) -> None:
         .values(revoked=True)
     )
     db.commit()
+    identity_cache.invalidate_account(account.id)
 
 
 def get_account_from_token(db: Session, token: str) -> Account:
@@ -197,7 +249,7 @@ def get_account_from_token(db: Session, token: str) -> Account:
     except (TypeError, ValueError):
         raise HTTPException(status_code=401, detail="Sessao invalida ou expirada.")
 
-    account = db.get(Account, account_id)
+    account = identity_cache.get_account(db, account_id)
     if not account:
         raise HTTPException(status_code=401, detail="Conta nao encontrada.")
     return account
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import ColumnElement, Row, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.core.money import to_reais
+from app.db.models import BalanceLedger, User
+from app.db.session import SessionLocal
+
+logger = logging.getLogger("app.balance")
+
+
+def change_balance(db: Session, user_id: int, delta: int, *conditions: ColumnElement[bool]) -> Row | None:
+    # The only way balances move: one relative UPDATE ... RETURNING, so concurrent changes
+    # serialize on the row lock instead of overwriting each other. None when no row matched
+    # (unknown user, or `conditions` such as `User.saldo >= total` not met).
+    return db.execute(
+        update(User)
+        .where(User.id == user_id, *conditions)
+        .values(saldo=User.saldo + delta)
+        .returning(User.nome, User.saldo)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+
+def record(
+    db: Session,
+    user_id: int,
+    kind: str,
+    amount: int,
+    balance_after: int,
+    order_id: int | None = None,
+) -> None:
+    db.execute(
+        insert(BalanceLedger).values(
+            user_id=user_id,
+            kind=kind,
+            amount=amount,
+            balance_after=balance_after,
+            order_id=order_id,
+            created_at=datetime.now(timezone.utc),
+        )
+    )
+
+
+def apply_change(
+    db: Session,
+    user_id: int,
+    kind: str,
+    amount: int,
+    *conditions: ColumnElement[bool],
+) -> Row | None:
+    changed = change_balance(db, user_id, amount, *conditions)
+    if changed is not None:
+        record(db, user_id, kind, amount, changed.saldo)
+    return changed
+
+
+def open_balances(db: Session) -> None:
+    # Seeds one adjustment per user with the balance they already hold (legacy import).
+    db.execute(
+        insert(BalanceLedger).from_select(
+            ["user_id", "kind", "amount", "balance_after", "created_at"],
+            select(
+                User.id,
+                literal("adjustment"),
+                User.saldo,
+                User.saldo,
+                literal(datetime.now(timezone.utc), BalanceLedger.created_at.type),
+            ).where(User.saldo != 0),
+        )
+    )
+
+
+def find_mismatches(db: Session) -> list[dict]:
+    ledger = (
+        select(BalanceLedger.user_id, func.sum(BalanceLedger.amount).label("total"))
+        .group_by(BalanceLedger.user_id)
+        .subquery()
+    )
+    ledger_total = func.coalesce(ledger.c.total, 0)
+    rows = db.execute(
+        select(User.id, User.saldo, ledger_total.label("ledger"))
+        .outerjoin(ledger, ledger.c.user_id == User.id)
+        .where(User.saldo != ledger_total)
+        .order_by(User.id.asc())
+    )
+    return [
+        {"usuario_id": row.id, "saldo": to_reais(row.saldo), "ledger": to_reais(row.ledger)}
+        for row in rows
+    ]
+
+
+def run_ledger_check() -> None:
+    with SessionLocal() as db:
+        mismatches = find_mismatches(db)
+    if mismatches:
+        logger.warning(
+            "balance_ledger_mismatch",
+            extra={"details": {"users": len(mismatches), "sample": mismatches[:20]}},
+        )
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable, Hashable
+
+from fastapi import Request, Response
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.http_cache import compute_etag, is_not_modified, not_modified_response
+from app.core.response_cache import CachedResponse, ResponseCache
+from app.core.responses import dumps
+from app.db.models import CacheVersion
+from app.db.session import SessionLocal, stick_to_primary
+
+settings = get_settings()
+
+CATALOG = "catalog"
+SITE_CONFIG = "site_config"
+
+response_cache = ResponseCache(
+    max_bytes=settings.response_cache_max_bytes,
+    ttl_seconds=settings.response_cache_ttl_seconds,
+)
+cross_worker_enabled = settings.cache_version_poll_seconds > 0
+
+
+async def cached_json(
+    request: Request,
+    namespace: str,
+    key: Hashable,
+    loader: Callable[[], Awaitable[Any]],
+) -> Response:
+    entry = response_cache.get(namespace, key)
+    cache_status = "HIT"
+    if entry is None:
+        # Read the version before loading so a concurrent invalidation discards this body.
+        version = response_cache.version(namespace)
+        body = dumps(await loader())
+        entry = CachedResponse(body, compute_etag(body))
+        response_cache.set(namespace, version, key, entry)
+        cache_status = "MISS"
+
+    headers = {"ETag": entry.etag, "Cache-Control": settings.api_cache_control, "X-Cache": cache_status}
+    if is_not_modified(request, entry.etag):
+        return not_modified_response(headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def mark_changed(db: Session, namespace: str) -> None:
+    # Called inside the writing transaction so the shared version moves with the data.
+    if not cross_worker_enabled:
+        return
+    result = db.execute(
+        update(CacheVersion).where(CacheVersion.namespace == namespace).values(version=CacheVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        db.execute(insert(CacheVersion).values(namespace=namespace, version=1))
+
+
+def invalidate(namespace: str) -> None:
+    # Reloads right after a change must not repopulate the cache from a lagging replica.
+    stick_to_primary()
+    response_cache.invalidate(namespace)
+
+
+def poll_versions(cache: ResponseCache = response_cache) -> None:
+    with SessionLocal() as db:
+        rows = db.execute(select(CacheVersion.namespace, CacheVersion.version)).all()
+    if cache.sync_versions({namespace: int(version) for namespace, version in rows}):
+        stick_to_primary()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import csv
+import io
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Iterator, Literal, TypeVar
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import ColumnElement, Select, select
+
+from app.core.responses import dumps
+from app.db.models import Order, OrderItem, Product, User
+from app.db.session import SessionLocal
+from app.schemas.shop import PedidoResponse
+from app.services.admin_service import user_payload
+from app.services.shop_service import order_payloads, order_rows_query, product_payload
+
+ExportFormat = Literal["ndjson", "csv"]
+T = TypeVar("T")
+
+EXPORT_BATCH_SIZE = 500
+FLUSH_ROWS = 200
+
+USER_FIELDS = ("id", "nome", "email", "saldo")
+PRODUCT_FIELDS = ("id", "nome", "descricao", "preco")
+ORDER_FIELDS = ("id", "usuario_id", "usuario_nome", "produtos_ids", "total", "created_at")
+
+
+def _order_csv_row(order: PedidoResponse) -> tuple:
+    produtos_ids = ";".join(str(item) for item in order.produtos_ids)
+    return order.id, order.usuario_id, order.usuario_nome, produtos_ids, order.total, order.created_at
+
+
+def _stream_rows(query: Select, to_row: Callable[[Any], T]) -> Iterator[T]:
+    # Own session: the request-scoped one is not guaranteed to outlive the handler.
+    # yield_per fetches in batches (server-side cursor where supported) and the identity
+    # map only holds rows weakly, so memory stays flat regardless of table size.
+    with SessionLocal() as db:
+        for instance in db.scalars(query.execution_options(yield_per=EXPORT_BATCH_SIZE)):
+            yield to_row(instance)
+
+
+def _iter_ndjson(rows: Iterable[Any]) -> Iterator[bytes]:
+    lines: list[bytes] = []
+    for row in rows:
+        lines.append(dumps(row))
+        if len(lines) >= FLUSH_ROWS:
+            yield b"\n".join(lines) + b"\n"
+            lines.clear()
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+def _iter_csv(rows: Iterable[Any], fieldnames: tuple[str, ...], to_csv_row: Callable | None) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fieldnames)
+    to_csv_row = to_csv_row or attrgetter(*fieldnames)
+    pending = 0
+    for row in rows:
+        writer.writerow(to_csv_row(row))
+        pending += 1
+        if pending >= FLUSH_ROWS:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode()
+
+
+def _export_response(
+    rows: Iterator[Any],
+    export_format: ExportFormat,
+    filename: str,
+    fieldnames: tuple[str, ...],
+    to_csv_row: Callable | None = None,
+) -> StreamingResponse:
+    if export_format == "csv":
+        body = _iter_csv(rows, fieldnames, to_csv_row)
+        media_type = "text/csv; charset=utf-8"
+    else:
+        body = _iter_ndjson(rows)
+        media_type = "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
+
+
+def _stream_orders(*filters: ColumnElement[bool]) -> Iterator[PedidoResponse]:
+    # Same column path as the order listings: keyset batches of order rows, and one query over
+    # `order_items` per batch, instead of hydrating Order/User/OrderItem instances.
+    query = order_rows_query().where(*filters).order_by(Order.id.desc()).limit(EXPORT_BATCH_SIZE)
+    with SessionLocal() as db:
+        batch = db.execute(query).all()
+        while batch:
+            yield from order_payloads(db, batch, OrderItem.order_id.in_([order.id for order in batch]))
+            if len(batch) < EXPORT_BATCH_SIZE:
+                break
+            batch = db.execute(query.where(Order.id < batch[-1].id)).all()
+
+
+def export_users(export_format: ExportFormat) -> StreamingResponse:
+    rows = _stream_rows(select(User).order_by(User.id.asc()), user_payload)
+    return _export_response(rows, export_format, "usuarios", USER_FIELDS)
+
+
+def export_products(export_format: ExportFormat) -> StreamingResponse:
+    rows = _stream_rows(select(Product).order_by(Product.id.asc()), product_payload)
+    return _export_response(rows, export_format, "produtos", PRODUCT_FIELDS)
+
+
+def export_orders(export_format: ExportFormat) -> StreamingResponse:
+    rows = _stream_orders()
+    return _export_response(rows, export_format, "pedidos", ORDER_FIELDS, _order_csv_row)
+
+
+def export_user_orders(usuario_id: int, export_format: ExportFormat) -> StreamingResponse:
+    rows = _stream_orders(Order.usuario_id == usuario_id)
+    return _export_response(rows, export_format, "pedidos", ORDER_FIELDS, _order_csv_row)
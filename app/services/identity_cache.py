@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import Any, TypeVar
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.db.models import Account, User
+
+settings = get_settings()
+ModelT = TypeVar("ModelT", Account, User)
+
+_cache_size = 10_000 if settings.identity_cache_ttl_seconds > 0 else 0
+account_cache = TTLCache(maxsize=_cache_size, ttl_seconds=settings.identity_cache_ttl_seconds)
+user_cache = TTLCache(maxsize=_cache_size, ttl_seconds=settings.identity_cache_ttl_seconds)
+
+
+def _snapshot(instance: Any) -> dict[str, Any]:
+    return {attr.key: getattr(instance, attr.key) for attr in inspect(type(instance)).column_attrs}
+
+
+def _attach(db: Session, model: type[ModelT], snapshot: dict[str, Any]) -> ModelT:
+    # Rebuild a detached instance and merge it without a SELECT (load=False).
+    instance = model(**snapshot)
+    make_transient_to_detached(instance)
+    return db.merge(instance, load=False)
+
+
+def _get_cached(db: Session, cache: TTLCache, model: type[ModelT], identity: int) -> ModelT | None:
+    snapshot = cache.get(identity)
+    if snapshot is not None:
+        return _attach(db, model, snapshot)
+
+    instance = db.get(model, identity)
+    if instance is not None:
+        cache.set(identity, _snapshot(instance))
+    return instance
+
+
+def get_account(db: Session, account_id: int) -> Account | None:
+    return _get_cached(db, account_cache, Account, account_id)
+
+
+def get_user(db: Session, user_id: int) -> User | None:
+    return _get_cached(db, user_cache, User, user_id)
+
+
+def invalidate_account(account_id: int) -> None:
+    account_cache.invalidate(account_id)
+
+
+def invalidate_user(user_id: int) -> None:
+    user_cache.invalidate(user_id)
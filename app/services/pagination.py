@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import Select
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from app.core.cache import TTLCache
+
+# Totals requested together with a cursor are allowed to be a few seconds stale.
+count_cache = TTLCache(maxsize=1024, ttl_seconds=10)
+
+
+def encode_cursor(key: int) -> str:
+    raw = json.dumps({"id": int(key)}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return int(data["id"])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Cursor de paginacao invalido.") from None
+
+
+def _count(db: Session, count_query: Select, cached: bool) -> int:
+    if not cached:
+        return int(db.scalar(count_query) or 0)
+
+    compiled = count_query.compile()
+    cache_key = (str(compiled), tuple(sorted(compiled.params.items())))
+    total = count_cache.get(cache_key)
+    if total is None:
+        total = int(db.scalar(count_query) or 0)
+        count_cache.set(cache_key, total)
+    return total
+
+
+def paginate(
+    db: Session,
+    data_query: Select,
+    count_query: Select,
+    key: InstrumentedAttribute,
+    size: int,
+    page: int = 1,
+    after: str | None = None,
+    before: str | None = None,
+    with_total: bool | None = None,
+    descending: bool = False,
+) -> tuple[list[Any], dict]:
+    if after and before:
+        raise HTTPException(status_code=400, detail="Use apenas um cursor: after ou before.")
+
+    keyset = bool(after or before)
+    if with_total is None:
+        with_total = not keyset
+
+    # `before` walks against the listing order, so the query is flipped and the rows reversed.
+    backwards = bool(before)
+    query = data_query
+    if keyset:
+        anchor = decode_cursor(after or before)
+        query = query.where(key < anchor if descending != backwards else key > anchor)
+        query = query.order_by(key.asc() if descending == backwards else key.desc())
+    else:
+        query = query.order_by(key.desc() if descending else key.asc()).offset((page - 1) * size)
+
+    rows = list(db.execute(query.limit(size + 1)).all())
+    has_more = len(rows) > size
+    rows = rows[:size]
+    if backwards:
+        rows.reverse()
+
+    if backwards:
+        has_next, has_prev = bool(rows), has_more
+    elif keyset:
+        has_next, has_prev = has_more, bool(rows)
+    else:
+        has_next, has_prev = has_more, page > 1 and bool(rows)
+
+    meta: dict = {
+        "total": None,
+        "page": None if keyset else page,
+        "size": size,
+        "pages": None,
+        "next_cursor": encode_cursor(getattr(rows[-1], key.key)) if has_next else None,
+        "prev_cursor": encode_cursor(getattr(rows[0], key.key)) if has_prev else None,
+    }
+    if with_total:
+        total = _count(db, count_query, cached=keyset)
+        meta["total"] = total
+        meta["pages"] = (total + size - 1) // size if total > 0 else 0
+    return rows, meta
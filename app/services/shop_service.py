@@ -1,69 +1,108 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import hashlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 
 from fastapi import HTTPException
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import ColumnElement, Row, Select, delete, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 
-from app.db.models import Account, Order, OrderItem, Product, User
+from app.core.config import get_settings
+from app.core.money import to_cents, to_reais
+from app.db.models import Account, IdempotencyKey, Order, OrderItem, Product, User
+from app.schemas.common import Page
+from app.schemas.shop import (
+    PedidoProdutoResponse,
+    PedidoResponse,
+    ProdutoResponse,
+    SaldoResponse,
+    UsuarioResponse,
+)
+from app.services import balance_service, identity_cache, summary_service
+from app.services.pagination import paginate
 
+settings = get_settings()
 
-def _round_money(value: float) -> float:
-    return round(float(value), 2)
+
+# List endpoints select plain columns: no identity map, no relationship loading,
+# just Row tuples whose attribute names match what the payload builders read.
+PRODUCT_COLUMNS = (Product.id, Product.nome, Product.descricao, Product.preco)
 
 
 def _format_datetime(value: datetime) -> str:
     return value.strftime("%Y-%m-%d %H:%M:%S")
 
 
-def _get_user_for_account(db: Session, account: Account) -> User:
+def _user_id_for_account(account: Account) -> int:
     if account.role != "user":
         raise HTTPException(status_code=403, detail="Acesso restrito a usuarios.")
     if not account.usuario_id:
         raise HTTPException(status_code=400, detail="Conta sem perfil vinculado.")
+    return int(account.usuario_id)
+
 
-    user = db.get(User, int(account.usuario_id))
+def _get_user_for_account(db: Session, account: Account) -> User:
+    user = identity_cache.get_user(db, _user_id_for_account(account))
     if not user:
         raise HTTPException(status_code=404, detail="Perfil de usuario nao encontrado.")
     return user
 
 
-def product_payload(product: Product) -> dict:
-    return {
-        "id": product.id,
-        "nome": product.nome,
-        "descricao": product.descricao,
-        "preco": _round_money(product.preco),
-    }
+def product_payload(product: Product) -> ProdutoResponse:
+    return ProdutoResponse(product.id, product.nome, product.descricao, to_reais(product.preco))
+
+
+def _order_response(order: Order | Row, usuario_nome: str | None, items: list) -> PedidoResponse:
+    # `items` are order lines (ORM or Row) carrying the name/price snapshot taken at checkout.
+    return PedidoResponse(
+        id=order.id,
+        usuario_id=order.usuario_id,
+        usuario_nome=usuario_nome if usuario_nome is not None else "Desconhecido",
+        produtos_ids=[
+            item.product_id for item in items if item.product_id is not None for _ in range(item.quantidade)
+        ],
+        produtos=[
+            PedidoProdutoResponse(item.product_id, item.nome, to_reais(item.preco), item.quantidade)
+            for item in items
+        ],
+        total=to_reais(order.total),
+        created_at=_format_datetime(order.created_at),
+    )
 
 
-def order_payload(order: Order) -> dict:
-    products = []
-    for item in order.items:
-        if not item.product:
-            continue
-        products.append(
-            {
-                "id": item.product.id,
-                "nome": item.product.nome,
-                "preco": _round_money(item.product.preco),
-            }
-        )
+def order_payload(order: Order) -> PedidoResponse:
+    return _order_response(order, order.user.nome if order.user else None, order.items)
 
-    return {
-        "id": order.id,
-        "usuario_id": order.usuario_id,
-        "usuario_nome": order.user.nome if order.user else "Desconhecido",
-        "produtos_ids": [item.product_id for item in order.items],
-        "produtos": products,
-        "total": _round_money(order.total),
-        "created_at": _format_datetime(order.created_at),
-    }
+
+def order_rows_query() -> Select:
+    return select(
+        Order.id,
+        Order.usuario_id,
+        User.nome.label("usuario_nome"),
+        Order.total,
+        Order.created_at,
+    ).outerjoin(User, User.id == Order.usuario_id)
+
+
+def order_payloads(db: Session, orders: list[Row], *item_filters: ColumnElement[bool]) -> list[PedidoResponse]:
+    # Lines of every listed order come back in one query over `order_items` alone and are
+    # grouped in a single pass; `item_filters` narrows it to the same orders as the listing.
+    items_query = (
+        select(OrderItem.order_id, OrderItem.product_id, OrderItem.nome, OrderItem.preco, OrderItem.quantidade)
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(*item_filters)
+        .order_by(OrderItem.id.asc())
+    )
+    lines: dict[int, list[Row]] = {}
+    for item in db.execute(items_query):
+        lines.setdefault(item.order_id, []).append(item)
+    return [_order_response(order, order.usuario_nome, lines.get(order.id, [])) for order in orders]
 
 
-def list_products(db: Session) -> list[dict]:
-    products = db.scalars(select(Product).order_by(Product.id.asc())).all()
+def list_products(db: Session) -> list[ProdutoResponse]:
+    products = db.execute(select(*PRODUCT_COLUMNS).order_by(Product.id.asc()))
     return [product_payload(item) for item in products]
 
 
@@ -74,155 +113,198 @@ def list_products_paginated(
     search: str | None = None,
     min_preco: float | None = None,
     max_preco: float | None = None,
-) -> dict:
+    after: str | None = None,
+    before: str | None = None,
+    with_total: bool | None = None,
+) -> Page[ProdutoResponse]:
     filters = []
     if search:
         pattern = f"%{search.strip().lower()}%"
         filters.append(func.lower(Product.nome).like(pattern))
     if min_preco is not None:
-        filters.append(Product.preco >= float(min_preco))
+        filters.append(Product.preco >= to_cents(min_preco))
     if max_preco is not None:
-        filters.append(Product.preco <= float(max_preco))
+        filters.append(Product.preco <= to_cents(max_preco))
 
     count_query = select(func.count(Product.id))
-    data_query = select(Product)
+    data_query = select(*PRODUCT_COLUMNS)
     if filters:
         count_query = count_query.where(*filters)
         data_query = data_query.where(*filters)
 
-    total = int(db.scalar(count_query) or 0)
-    offset = (page - 1) * size
-
-    items = db.scalars(
-        data_query.order_by(Product.id.asc()).offset(offset).limit(size)
-    ).all()
-
-    pages = (total + size - 1) // size if total > 0 else 0
-    return {
-        "items": [product_payload(item) for item in items],
-        "total": total,
-        "page": page,
-        "size": size,
-        "pages": pages,
-    }
+    items, meta = paginate(
+        db,
+        data_query,
+        count_query,
+        Product.id,
+        size=size,
+        page=page,
+        after=after,
+        before=before,
+        with_total=with_total,
+    )
+    return Page([product_payload(item) for item in items], **meta)
 
 
-def get_user_profile(db: Session, account: Account) -> dict:
+def get_user_profile(db: Session, account: Account) -> UsuarioResponse:
     user = _get_user_for_account(db, account)
-    return {
-        "id": user.id,
-        "nome": user.nome,
-        "email": user.email,
-        "saldo": _round_money(user.saldo),
-    }
+    return UsuarioResponse(user.id, user.nome, user.email, to_reais(user.saldo))
 
 
-def recharge_balance(db: Session, account: Account, valor: float) -> dict:
-    user = _get_user_for_account(db, account)
-    user.saldo = _round_money(user.saldo + float(valor))
-    db.add(user)
+def recharge_balance(db: Session, account: Account, valor: float) -> SaldoResponse:
+    user_id = _user_id_for_account(account)
+    valor = to_cents(valor)
+    changed = balance_service.apply_change(db, user_id, "recharge", valor)
+    if changed is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Perfil de usuario nao encontrado.")
+    summary_service.apply_delta(db, saldo_total=valor)
     db.commit()
-    db.refresh(user)
-    return {"saldo": _round_money(user.saldo)}
+    identity_cache.invalidate_user(user_id)
+    return SaldoResponse(to_reais(changed.saldo))
 
 
-def checkout(db: Session, account: Account, produtos_ids: list[int]) -> dict:
-    user = _get_user_for_account(db, account)
+def _checkout_fingerprint(produtos_ids: list[int]) -> str:
+    # The basket as a multiset: a retry that lists the same items in another order is the same order.
+    basket = sorted(Counter(int(item) for item in produtos_ids).items())
+    return hashlib.sha256(",".join(f"{item}x{quantity}" for item, quantity in basket).encode("ascii")).hexdigest()
+
+
+def _replay_checkout(db: Session, account: Account, idempotency_key: str, request_hash: str) -> PedidoResponse | None:
+    stored = db.execute(
+        select(IdempotencyKey.request_hash, IdempotencyKey.order_id).where(
+            IdempotencyKey.account_id == account.id,
+            IdempotencyKey.key == idempotency_key,
+            IdempotencyKey.expires_at > datetime.now(timezone.utc),
+        )
+    ).first()
+    if stored is None:
+        return None
+    if stored.request_hash != request_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key ja usada em outro pedido.")
+    orders = db.execute(order_rows_query().where(Order.id == stored.order_id)).all()
+    return order_payloads(db, orders, Order.id == stored.order_id)[0]
+
+
+def checkout(
+    db: Session,
+    account: Account,
+    produtos_ids: list[int],
+    idempotency_key: str | None = None,
+) -> PedidoResponse:
+    user_id = _user_id_for_account(account)
+    request_hash = _checkout_fingerprint(produtos_ids)
+    if idempotency_key:
+        replay = _replay_checkout(db, account, idempotency_key, request_hash)
+        if replay is not None:
+            return replay
 
     unique_ids = sorted(set(int(item) for item in produtos_ids))
     products_lookup = {
         product.id: product
-        for product in db.scalars(select(Product).where(Product.id.in_(unique_ids)))
+        for product in db.execute(select(Product.id, Product.nome, Product.preco).where(Product.id.in_(unique_ids)))
     }
-
-    valid_products: list[Product] = []
-    invalid_ids: list[str] = []
-    for raw_id in produtos_ids:
-        product = products_lookup.get(int(raw_id))
-        if product:
-            valid_products.append(product)
-        else:
-            invalid_ids.append(str(raw_id))
-
+    invalid_ids = [str(raw_id) for raw_id in produtos_ids if int(raw_id) not in products_lookup]
     if invalid_ids:
         raise HTTPException(status_code=404, detail=f"Produto(s) invalido(s): {', '.join(invalid_ids)}.")
 
-    total = _round_money(sum(float(item.preco) for item in valid_products))
-    if float(user.saldo) < total:
-        missing = _round_money(total - float(user.saldo))
-        raise HTTPException(status_code=400, detail=f"Saldo insuficiente. Faltam R$ {missing:.2f}.")
+    # One line per product, in the order first seen, with the name/price paid right now.
+    quantities = Counter(int(raw_id) for raw_id in produtos_ids)
+    total = sum(products_lookup[product_id].preco * quantity for product_id, quantity in quantities.items())
 
-    user.saldo = _round_money(float(user.saldo) - total)
-    order = Order(usuario_id=user.id, total=total, created_at=datetime.now(timezone.utc))
+    now = datetime.now(timezone.utc)
+    if idempotency_key:
+        db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.account_id == account.id, IdempotencyKey.expires_at <= now)
+        )
+
+    # Check and decrement in one statement: concurrent checkouts serialize on the row
+    # lock and each one re-evaluates `saldo >= total` against the committed balance.
+    charged = balance_service.change_balance(db, user_id, -total, User.saldo >= total)
+    if charged is None:
+        db.rollback()
+        saldo = db.scalar(select(User.saldo).where(User.id == user_id))
+        if saldo is None:
+            raise HTTPException(status_code=404, detail="Perfil de usuario nao encontrado.")
+        raise HTTPException(status_code=400, detail=f"Saldo insuficiente. Faltam R$ {to_reais(total - saldo):.2f}.")
+
+    order = Order(usuario_id=user_id, total=total, created_at=now)
     db.add(order)
     db.flush()
 
-    for product in valid_products:
-        db.add(OrderItem(order_id=order.id, product_id=product.id))
-
-    db.commit()
-
-    reloaded_order = db.scalar(
-        select(Order)
-        .where(Order.id == order.id)
-        .options(
-            selectinload(Order.user),
-            selectinload(Order.items).selectinload(OrderItem.product),
+    items = [
+        OrderItem(
+            order_id=order.id,
+            product_id=product_id,
+            nome=products_lookup[product_id].nome,
+            preco=products_lookup[product_id].preco,
+            quantidade=quantity,
+        )
+        for product_id, quantity in quantities.items()
+    ]
+    db.add_all(items)
+    balance_service.record(db, user_id, "purchase", -total, charged.saldo, order_id=order.id)
+    if idempotency_key:
+        db.add(
+            IdempotencyKey(
+                account_id=account.id,
+                key=idempotency_key,
+                request_hash=request_hash,
+                order_id=order.id,
+                expires_at=now + timedelta(seconds=settings.idempotency_key_ttl_seconds),
+            )
         )
-    )
-    if not reloaded_order:
-        raise HTTPException(status_code=500, detail="Falha ao carregar pedido criado.")
-
-    return order_payload(reloaded_order)
-
 
-def list_user_orders(db: Session, account: Account) -> list[dict]:
+    summary_service.apply_delta(db, pedidos=1, faturamento=total, saldo_total=-total)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request with the same key committed first; this one rolled back
+        # its charge and answers with the stored order instead.
+        db.rollback()
+        replay = _replay_checkout(db, account, idempotency_key, request_hash) if idempotency_key else None
+        if replay is None:
+            raise
+        return replay
+    identity_cache.invalidate_user(user_id)
+    return _order_response(order, charged.nome, items)
+
+
+def list_user_orders(db: Session, account: Account) -> list[PedidoResponse]:
     user = _get_user_for_account(db, account)
-    orders = db.scalars(
-        select(Order)
-        .where(Order.usuario_id == user.id)
-        .order_by(Order.id.desc())
-        .options(
-            selectinload(Order.user),
-            selectinload(Order.items).selectinload(OrderItem.product),
-        )
-    ).all()
-    return [order_payload(item) for item in orders]
+    orders = db.execute(order_rows_query().where(Order.usuario_id == user.id).order_by(Order.id.desc())).all()
+    return order_payloads(db, orders, Order.usuario_id == user.id)
 
 
-def list_user_orders_paginated(db: Session, account: Account, page: int, size: int) -> dict:
+def list_user_orders_paginated(
+    db: Session,
+    account: Account,
+    page: int,
+    size: int,
+    after: str | None = None,
+    before: str | None = None,
+    with_total: bool | None = None,
+) -> Page[PedidoResponse]:
     user = _get_user_for_account(db, account)
 
-    total = int(db.scalar(select(func.count(Order.id)).where(Order.usuario_id == user.id)) or 0)
-    offset = (page - 1) * size
-    orders = db.scalars(
-        select(Order)
-        .where(Order.usuario_id == user.id)
-        .order_by(Order.id.desc())
-        .offset(offset)
-        .limit(size)
-        .options(
-            selectinload(Order.user),
-            selectinload(Order.items).selectinload(OrderItem.product),
-        )
-    ).all()
-    pages = (total + size - 1) // size if total > 0 else 0
-    return {
-        "items": [order_payload(item) for item in orders],
-        "total": total,
-        "page": page,
-        "size": size,
-        "pages": pages,
-    }
+    data_query = order_rows_query().where(Order.usuario_id == user.id)
+    count_query = select(func.count(Order.id)).where(Order.usuario_id == user.id)
+    orders, meta = paginate(
+        db,
+        data_query,
+        count_query,
+        Order.id,
+        size=size,
+        page=page,
+        after=after,
+        before=before,
+        with_total=with_total,
+        descending=True,
+    )
+    items = order_payloads(db, orders, OrderItem.order_id.in_([order.id for order in orders]))
+    return Page(items, **meta)
 
 
-def list_all_orders(db: Session) -> list[dict]:
-    orders = db.scalars(
-        select(Order)
-        .order_by(Order.id.desc())
-        .options(
-            selectinload(Order.user),
-            selectinload(Order.items).selectinload(OrderItem.product),
-        )
-    ).all()
-    return [order_payload(item) for item in orders]
+def list_all_orders(db: Session) -> list[PedidoResponse]:
+    orders = db.execute(order_rows_query().order_by(Order.id.desc())).all()
+    return order_payloads(db, orders)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import logging
+import random
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.money import to_reais
+from app.db.models import Order, Product, StoreSummary, User
+from app.db.session import SessionLocal
+
+logger = logging.getLogger("app.summary")
+
+SUMMARY_ID = 1
+# The summary is spread over this many `store_summary` rows and summed on read, so concurrent
+# checkouts/recharges lock different rows instead of all queueing on one. Reconciliation
+# writes the recount into row SUMMARY_ID and zeroes the others.
+SUMMARY_SHARDS = 16
+SUMMARY_FIELDS = ("usuarios", "produtos", "pedidos", "faturamento", "saldo_total")
+
+
+def _aggregates() -> dict:
+    return {
+        "usuarios": select(func.count(User.id)).scalar_subquery(),
+        "produtos": select(func.count(Product.id)).scalar_subquery(),
+        "pedidos": select(func.count(Order.id)).scalar_subquery(),
+        "faturamento": select(func.coalesce(func.sum(Order.total), 0)).scalar_subquery(),
+        "saldo_total": select(func.coalesce(func.sum(User.saldo), 0)).scalar_subquery(),
+    }
+
+
+def summary_payload(totals) -> dict:
+    return {
+        "usuarios": int(totals.usuarios),
+        "produtos": int(totals.produtos),
+        "pedidos": int(totals.pedidos),
+        "faturamento": to_reais(totals.faturamento),
+        "saldo_total": to_reais(totals.saldo_total),
+    }
+
+
+def _read_totals(db: Session) -> dict | None:
+    totals = db.execute(
+        select(
+            func.count(StoreSummary.id).label("shards"),
+            *(func.coalesce(func.sum(getattr(StoreSummary, field)), 0).label(field) for field in SUMMARY_FIELDS),
+        )
+    ).one()
+    if not totals.shards:
+        return None
+    return summary_payload(totals)
+
+
+def apply_delta(db: Session, **deltas: int) -> None:
+    # Relative UPDATE of one random shard inside the caller's transaction; call it right
+    # before commit so that row lock is held as briefly as possible.
+    values = {
+        field: getattr(StoreSummary, field) + delta
+        for field, delta in deltas.items()
+        if field in SUMMARY_FIELDS and delta
+    }
+    if not values:
+        return
+    shard = random.randint(1, SUMMARY_SHARDS)
+    result = db.execute(update(StoreSummary).where(StoreSummary.id == shard).values(**values))
+    if result.rowcount == 0 and shard != SUMMARY_ID:
+        # Shard rows are created by the migration and by reconciliation; until then use the first.
+        db.execute(update(StoreSummary).where(StoreSummary.id == SUMMARY_ID).values(**values))
+
+
+def reconcile_summary(db: Session) -> dict:
+    # Lock every shard first so concurrent deltas either land before the recount or
+    # apply on top of it; the recount itself is a single UPDATE ... SET col = (SELECT ...).
+    shard_ids = set(
+        db.scalars(select(StoreSummary.id).order_by(StoreSummary.id.asc()).with_for_update()).all()
+    )
+    before = _read_totals(db) if shard_ids else None
+    missing = [shard for shard in range(1, SUMMARY_SHARDS + 1) if shard not in shard_ids]
+    if missing:
+        db.add_all(StoreSummary(id=shard) for shard in missing)
+        db.flush()
+
+    db.execute(
+        update(StoreSummary)
+        .where(StoreSummary.id == SUMMARY_ID)
+        .values(**_aggregates(), reconciled_at=datetime.now(timezone.utc))
+    )
+    db.execute(
+        update(StoreSummary)
+        .where(StoreSummary.id != SUMMARY_ID)
+        .values(**{field: 0 for field in SUMMARY_FIELDS})
+    )
+    db.commit()
+
+    after = _read_totals(db)
+    if before is not None and before != after:
+        logger.warning("summary_drift_corrected", extra={"details": {"before": before, "after": after}})
+    return after
+
+
+def get_summary(db: Session) -> dict:
+    totals = _read_totals(db)
+    if totals is None:
+        return reconcile_summary(db)
+    return totals
+
+
+def run_reconciliation() -> None:
+    with SessionLocal() as db:
+        reconcile_summary(db)
@@ -0,0 +1,68 @@
+"""Authenticated throughput with and without the verified-token claims cache.
+
+Runs `/auth/me` against a throwaway SQLite database through the ASGI app.
+
+    python -m benchmarks.bench_auth [--requests 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="lojacontrol-bench-"))
+    os.environ["LOJACONTROL_DATABASE_URL"] = f"sqlite:///{(workdir / 'bench.db').as_posix()}"
+    os.environ["LOJACONTROL_LOG_FILE"] = str(workdir / "app.log")
+    os.environ["LOJACONTROL_SKIP_LEGACY_IMPORT"] = "1"
+    os.environ["LOJACONTROL_RATE_LIMIT_ENABLED"] = "0"
+
+    import logging
+
+    from fastapi.testclient import TestClient
+
+    from app.core.security import decode_access_token, decode_token, token_claims_cache
+    from app.main import app
+
+    logging.disable(logging.INFO)
+    with TestClient(app) as client:
+        login = client.post("/auth/login-admin", json={"email": "admin@lojacontrol.local", "password": "admin123"})
+        token = login.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        started_at = time.perf_counter()
+        for _ in range(args.requests * 10):
+            decode_token(token)
+        uncached_decode_us = (time.perf_counter() - started_at) / (args.requests * 10) * 1_000_000
+
+        decode_access_token(token)
+        started_at = time.perf_counter()
+        for _ in range(args.requests * 10):
+            decode_access_token(token)
+        cached_decode_us = (time.perf_counter() - started_at) / (args.requests * 10) * 1_000_000
+
+        results = {}
+        for label, maxsize in (("cache off", 0), ("cache on", token_claims_cache.maxsize or 4096)):
+            token_claims_cache.clear()
+            token_claims_cache.maxsize = maxsize
+            started_at = time.perf_counter()
+            for _ in range(args.requests):
+                client.get("/auth/me", headers=headers)
+            results[label] = args.requests / (time.perf_counter() - started_at)
+
+    print(f"jwt decode: {uncached_decode_us:7.1f} us uncached, {cached_decode_us:5.1f} us cached")
+    for label, throughput in results.items():
+        print(f"/auth/me {label:>9}: {throughput:8.0f} req/s")
+    print(f"cache stats: {token_claims_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
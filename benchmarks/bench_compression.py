@@ -0,0 +1,130 @@
+"""Bytes saved and CPU cost of response compression on realistic order lists.
+
+Builds `/admin/pedidos`-shaped payloads (the `order_payload` structure) and runs them
+through `CompressionMiddleware` for every available encoding, whole-body and streamed
+as NDJSON chunks.
+
+    python -m benchmarks.bench_compression [--orders 100 1000 10000] [--repeat 20] [--gzip-level 6]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+
+def build_orders(count: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    catalog = [
+        {
+            "id": index,
+            "nome": f"Produto {index} - linha {rng.choice(['basica', 'premium', 'pro'])}",
+            "preco": price,
+            "quantidade": 1,
+        }
+        for index, price in enumerate((rng.randint(500, 50000) / 100 for _ in range(60)), start=1)
+    ]
+    users = [(index, f"Cliente Numero {index} da Silva") for index in range(1, 201)]
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    orders = []
+    for order_id in range(count, 0, -1):
+        usuario_id, usuario_nome = rng.choice(users)
+        produtos = rng.sample(catalog, rng.randint(1, 5))
+        orders.append(
+            {
+                "id": order_id,
+                "usuario_id": usuario_id,
+                "usuario_nome": usuario_nome,
+                "produtos_ids": [item["id"] for item in produtos],
+                "produtos": produtos,
+                "total": round(sum(item["preco"] for item in produtos), 2),
+                "created_at": (started + timedelta(minutes=order_id)).strftime("%Y-%m-%d %H:%M:%S"),
+            }
+        )
+    return orders
+
+
+def _asgi_app(chunks: list[bytes], content_type: bytes):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", content_type)]})
+        for index, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+
+    return app
+
+
+async def _run(middleware, encoding: str) -> int:
+    sent = 0
+
+    async def send(message):
+        nonlocal sent
+        if message["type"] == "http.response.body":
+            sent += len(message.get("body", b""))
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", encoding.encode())]}
+    await middleware(scope, None, send)
+    return sent
+
+
+def measure(
+    chunks: list[bytes],
+    content_type: bytes,
+    encoding: str,
+    repeat: int,
+    gzip_level: int,
+) -> tuple[int, float]:
+    from app.core.middleware import CompressionMiddleware
+
+    middleware = CompressionMiddleware(_asgi_app(chunks, content_type), minimum_size=1024, gzip_level=gzip_level)
+    loop = asyncio.new_event_loop()
+    try:
+        size = loop.run_until_complete(_run(middleware, encoding))
+        started_at = time.perf_counter()
+        for _ in range(repeat):
+            loop.run_until_complete(_run(middleware, encoding))
+        elapsed_ms = (time.perf_counter() - started_at) / repeat * 1000
+    finally:
+        loop.close()
+    return size, elapsed_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--gzip-level", type=int, default=6)
+    args = parser.parse_args()
+
+    from app.core.compression import available_encodings
+
+    encodings = ("identity", *available_encodings())
+    print(f"encodings: {', '.join(encodings)}")
+    print(f"{'orders':>7} {'mode':>7} {'encoding':>9} {'bytes':>11} {'ratio':>6} {'ms/resp':>8} {'MB/s':>7}")
+    for count in args.orders:
+        orders = build_orders(count)
+        whole = [json.dumps(orders, ensure_ascii=False, separators=(",", ":")).encode()]
+        lines = [json.dumps(item, ensure_ascii=False, separators=(",", ":")) for item in orders]
+        streamed = [("\n".join(lines[i : i + 200]) + "\n").encode() for i in range(0, len(lines), 200)]
+
+        for mode, chunks, content_type in (
+            ("json", whole, b"application/json"),
+            ("ndjson", streamed, b"application/x-ndjson"),
+        ):
+            raw_size = sum(len(chunk) for chunk in chunks)
+            repeat = max(1, args.repeat * 1000 // max(count, 1000))
+            for encoding in encodings:
+                size, elapsed_ms = measure(chunks, content_type, encoding, repeat, args.gzip_level)
+                throughput = raw_size / 1_000_000 / (elapsed_ms / 1000) if elapsed_ms else 0.0
+                print(
+                    f"{count:>7} {mode:>7} {encoding:>9} {size:>11,} {raw_size / size:>6.1f} "
+                    f"{elapsed_ms:>8.2f} {throughput:>7.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
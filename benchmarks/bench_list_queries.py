@@ -0,0 +1,175 @@
+"""Rows per second and memory per request of the order and user listings.
+
+Seeds a throwaway SQLite database (100k orders by default) and compares the previous
+ORM listings (full entities plus selectin-loaded `Order.user` / `Order.items.product`)
+with the current column-projected queries, calling the services directly.
+
+    python -m benchmarks.bench_list_queries [--orders 100000] [--page-size 50] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+def seed(orders: int, users: int = 2000, products: int = 300) -> None:
+    from sqlalchemy import insert
+
+    from app.db.base import Base
+    from app.db.models import Order, OrderItem, Product, User
+    from app.db.session import engine
+
+    rng = random.Random(7)
+    Base.metadata.create_all(bind=engine)
+    started = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(User),
+            [
+                {"id": index, "nome": f"Cliente {index}", "email": f"cliente{index}@example.com", "saldo": 10_000}
+                for index in range(1, users + 1)
+            ],
+        )
+        prices = {index: rng.randint(500, 50000) for index in range(1, products + 1)}
+        connection.execute(
+            insert(Product),
+            [{"id": index, "nome": f"Produto {index}", "descricao": "", "preco": prices[index]} for index in prices],
+        )
+        item_id = 0
+        for first in range(1, orders + 1, 10_000):
+            order_rows, item_rows = [], []
+            for order_id in range(first, min(first + 10_000, orders + 1)):
+                product_ids = [rng.randint(1, products) for _ in range(rng.randint(1, 4))]
+                order_rows.append(
+                    {
+                        "id": order_id,
+                        "usuario_id": rng.randint(1, users),
+                        "total": sum(prices[item] for item in product_ids),
+                        "created_at": started + timedelta(minutes=order_id),
+                    }
+                )
+                for product_id in product_ids:
+                    item_id += 1
+                    item_rows.append(
+                        {
+                            "id": item_id,
+                            "order_id": order_id,
+                            "product_id": product_id,
+                            "nome": f"Produto {product_id}",
+                            "preco": prices[product_id],
+                        }
+                    )
+            connection.execute(insert(Order), order_rows)
+            connection.execute(insert(OrderItem), item_rows)
+
+
+def legacy_list_orders(db):
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+
+    from app.db.models import Order, OrderItem
+    from app.services.shop_service import order_payload
+
+    orders = db.scalars(
+        select(Order)
+        .order_by(Order.id.desc())
+        .options(selectinload(Order.user), selectinload(Order.items).selectinload(OrderItem.product))
+    ).all()
+    return [order_payload(item) for item in orders]
+
+
+def legacy_orders_page(db, size: int):
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+
+    from app.db.models import Order, OrderItem
+    from app.services.shop_service import order_payload
+
+    orders = db.scalars(
+        select(Order)
+        .order_by(Order.id.desc())
+        .limit(size)
+        .options(selectinload(Order.user), selectinload(Order.items).selectinload(OrderItem.product))
+    ).all()
+    return [order_payload(item) for item in orders]
+
+
+def projected_orders_page(db, size: int):
+    from app.services.admin_service import list_orders_paginated
+
+    # Without the total, like the ORM variant above.
+    return list_orders_paginated(db, page=1, size=size, with_total=False).items
+
+
+def legacy_list_users(db):
+    from sqlalchemy import select
+
+    from app.db.models import User
+    from app.services.admin_service import user_payload
+
+    return [user_payload(item) for item in db.scalars(select(User).order_by(User.id.asc())).all()]
+
+
+def measure(label: str, fn, repeat: int) -> None:
+    from app.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        rows = len(fn(db))
+
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        with SessionLocal() as db:
+            fn(db)
+    elapsed = (time.perf_counter() - started_at) / repeat
+
+    tracemalloc.start()
+    with SessionLocal() as db:
+        result = fn(db)
+        _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    print(f"{label:<34} {rows:>8,} {elapsed * 1000:>10.1f} {rows / elapsed:>12,.0f} {peak / 1024 / 1024:>9.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="lojacontrol-bench-"))
+    os.environ["LOJACONTROL_DATABASE_URL"] = f"sqlite:///{(workdir / 'bench.db').as_posix()}"
+    os.environ["LOJACONTROL_LOG_FILE"] = str(workdir / "app.log")
+    os.environ["LOJACONTROL_SKIP_LEGACY_IMPORT"] = "1"
+
+    from app.services import admin_service
+
+    seeded_at = time.perf_counter()
+    seed(args.orders)
+    print(f"seeded {args.orders:,} orders in {time.perf_counter() - seeded_at:.1f}s")
+
+    size = args.page_size
+    cases = (
+        ("orders, full list (ORM)", legacy_list_orders, 1),
+        ("orders, full list (projected)", admin_service.list_orders, 1),
+        (f"orders, page of {size} (ORM)", lambda db: legacy_orders_page(db, size), 50),
+        (f"orders, page of {size} (projected)", lambda db: projected_orders_page(db, size), 50),
+        ("users, full list (ORM)", legacy_list_users, 20),
+        ("users, full list (projected)", admin_service.list_users, 20),
+    )
+    print(f"{'case':<34} {'rows':>8} {'ms/req':>10} {'rows/s':>12} {'peak MiB':>9}")
+    for label, fn, repeat in cases:
+        measure(label, fn, max(1, repeat * args.repeat // 3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Per-request overhead of the middleware stack.
+
+Compares a bare ASGI endpoint, the previous BaseHTTPMiddleware stack and the
+current pure-ASGI pipeline, driving the apps directly (no HTTP client or server).
+
+    python -m benchmarks.bench_middleware [--requests 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from app.core.middleware import AuthContextMiddleware, RateLimitMiddleware, RequestLoggingMiddleware
+
+
+async def endpoint(scope, receive, send) -> None:
+    await JSONResponse({"status": "ok"})(scope, receive, send)
+
+
+class LegacyAuthContextMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        request.state.request_id = uuid.uuid4().hex
+        request.state.auth_payload = None
+        return await call_next(request)
+
+
+class LegacyRequestLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        started_at = time.perf_counter()
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = getattr(request.state, "request_id", "")
+        logging.getLogger("app.middleware").info(
+            "http_request", extra={"duration_ms": round((time.perf_counter() - started_at) * 1000, 2)}
+        )
+        return response
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = "1000000"
+        return response
+
+
+def legacy_stack():
+    app = LegacyAuthContextMiddleware(endpoint)
+    app = LegacyRequestLoggingMiddleware(app)
+    return LegacyRateLimitMiddleware(app)
+
+
+def pure_asgi_stack():
+    app = RateLimitMiddleware(endpoint, requests_limit=10_000_000, window_seconds=60)
+    app = AuthContextMiddleware(app)
+    return RequestLoggingMiddleware(app)
+
+
+def _scope() -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/health",
+        "raw_path": b"/health",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+
+async def _run(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_message):
+        return None
+
+    started_at = time.perf_counter()
+    for _ in range(requests):
+        await app(_scope(), receive, send)
+    return (time.perf_counter() - started_at) / requests * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+    logging.getLogger("app.middleware").disabled = True
+
+    async def scenario() -> dict[str, float]:
+        results = {}
+        for name, app in (("bare", endpoint), ("legacy", legacy_stack()), ("pure_asgi", pure_asgi_stack())):
+            await _run(app, 500)
+            results[name] = await _run(app, args.requests)
+        return results
+
+    results = asyncio.run(scenario())
+    bare = results["bare"]
+    for name, per_request in results.items():
+        print(f"{name:>10}: {per_request:8.1f} us/request  (+{per_request - bare:7.1f} us middleware overhead)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Serialization cost of `/admin/pedidos` responses.
+
+Compares the stock FastAPI path (jsonable_encoder + stdlib JSONResponse) with the
+FastJSONResponse rendering and with the response_model path used by the API routers
+(TypeAdapter validation + pydantic-core JSON), on `order_payload`-shaped lists.
+
+    python -m benchmarks.bench_serialization [--orders 100 1000 10000] [--repeat 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core import responses
+from app.core.responses import FastJSONResponse
+from app.schemas.shop import PedidoResponse
+from benchmarks.bench_compression import build_orders
+
+ADAPTER = TypeAdapter(list[PedidoResponse])
+
+
+def stock(orders: list[dict]) -> bytes:
+    return JSONResponse(jsonable_encoder(orders)).body
+
+
+def encoder_only(orders: list[dict]) -> bytes:
+    return FastJSONResponse(jsonable_encoder(orders)).body
+
+
+def fast(orders: list[dict]) -> bytes:
+    return FastJSONResponse(orders).body
+
+
+def validated(orders: list[dict]) -> bytes:
+    return responses._serialize(ADAPTER, orders)
+
+
+def measure(render, orders: list[dict], repeat: int) -> float:
+    render(orders)
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        render(orders)
+    return (time.perf_counter() - started_at) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    encoder = "orjson" if responses.orjson is not None else "json (orjson not installed)"
+    print(f"fast encoder: {encoder}")
+    print(
+        f"{'orders':>7} {'bytes':>11} {'stock ms':>9} {'enc+fast ms':>12} {'fast ms':>8} "
+        f"{'model ms':>9} {'speedup':>8}"
+    )
+    for count in args.orders:
+        orders = build_orders(count)
+        body = stock(orders)
+        assert fast(orders) == body, "fast path must produce the same bytes"
+        assert json.loads(validated(orders)) == json.loads(body), "model path must produce the same document"
+        repeat = max(1, args.repeat * 1000 // max(count, 1000))
+        stock_ms = measure(stock, orders, repeat)
+        render_ms = measure(encoder_only, orders, repeat)
+        fast_ms = measure(fast, orders, repeat)
+        model_ms = measure(validated, orders, repeat)
+        print(
+            f"{count:>7} {len(body):>11,} {stock_ms:>9.2f} {render_ms:>12.2f} {fast_ms:>8.2f} "
+            f"{model_ms:>9.2f} {stock_ms / model_ms:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -109,6 +109,7 @@ const NAV_BY_ROLE = {
 
 let notificationTimeout = null;
 let pendingRequests = 0;
+let pendingCheckout = null;
 
 function setApiStatus(isOnline) {
     elements.apiChip.textContent = isOnline ? 'API conectada' : 'API offline';
@@ -279,16 +280,16 @@ async function refreshAccessToken() {
     return refreshPromise;
 }
 
-async function apiRequest({ endpoint, method = 'GET', body = null, auth = true }) {
+async function apiRequest({ endpoint, method = 'GET', body = null, auth = true, headers = {} }) {
     pendingRequests += 1;
     setLoading(true);
     try {
-        return await apiClient.request({ endpoint, method, body, auth });
+        return await apiClient.request({ endpoint, method, body, auth, headers });
     } catch (error) {
         if (auth && error?.status === 401) {
             const refreshed = await refreshAccessToken();
             if (refreshed) {
-                return apiClient.request({ endpoint, method, body, auth });
+                return apiClient.request({ endpoint, method, body, auth, headers });
             }
             handleUnauthorized();
         }
@@ -452,6 +453,18 @@ function renderAdminProductsList(products) {
     activateInteractiveCards(elements.adminProductList);
 }
 
+function createIdempotencyKey() {
+    if (window.crypto?.randomUUID) {
+        return window.crypto.randomUUID();
+    }
+    return `${Date.now().toString(16)}-${Math.random().toString(16).slice(2)}`;
+}
+
+function formatOrderItems(order) {
+    const items = (order.produtos || []).map((item) => (item.quantidade > 1 ? `${item.quantidade}x ${item.nome}` : item.nome));
+    return items.join(', ') || 'Sem itens';
+}
+
 function renderList(targetElement, entries, formatter) {
     targetElement.innerHTML = '';
 
@@ -499,7 +512,7 @@ async function loadAdminOrders() {
     try {
         const pedidos = await apiRequest({ endpoint: '/admin/pedidos' });
         renderList(elements.adminOrdersList, pedidos, (pedido) => {
-            const produtos = (pedido.produtos || []).map((item) => item.nome).join(', ') || 'Sem itens';
+            const produtos = formatOrderItems(pedido);
             return `
                 <strong>Pedido #${pedido.id}</strong><br>
                 Cliente: ${escapeHtml(pedido.usuario_nome)}<br>
@@ -628,7 +641,7 @@ async function loadUserOrders() {
     try {
         const orders = await apiRequest({ endpoint: '/shop/pedidos' });
         renderList(elements.userOrdersList, orders, (order) => {
-            const items = (order.produtos || []).map((item) => item.nome).join(', ') || 'Sem itens';
+            const items = formatOrderItems(order);
             return `
                 <strong>Pedido #${order.id}</strong><br>
                 Itens: ${escapeHtml(items)}<br>
@@ -665,17 +678,28 @@ async function checkoutCart() {
         }
     });
 
+    // Reused until the server answers, so retrying the same cart after a dropped connection cannot charge twice.
+    const cartSignature = produtosIds.join(',');
+    if (!pendingCheckout || pendingCheckout.cartSignature !== cartSignature) {
+        pendingCheckout = { key: createIdempotencyKey(), cartSignature };
+    }
+
     try {
         await apiRequest({
             endpoint: '/shop/pedidos',
             method: 'POST',
-            body: { produtos_ids: produtosIds }
+            body: { produtos_ids: produtosIds },
+            headers: { 'Idempotency-Key': pendingCheckout.key }
         });
+        pendingCheckout = null;
         state.cart = [];
         renderCart();
         showNotification('Compra finalizada com sucesso.', 'success');
         await Promise.all([loadUserProfile(), loadUserOrders()]);
     } catch (error) {
+        if (error?.status) {
+            pendingCheckout = null;
+        }
         showNotification(error.message || 'Nao foi possivel finalizar a compra.', 'error');
     }
 }
@@ -7,7 +7,7 @@ from fastapi.testclient import TestClient
 
 
 @pytest.fixture(scope="session")
-def client(tmp_path_factory):
+def test_environment(tmp_path_factory):
     db_dir = tmp_path_factory.mktemp("db")
     db_file = db_dir / "test_loja.db"
 
@@ -22,7 +22,11 @@ def client(tmp_path_factory):
     from app.core.config import get_settings
 
     get_settings.cache_clear()
+    return get_settings()
 
+
+@pytest.fixture(scope="session")
+def client(test_environment):
     from app.main import app
 
     with TestClient(app) as test_client:
@@ -43,3 +43,129 @@ def test_admin_product_crud_and_pagination(client):
 
     delete_response = client.delete(f"/admin/produtos/{product_id}", headers=headers)
     assert delete_response.status_code == 200
+
+
+def test_admin_products_cursor_pagination(client):
+    headers = _admin_headers(client)
+
+    created_ids = []
+    for index in range(5):
+        response = client.post(
+            "/admin/produtos",
+            headers=headers,
+            json={"nome": f"Cursor Item {index}", "descricao": "teste", "preco": 10 + index},
+        )
+        assert response.status_code == 200
+        created_ids.append(response.json()["id"])
+
+    first = client.get("/admin/produtos/paginated?size=2&search=cursor item&with_total=false", headers=headers)
+    assert first.status_code == 200
+    first_payload = first.json()
+    assert first_payload["total"] is None
+    assert first_payload["prev_cursor"] is None
+    assert [item["id"] for item in first_payload["items"]] == created_ids[:2]
+
+    second = client.get(
+        f"/admin/produtos/paginated?size=2&search=cursor item&after={first_payload['next_cursor']}&with_total=true",
+        headers=headers,
+    )
+    second_payload = second.json()
+    assert [item["id"] for item in second_payload["items"]] == created_ids[2:4]
+    assert second_payload["page"] is None
+    assert second_payload["total"] == 5
+
+    third = client.get(
+        f"/admin/produtos/paginated?size=2&search=cursor item&after={second_payload['next_cursor']}",
+        headers=headers,
+    )
+    third_payload = third.json()
+    assert [item["id"] for item in third_payload["items"]] == created_ids[4:]
+    assert third_payload["next_cursor"] is None
+
+    back = client.get(
+        f"/admin/produtos/paginated?size=2&search=cursor item&before={third_payload['prev_cursor']}",
+        headers=headers,
+    )
+    assert [item["id"] for item in back.json()["items"]] == created_ids[2:4]
+
+    invalid = client.get("/admin/produtos/paginated?after=nao-e-cursor", headers=headers)
+    assert invalid.status_code == 400
+
+    for product_id in created_ids:
+        assert client.delete(f"/admin/produtos/{product_id}", headers=headers).status_code == 200
+
+
+def test_admin_exports_stream_ndjson_and_csv(client):
+    import json
+
+    headers = _admin_headers(client)
+    product_id = client.post(
+        "/admin/produtos",
+        headers=headers,
+        json={"nome": "Export, Item", "descricao": "com virgula", "preco": 7.5},
+    ).json()["id"]
+
+    ndjson = client.get("/admin/produtos/export", headers=headers)
+    assert ndjson.status_code == 200
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert any(row["id"] == product_id and row["nome"] == "Export, Item" for row in rows)
+
+    csv_response = client.get("/admin/produtos/export?format=csv", headers=headers)
+    assert csv_response.status_code == 200
+    assert 'filename="produtos.csv"' in csv_response.headers["content-disposition"]
+    lines = csv_response.text.splitlines()
+    assert lines[0] == "id,nome,descricao,preco"
+    assert f'{product_id},"Export, Item",com virgula,7.5' in lines
+
+    for path in ("/admin/usuarios/export", "/admin/pedidos/export?format=csv"):
+        assert client.get(path, headers=headers).status_code == 200
+    assert client.get("/admin/pedidos/export?format=xml", headers=headers).status_code == 422
+
+    assert client.delete(f"/admin/produtos/{product_id}", headers=headers).status_code == 200
+
+
+def test_admin_summary_is_maintained_incrementally_and_reconciled(client):
+    from sqlalchemy import update
+
+    from app.db.models import StoreSummary
+    from app.db.session import SessionLocal
+    from app.services import summary_service
+
+    headers = _admin_headers(client)
+    before = client.get("/admin/resumo", headers=headers).json()
+
+    product_id = client.post(
+        "/admin/produtos",
+        headers=headers,
+        json={"nome": "Resumo Item", "descricao": "teste", "preco": 30.0},
+    ).json()["id"]
+    email = f"resumo-{product_id}@example.com"
+    client.post(
+        "/auth/register-user",
+        json={"nome": "Cliente Resumo", "email": email, "password": "senha123", "saldo_inicial": 50.0},
+    )
+    login = client.post("/auth/login-user", json={"email": email, "password": "senha123"})
+    user_headers = {"Authorization": f"Bearer {login.json()['token']}"}
+    client.post("/shop/recarga", headers=user_headers, json={"valor": 20.0})
+    assert client.post("/shop/pedidos", headers=user_headers, json={"produtos_ids": [product_id]}).status_code == 200
+
+    after = client.get("/admin/resumo", headers=headers).json()
+    assert after["usuarios"] == before["usuarios"] + 1
+    assert after["produtos"] == before["produtos"] + 1
+    assert after["pedidos"] == before["pedidos"] + 1
+    assert after["faturamento"] == round(before["faturamento"] + 30.0, 2)
+    assert after["saldo_total"] == round(before["saldo_total"] + 40.0, 2)
+
+    with SessionLocal() as db:
+        assert summary_service.reconcile_summary(db) == after
+        db.execute(
+            update(StoreSummary)
+            .where(StoreSummary.id == summary_service.SUMMARY_ID)
+            .values(pedidos=StoreSummary.pedidos + 7)
+        )
+        db.commit()
+    assert client.get("/admin/resumo", headers=headers).json()["pedidos"] == after["pedidos"] + 7
+
+    summary_service.run_reconciliation()
+    assert client.get("/admin/resumo", headers=headers).json() == after
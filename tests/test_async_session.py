@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+
+def test_async_database_url_uses_async_drivers(test_environment):
+    from app.db.session import to_async_database_url
+
+    assert to_async_database_url("sqlite:///./loja.db") == "sqlite+aiosqlite:///./loja.db"
+    assert to_async_database_url("postgresql://u:p@db/loja") == "postgresql+psycopg://u:p@db/loja"
+    assert to_async_database_url("postgresql+psycopg://u:p@db/loja") == "postgresql+psycopg://u:p@db/loja"
+
+
+def test_services_run_on_async_session(test_environment, tmp_path):
+    from app.db.base import Base
+    from app.db.session import run_db, to_async_database_url
+    from app.schemas.admin import ProdutoCreatePayload
+    from app.services import admin_service, shop_service
+
+    async def scenario() -> list[dict]:
+        engine = create_async_engine(to_async_database_url(f"sqlite:///{(tmp_path / 'async.db').as_posix()}"))
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+        async with session_factory() as db:
+            await run_db(
+                db,
+                admin_service.create_product,
+                ProdutoCreatePayload(nome="Headset", descricao="USB", preco=89.9),
+            )
+            products = await run_db(db, shop_service.list_products)
+
+        await engine.dispose()
+        return products
+
+    products = asyncio.run(scenario())
+    assert [item.nome for item in products] == ["Headset"]
+    assert products[0].preco == 89.9
@@ -64,3 +64,40 @@ def test_admin_can_login_and_create_product(client):
     data = create_response.json()
     assert data["nome"] == "Produto Admin"
     assert data["preco"] == 29.9
+
+
+def test_access_token_claims_are_cached_between_requests(client):
+    from app.core.security import token_claims_cache
+
+    login_response = client.post(
+        "/auth/login-admin",
+        json={"email": "admin@lojacontrol.local", "password": "admin123"},
+    )
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    hits_before = token_claims_cache.stats()["hits"]
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert token_claims_cache.stats()["hits"] > hits_before
+
+
+def test_account_payload_only_carries_profile_fields_for_users(client):
+    admin_login = client.post(
+        "/auth/login-admin",
+        json={"email": "admin@lojacontrol.local", "password": "admin123"},
+    )
+    admin_account = admin_login.json()["account"]
+    assert set(admin_account) == {"id", "nome", "email", "role"}
+
+    me = client.get("/auth/me", headers={"Authorization": f"Bearer {admin_login.json()['token']}"})
+    assert me.json() == {"account": admin_account}
+
+    email = _unique_email("perfil")
+    client.post(
+        "/auth/register-user",
+        json={"nome": "Cliente Perfil", "email": email, "password": "senha123", "saldo_inicial": 5},
+    )
+    user_login = client.post("/auth/login-user", json={"email": email, "password": "senha123"})
+    user_me = client.get("/auth/me", headers={"Authorization": f"Bearer {user_login.json()['token']}"}).json()
+    assert set(user_me["account"]) == {"id", "nome", "email", "role", "usuario_id", "saldo"}
+    assert user_me["account"]["saldo"] == 5
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _admin_headers(client) -> dict:
+    login = client.post("/auth/login-admin", json={"email": "admin@lojacontrol.local", "password": "admin123"})
+    return {"Authorization": f"Bearer {login.json()['token']}"}
+
+
+def _register_and_login(client, saldo: float) -> tuple[str, dict]:
+    email = f"ledger-{uuid.uuid4().hex[:8]}@example.com"
+    client.post(
+        "/auth/register-user",
+        json={"nome": "Cliente Ledger", "email": email, "password": "senha123", "saldo_inicial": saldo},
+    )
+    login = client.post("/auth/login-user", json={"email": email, "password": "senha123"})
+    return email, {"Authorization": f"Bearer {login.json()['token']}"}
+
+
+def test_every_balance_change_is_recorded_in_the_ledger(client):
+    from sqlalchemy import select, update
+
+    from app.db.models import Account, BalanceLedger, User
+    from app.db.session import SessionLocal
+    from app.services import balance_service
+
+    product = client.post(
+        "/admin/produtos",
+        headers=_admin_headers(client),
+        json={"nome": "Fone", "descricao": "", "preco": 12.0},
+    ).json()
+    email, headers = _register_and_login(client, 20.0)
+
+    assert client.post("/shop/recarga", headers=headers, json={"valor": 30.0}).json() == {"saldo": 50.0}
+    order = client.post("/shop/pedidos", headers=headers, json={"produtos_ids": [product["id"]]}).json()
+
+    with SessionLocal() as db:
+        user_id = db.scalar(select(Account.usuario_id).where(Account.email == email))
+        entries = db.execute(
+            select(BalanceLedger.kind, BalanceLedger.amount, BalanceLedger.balance_after, BalanceLedger.order_id)
+            .where(BalanceLedger.user_id == user_id)
+            .order_by(BalanceLedger.id.asc())
+        ).all()
+        assert [tuple(entry) for entry in entries] == [
+            ("adjustment", 2000, 2000, None),
+            ("recharge", 3000, 5000, None),
+            ("purchase", -1200, 3800, order["id"]),
+        ]
+        assert user_id not in {item["usuario_id"] for item in balance_service.find_mismatches(db)}
+
+        db.execute(update(User).where(User.id == user_id).values(saldo=100000))
+        db.commit()
+        try:
+            mismatch = {item["usuario_id"]: item for item in balance_service.find_mismatches(db)}[user_id]
+            assert mismatch == {"usuario_id": user_id, "saldo": 1000.0, "ledger": 38.0}
+        finally:
+            db.execute(update(User).where(User.id == user_id).values(saldo=3800))
+            db.commit()
+
+
+def test_concurrent_recharges_and_checkouts_keep_balance_and_ledger_in_sync(client):
+    from sqlalchemy import func, select
+
+    from app.db.models import Account, BalanceLedger, User
+    from app.db.session import SessionLocal
+    from app.services import shop_service
+
+    product = client.post(
+        "/admin/produtos",
+        headers=_admin_headers(client),
+        json={"nome": "Caneca", "descricao": "", "preco": 10.0},
+    ).json()
+    email, _ = _register_and_login(client, 20.0)
+    with SessionLocal() as db:
+        account = db.scalar(select(Account).where(Account.email == email))
+
+    workers = 24
+    barrier = threading.Barrier(workers)
+
+    def attempt(index: int):
+        barrier.wait()
+        with SessionLocal() as db:
+            try:
+                if index % 2:
+                    return shop_service.recharge_balance(db, account, 5.0)
+                return shop_service.checkout(db, account, [product["id"]])
+            except Exception as exc:  # insufficient balance is an expected outcome
+                return exc
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(attempt, range(workers)))
+
+    purchases = sum(1 for index, item in enumerate(results) if index % 2 == 0 and not isinstance(item, Exception))
+    assert not [item for index, item in enumerate(results) if index % 2 and isinstance(item, Exception)]
+
+    with SessionLocal() as db:
+        saldo = db.scalar(select(User.saldo).where(User.id == account.usuario_id))
+        ledger_total = db.scalar(
+            select(func.sum(BalanceLedger.amount)).where(BalanceLedger.user_id == account.usuario_id)
+        )
+    assert saldo == 2000 + 12 * 500 - purchases * 1000
+    assert saldo >= 0
+    assert ledger_total == saldo
+
+
+def test_registering_over_an_imported_user_adjusts_the_balance_through_the_ledger(client):
+    from sqlalchemy import select
+
+    from app.db.models import BalanceLedger, User
+    from app.db.session import SessionLocal
+    from app.services import balance_service
+
+    email = f"importado-{uuid.uuid4().hex[:8]}@example.com"
+    with SessionLocal() as db:
+        user = User(nome="Importado", email=email, saldo=500)
+        db.add(user)
+        db.flush()
+        balance_service.record(db, user.id, "adjustment", 500, 500)
+        db.commit()
+        user_id = user.id
+
+    registered = client.post(
+        "/auth/register-user",
+        json={"nome": "Importado Novo", "email": email, "password": "senha123", "saldo_inicial": 2.0},
+    )
+    assert registered.status_code == 200
+    assert registered.json()["account"]["saldo"] == 2.0
+
+    with SessionLocal() as db:
+        assert db.get(User, user_id).saldo == 200
+        entries = db.execute(
+            select(BalanceLedger.kind, BalanceLedger.amount, BalanceLedger.balance_after)
+            .where(BalanceLedger.user_id == user_id)
+            .order_by(BalanceLedger.id.asc())
+        ).all()
+        assert [tuple(entry) for entry in entries] == [("adjustment", 500, 500), ("adjustment", -300, 200)]
+        assert user_id not in {item["usuario_id"] for item in balance_service.find_mismatches(db)}
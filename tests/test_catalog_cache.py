@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+
+
+@contextmanager
+def _count_queries():
+    from sqlalchemy import event
+
+    from app.db.session import engine
+
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_catalog_is_served_from_cache_and_invalidated_by_admin_writes(client):
+    login = client.post(
+        "/auth/login-admin",
+        json={"email": "admin@lojacontrol.local", "password": "admin123"},
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    client.get("/shop/produtos")
+    with _count_queries() as statements:
+        cached = client.get("/shop/produtos")
+    assert cached.headers["x-cache"] == "HIT"
+    assert statements == []
+
+    product_id = client.post(
+        "/admin/produtos",
+        headers=headers,
+        json={"nome": "Cache Item", "descricao": "teste", "preco": 5.0},
+    ).json()["id"]
+    refreshed = client.get("/shop/produtos")
+    assert refreshed.headers["x-cache"] == "MISS"
+    assert any(item["id"] == product_id for item in refreshed.json())
+
+    client.patch(f"/admin/produtos/{product_id}", headers=headers, json={"preco": 6.0})
+    paginated = client.get("/shop/produtos/paginated?search=cache item").json()
+    assert [item["preco"] for item in paginated["items"]] == [6.0]
+    assert client.get("/shop/produtos/paginated?search=cache item").headers["x-cache"] == "HIT"
+
+    client.get("/site-config")
+    assert client.get("/site-config").headers["x-cache"] == "HIT"
+    config = client.get("/admin/site-config", headers=headers).json()
+    client.patch("/admin/site-config", headers=headers, json={**config, "tagline": "Nova tagline"})
+    site_config = client.get("/site-config")
+    assert site_config.headers["x-cache"] == "MISS"
+    assert site_config.json()["tagline"] == "Nova tagline"
+
+    assert client.delete(f"/admin/produtos/{product_id}", headers=headers).status_code == 200
+    assert all(item["id"] != product_id for item in client.get("/shop/produtos").json())
+
+
+def test_remote_version_change_invalidates_local_entries(test_environment):
+    from app.core.response_cache import CachedResponse, ResponseCache
+
+    cache = ResponseCache(max_bytes=64)
+    cache.sync_versions({"catalog": 3})
+    cache.set("catalog", cache.version("catalog"), "produtos", CachedResponse(b"[1]", '"a"'))
+    assert cache.get("catalog", "produtos").body == b"[1]"
+
+    cache.sync_versions({"catalog": 3})
+    assert cache.get("catalog", "produtos").body == b"[1]"
+
+    cache.sync_versions({"catalog": 4})
+    assert cache.get("catalog", "produtos") is None
+
+    stale_version = cache.version("catalog")
+    cache.invalidate("catalog")
+    cache.set("catalog", stale_version, "produtos", CachedResponse(b"[2]", '"b"'))
+    assert cache.get("catalog", "produtos") is None
+
+    for index in range(10):
+        cache.set("catalog", cache.version("catalog"), index, CachedResponse(b"x" * 20, '"c"'))
+    assert cache.stats()["bytes"] <= 64
+
+
+def test_admin_write_on_one_worker_invalidates_the_other_through_the_database(test_environment):
+    from app.core.response_cache import CachedResponse, ResponseCache
+    from app.db.session import SessionLocal
+    from app.services import catalog_cache
+
+    assert catalog_cache.cross_worker_enabled
+    worker_a = ResponseCache(max_bytes=1024)
+    worker_b = ResponseCache(max_bytes=1024)
+    for worker in (worker_a, worker_b):
+        catalog_cache.poll_versions(worker)
+        version = worker.version(catalog_cache.CATALOG)
+        worker.set(catalog_cache.CATALOG, version, "produtos", CachedResponse(b"[]", '"a"'))
+
+    # Worker A handles the admin write: local invalidation plus the shared version bump.
+    with SessionLocal() as db:
+        catalog_cache.mark_changed(db, catalog_cache.CATALOG)
+        db.commit()
+    worker_a.invalidate(catalog_cache.CATALOG)
+    assert worker_b.get(catalog_cache.CATALOG, "produtos") is not None
+
+    catalog_cache.poll_versions(worker_b)
+    assert worker_b.get(catalog_cache.CATALOG, "produtos") is None
+    assert worker_a.get(catalog_cache.CATALOG, "produtos") is None
+
+
+def test_entries_expire_after_the_ttl(test_environment):
+    import time
+
+    from app.core.response_cache import CachedResponse, ResponseCache
+
+    cache = ResponseCache(max_bytes=1024, ttl_seconds=0.05)
+    cache.set("catalog", 0, "produtos", CachedResponse(b"[1]", '"a"'))
+    assert cache.get("catalog", "produtos") is not None
+    time.sleep(0.06)
+    assert cache.get("catalog", "produtos") is None
+    assert cache.stats()["bytes"] == 0
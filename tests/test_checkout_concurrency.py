@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _create_product(client, preco: float) -> int:
+    admin_login = client.post("/auth/login-admin", json={"email": "admin@lojacontrol.local", "password": "admin123"})
+    response = client.post(
+        "/admin/produtos",
+        headers={"Authorization": f"Bearer {admin_login.json()['token']}"},
+        json={"nome": f"Produto {uuid.uuid4().hex[:6]}", "descricao": "", "preco": preco},
+    )
+    return response.json()["id"]
+
+
+def _register_user(client, saldo: float) -> str:
+    email = f"concorrente-{uuid.uuid4().hex[:8]}@example.com"
+    client.post(
+        "/auth/register-user",
+        json={"nome": "Cliente Concorrente", "email": email, "password": "senha123", "saldo_inicial": saldo},
+    )
+    return email
+
+
+def _run_concurrently(workers: int, call) -> list:
+    barrier = threading.Barrier(workers)
+
+    def attempt(_):
+        barrier.wait()
+        try:
+            return call()
+        except Exception as exc:  # collected and asserted by the caller
+            return exc
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(attempt, range(workers)))
+
+
+def test_concurrent_checkouts_never_overspend_or_lose_updates(client):
+    from fastapi import HTTPException
+    from sqlalchemy import func, select
+
+    from app.db.models import Account, Order, User
+    from app.db.session import SessionLocal
+    from app.services import shop_service
+
+    product_id = _create_product(client, 10.0)
+    email = _register_user(client, 55.0)
+    with SessionLocal() as db:
+        account = db.scalar(select(Account).where(Account.email == email))
+
+    def buy():
+        with SessionLocal() as db:
+            return shop_service.checkout(db, account, [product_id])
+
+    results = _run_concurrently(20, buy)
+
+    orders = [item for item in results if not isinstance(item, Exception)]
+    errors = [item for item in results if isinstance(item, Exception)]
+    assert len(orders) == 5
+    assert len({order.id for order in orders}) == 5
+    assert all(isinstance(error, HTTPException) and error.status_code == 400 for error in errors)
+
+    with SessionLocal() as db:
+        saldo = db.scalar(select(User.saldo).where(User.id == account.usuario_id))
+        stored = db.scalar(select(func.count(Order.id)).where(Order.usuario_id == account.usuario_id))
+    assert saldo == 500
+    assert stored == 5
+
+
+def test_concurrent_retries_with_the_same_idempotency_key_charge_once(client):
+    from sqlalchemy import func, select
+
+    from app.db.models import Account, Order, User
+    from app.db.session import SessionLocal
+    from app.services import shop_service
+
+    product_id = _create_product(client, 7.5)
+    email = _register_user(client, 100.0)
+    with SessionLocal() as db:
+        account = db.scalar(select(Account).where(Account.email == email))
+
+    def buy():
+        with SessionLocal() as db:
+            return shop_service.checkout(db, account, [product_id, product_id], idempotency_key="retry-1")
+
+    results = _run_concurrently(8, buy)
+
+    assert not [item for item in results if isinstance(item, Exception)]
+    assert len({order.id for order in results}) == 1
+    assert {order.total for order in results} == {15.0}
+    with SessionLocal() as db:
+        saldo = db.scalar(select(User.saldo).where(User.id == account.usuario_id))
+        stored = db.scalar(select(func.count(Order.id)).where(Order.usuario_id == account.usuario_id))
+    assert saldo == 8500
+    assert stored == 1
+
+
+def test_idempotency_key_replays_the_stored_order(client):
+    product_id = _create_product(client, 12.0)
+    email = _register_user(client, 50.0)
+    login_user = client.post("/auth/login-user", json={"email": email, "password": "senha123"})
+    headers = {"Authorization": f"Bearer {login_user.json()['token']}", "Idempotency-Key": "pedido-abc"}
+
+    first = client.post("/shop/pedidos", headers=headers, json={"produtos_ids": [product_id]})
+    retry = client.post("/shop/pedidos", headers=headers, json={"produtos_ids": [product_id]})
+    assert first.status_code == 200
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert client.get("/shop/me", headers=headers).json()["saldo"] == 38.0
+
+    reused = client.post("/shop/pedidos", headers=headers, json={"produtos_ids": [product_id, product_id]})
+    assert reused.status_code == 422
+
+    other_key = {**headers, "Idempotency-Key": "pedido-def"}
+    second = client.post("/shop/pedidos", headers=other_key, json={"produtos_ids": [product_id]})
+    assert second.status_code == 200
+    assert second.json()["id"] != first.json()["id"]
+    assert client.get("/shop/me", headers=headers).json()["saldo"] == 26.0
+
+    extra_id = _create_product(client, 5.0)
+    basket_key = {**headers, "Idempotency-Key": "pedido-ghi"}
+    basket = client.post("/shop/pedidos", headers=basket_key, json={"produtos_ids": [product_id, extra_id, extra_id]})
+    reordered = client.post(
+        "/shop/pedidos", headers=basket_key, json={"produtos_ids": [extra_id, product_id, extra_id]}
+    )
+    assert basket.status_code == 200
+    assert reordered.status_code == 200
+    assert reordered.json() == basket.json()
+    assert client.get("/shop/me", headers=headers).json()["saldo"] == 4.0
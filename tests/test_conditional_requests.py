@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+
+def test_catalog_and_site_config_answer_304_for_matching_etag(client):
+    for path in ("/shop/produtos", "/shop/produtos/paginated?page=1&size=5", "/site-config"):
+        first = client.get(path)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"] == "public, no-cache"
+
+        revalidated = client.get(path, headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+
+        assert client.get(path, headers={"If-None-Match": f'W/{etag}, "outro"'}).status_code == 304
+        assert client.get(path, headers={"If-None-Match": '"outro"'}).status_code == 200
+
+
+def test_frontend_assets_support_etag_and_last_modified(client):
+    first = client.get("/script.js")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    last_modified = first.headers["last-modified"]
+
+    assert client.get("/script.js", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/script.js", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/script.js", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}).status_code == 200
+    # If-None-Match takes precedence over If-Modified-Since.
+    mismatch = client.get("/script.js", headers={"If-None-Match": '"outro"', "If-Modified-Since": last_modified})
+    assert mismatch.status_code == 200
+    assert client.get("/", headers={"If-None-Match": client.get("/").headers["etag"]}).status_code == 304
+
+
+def test_frontend_assets_are_served_precompressed_with_hashed_urls(client):
+    import gzip
+    import re
+
+    index = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in index.headers
+    hashed_script = re.search(r'src="(/static/script\.[0-9a-f]+\.js)"', index.text).group(1)
+
+    plain = client.get("/script.js", headers={"Accept-Encoding": "identity"})
+    compressed = client.get(hashed_script, headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert "Accept-Encoding" in compressed.headers["vary"]
+    assert int(compressed.headers["content-length"]) < int(plain.headers["content-length"])
+    assert compressed.content == plain.content  # httpx decodes the gzip body
+    assert compressed.headers["etag"] != plain.headers["etag"]
+
+    assert client.get("/static/script.0000000000.js").status_code == 404
+
+
+def test_asset_store_reloads_changed_files(test_environment, tmp_path):
+    import os
+
+    from app.core.static_assets import AssetStore
+
+    (tmp_path / "index.html").write_text('<script src="app.js"></script>', encoding="utf-8")
+    (tmp_path / "app.js").write_text("console.log(1);", encoding="utf-8")
+    store = AssetStore(
+        tmp_path,
+        {"index.html": "text/html", "app.js": "application/javascript"},
+        entrypoint="index.html",
+        reload=True,
+    )
+
+    first_url = store.get("app.js").hashed_url
+    assert first_url.encode() in store.get("index.html").bodies["identity"]
+
+    (tmp_path / "app.js").write_text("console.log(22);", encoding="utf-8")
+    os.utime(tmp_path / "app.js", ns=(1, 10**18))
+    second_url = store.get("app.js").hashed_url
+    assert second_url != first_url
+    assert second_url.encode() in store.get("index.html").bodies["identity"]
+    assert store.get_hashed(first_url) is None
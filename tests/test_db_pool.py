@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import dataclasses
+
+import pytest
+
+
+def test_sqlite_connections_use_wal_and_busy_timeout(test_environment):
+    from app.db.session import engine
+
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == test_environment.sqlite_busy_timeout_ms
+
+
+def test_pool_checkout_wait_and_usage_are_exported(test_environment):
+    from app.db.session import POOL_CHECKOUT_WAIT_SECONDS, POOL_IN_USE, engine
+
+    def checkouts() -> float:
+        series = POOL_CHECKOUT_WAIT_SECONDS.samples().get(("primary",))
+        return sum(series[:-1]) if series else 0
+
+    before = checkouts()
+    with engine.connect():
+        assert POOL_IN_USE.samples()[("primary",)] >= 1
+    assert checkouts() == before + 1
+
+
+def test_postgres_engines_get_pool_sizing_pre_ping_and_statement_timeout(test_environment, monkeypatch):
+    from sqlalchemy.pool import QueuePool
+
+    from app.db import session
+
+    monkeypatch.setattr(
+        session,
+        "settings",
+        dataclasses.replace(session.settings, db_pool_size=20, db_statement_timeout_ms=15000),
+    )
+    options = session.engine_options("postgresql+psycopg://user:secret@db:5432/loja", "primary")
+
+    assert issubclass(options["poolclass"], QueuePool)
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == test_environment.db_max_overflow
+    assert options["pool_pre_ping"] is True
+    assert options["pool_recycle"] == test_environment.db_pool_recycle_seconds
+    assert options["connect_args"] == {"options": "-c statement_timeout=15000"}
+
+
+def test_pool_timeouts_are_counted(test_environment, tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+    from app.db import session
+
+    monkeypatch.setattr(
+        session,
+        "settings",
+        dataclasses.replace(session.settings, db_pool_size=1, db_max_overflow=0, db_pool_timeout_seconds=0.05),
+    )
+    database_url = f"sqlite:///{(tmp_path / 'pool.db').as_posix()}"
+    small_engine = create_engine(database_url, **session.engine_options(database_url, "pool_test"))
+    session.instrument_engine(small_engine, database_url, "pool_test")
+
+    try:
+        with small_engine.connect():
+            assert session.POOL_IN_USE.samples()[("pool_test",)] == 1
+            with pytest.raises(PoolTimeoutError):
+                small_engine.connect()
+        assert session.POOL_TIMEOUTS.samples()[("pool_test",)] == 1
+        assert session.POOL_IN_USE.samples()[("pool_test",)] == 0
+    finally:
+        small_engine.dispose()
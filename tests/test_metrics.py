@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+import time
+
+import pytest
+
+
+@pytest.fixture()
+def metrics_enabled(client, monkeypatch):
+    from app.api.routers import site
+
+    monkeypatch.setattr(site, "settings", dataclasses.replace(site.settings, metrics_enabled=True))
+    return site
+
+
+def test_metrics_endpoint_is_off_by_default_and_honors_the_token(client, monkeypatch):
+    from app.api.routers import site
+
+    assert site.settings.metrics_enabled is False
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(
+        site,
+        "settings",
+        dataclasses.replace(site.settings, metrics_enabled=True, metrics_token="scrape-token"),
+    )
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer outro"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+    assert response.status_code == 200
+    assert response.headers["X-RateLimit-Policy"] == "metrics"
+
+
+def test_production_requires_a_metrics_token_when_enabled(test_environment):
+    from app.core.config import validate_settings
+
+    production = dataclasses.replace(
+        test_environment,
+        environment="production",
+        jwt_secret_key="x" * 40,
+        admin_password="outra-senha-forte",
+        cors_origins=["https://loja.example.com"],
+        auto_create_schema=False,
+        metrics_enabled=True,
+        metrics_token="",
+    )
+    with pytest.raises(RuntimeError, match="METRICS_TOKEN"):
+        validate_settings(production)
+    validate_settings(dataclasses.replace(production, metrics_token="t" * 32))
+    validate_settings(dataclasses.replace(production, metrics_enabled=False))
+
+
+def test_metrics_endpoint_exposes_route_latency_and_runtime_gauges(client, metrics_enabled):
+    client.get("/shop/produtos/paginated?limit=5")
+    client.get("/shop/produtos/paginated?limit=5")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+
+    assert "# TYPE lojacontrol_http_request_duration_seconds histogram" in body
+    requests_line = next(
+        line
+        for line in body.splitlines()
+        if line.startswith('lojacontrol_http_requests_total{method="GET",route="/shop/produtos/paginated",status="200"}')
+    )
+    assert float(requests_line.rsplit(" ", 1)[1]) >= 2
+    assert 'lojacontrol_http_request_duration_seconds_bucket{method="GET",route="/shop/produtos/paginated",le="+Inf"}' in body
+    assert 'lojacontrol_http_request_duration_seconds_count{method="GET",route="/shop/produtos/paginated"}' in body
+    assert "lojacontrol_threadpool_size " in body
+    assert 'lojacontrol_db_pool_in_use{engine="primary"}' in body
+    assert 'lojacontrol_rate_limit_decisions_total{policy="catalog",result="allowed"}' in body
+
+
+def test_multiprocess_snapshots_are_merged_across_workers(tmp_path):
+    from app.core.metrics import MetricsRegistry, collect_snapshots, render
+
+    def worker_registry(requests: float, latency: float, in_progress: float) -> MetricsRegistry:
+        worker = MetricsRegistry()
+        worker.counter("jobs_total", "Jobs.", labelnames=("route",)).inc(requests, route="/a")
+        worker.histogram("job_seconds", "Job latency.", buckets=(0.1, 1.0)).observe(latency)
+        worker.gauge("jobs_in_progress", "Jobs running.").set(in_progress)
+        return worker
+
+    for pid, worker in ((101, worker_registry(2, 0.05, 1)), (102, worker_registry(3, 5.0, 4))):
+        path = tmp_path / f"metrics-{pid}.json"
+        path.write_text(json.dumps([metric.snapshot() for metric in worker.collect()]), encoding="utf-8")
+    stale_at = time.time() - 600
+    os.utime(tmp_path / "metrics-102.json", (stale_at, stale_at))
+
+    local = worker_registry(1, 0.5, 2)
+    body = render(collect_snapshots(str(tmp_path), stale_after_seconds=60, source=local))
+
+    assert 'jobs_total{route="/a"} 6.0' in body
+    assert 'job_seconds_bucket{le="0.1"} 1.0' in body
+    assert 'job_seconds_bucket{le="1.0"} 2.0' in body
+    assert 'job_seconds_bucket{le="+Inf"} 3.0' in body
+    assert "job_seconds_count 3.0" in body
+    # The stale worker's gauge is dropped; live ones are summed.
+    assert "jobs_in_progress 3.0" in body
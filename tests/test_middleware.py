@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+
+def test_pipeline_sets_request_id_and_rate_limit_headers(client):
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert len(response.headers["X-Request-ID"]) == 32
+    assert response.headers["X-RateLimit-Policy"] == "health"
+    assert response.headers["X-RateLimit-Limit"] == "10000"
+    assert "X-RateLimit-Remaining" in response.headers
+
+
+def test_error_responses_share_the_middleware_request_id(client):
+    response = client.get("/auth/me")
+    assert response.status_code == 401
+    assert response.json()["request_id"] == response.headers["X-Request-ID"]
+
+
+def test_large_json_responses_are_compressed_and_small_ones_are_not(client):
+    login = client.post(
+        "/auth/login-admin",
+        json={"email": "admin@lojacontrol.local", "password": "admin123"},
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    for index in range(20):
+        client.post(
+            "/admin/produtos",
+            headers=headers,
+            json={"nome": f"Compressao {index}", "descricao": "descricao repetida " * 4, "preco": 1.0},
+        )
+
+    compressed = client.get("/shop/produtos", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["vary"]
+    assert compressed.headers["etag"].startswith("W/")
+    assert int(compressed.headers["content-length"]) < len(compressed.content)
+    assert any(item["nome"] == "Compressao 0" for item in compressed.json())
+
+    revalidated = client.get(
+        "/shop/produtos",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+
+    identity = client.get("/shop/produtos", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.json() == compressed.json()
+
+    small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    streamed = client.get("/admin/produtos/export", headers={**headers, "Accept-Encoding": "gzip"})
+    assert streamed.headers["content-encoding"] == "gzip"
+    assert "content-length" not in streamed.headers
+    assert "Compressao 19" in streamed.text
+
+
+def test_compression_flushes_each_streamed_chunk(test_environment):
+    import asyncio
+    import zlib
+
+    from app.core.middleware import CompressionMiddleware
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/x-ndjson")]})
+        for index in range(3):
+            await send({"type": "http.response.body", "body": f'{{"row":{index}}}\n'.encode(), "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=1024)(scope, None, send))
+
+    decoder = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    first_chunk = decoder.decompress(messages[1]["body"])
+    assert first_chunk == b'{"row":0}\n'
+    rest = b"".join(decoder.decompress(message["body"]) for message in messages[2:])
+    assert rest == b'{"row":1}\n{"row":2}\n'
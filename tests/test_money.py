@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+
+def test_to_cents_is_exact_and_rounds_half_up(test_environment):
+    from decimal import Decimal
+
+    from app.core.money import to_cents, to_reais
+
+    assert to_cents(19.9) == 1990
+    assert to_cents(0.1 + 0.2) == 30
+    assert to_cents(1.005) == 101
+    assert to_cents(0.285) == 29
+    assert to_cents("12.345") == 1235
+    assert to_cents(Decimal("7.50")) == 750
+    assert to_cents(50) == 5000
+    assert to_reais(1990) == 19.9
+    assert sum(to_cents(0.1) for _ in range(10)) == 100
+
+
+def test_prices_and_balances_stay_exact_through_checkout(client):
+    import uuid
+
+    admin_login = client.post("/auth/login-admin", json={"email": "admin@lojacontrol.local", "password": "admin123"})
+    admin_headers = {"Authorization": f"Bearer {admin_login.json()['token']}"}
+    before = client.get("/admin/resumo", headers=admin_headers).json()
+    product_ids = [
+        client.post(
+            "/admin/produtos",
+            headers=admin_headers,
+            json={"nome": f"Centavos {preco}", "descricao": "", "preco": preco},
+        ).json()["id"]
+        for preco in (0.1, 0.2, 0.7)
+    ]
+
+    email = f"centavos-{uuid.uuid4().hex[:8]}@example.com"
+    client.post(
+        "/auth/register-user",
+        json={"nome": "Cliente Centavos", "email": email, "password": "senha123", "saldo_inicial": 0.3},
+    )
+    login = client.post("/auth/login-user", json={"email": email, "password": "senha123"})
+    headers = {"Authorization": f"Bearer {login.json()['token']}"}
+    assert client.post("/shop/recarga", headers=headers, json={"valor": 0.7}).json() == {"saldo": 1.0}
+
+    order = client.post("/shop/pedidos", headers=headers, json={"produtos_ids": product_ids})
+    assert order.status_code == 200
+    assert order.json()["total"] == 1.0
+    assert client.get("/shop/me", headers=headers).json()["saldo"] == 0.0
+
+    after = client.get("/admin/resumo", headers=admin_headers).json()
+    assert round(after["faturamento"] - before["faturamento"], 2) == 1.0
+
+
+def test_amounts_are_bounded_and_in_whole_cents(client):
+    import uuid
+
+    admin_login = client.post("/auth/login-admin", json={"email": "admin@lojacontrol.local", "password": "admin123"})
+    admin_headers = {"Authorization": f"Bearer {admin_login.json()['token']}"}
+    email = f"limites-{uuid.uuid4().hex[:8]}@example.com"
+    client.post(
+        "/auth/register-user",
+        json={"nome": "Cliente Limites", "email": email, "password": "senha123", "saldo_inicial": 1},
+    )
+    login = client.post("/auth/login-user", json={"email": email, "password": "senha123"})
+    headers = {"Authorization": f"Bearer {login.json()['token']}"}
+
+    for valor in (1e30, 0.004, 0.005, 10.005, 0, -5):
+        assert client.post("/shop/recarga", headers=headers, json={"valor": valor}).status_code == 422
+    assert client.post("/shop/recarga", headers=headers, json={"valor": 10.01}).json() == {"saldo": 11.01}
+
+    for preco in (1e30, 0.001, 19.995):
+        created = client.post(
+            "/admin/produtos",
+            headers=admin_headers,
+            json={"nome": "Produto Limite", "descricao": "", "preco": preco},
+        )
+        assert created.status_code == 422
+    for saldo_inicial in (1e30, 10.005):
+        registered = client.post(
+            "/auth/register-user",
+            json={
+                "nome": "Rico",
+                "email": f"rico-{uuid.uuid4().hex[:8]}@example.com",
+                "password": "senha123",
+                "saldo_inicial": saldo_inicial,
+            },
+        )
+        assert registered.status_code == 422
+    assert client.get("/shop/produtos/paginated?max_preco=1e30").status_code == 422
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+
+def test_pool_rejects_work_beyond_the_admission_queue(test_environment):
+    from app.core.password_hashing import HASH_REJECTED, PasswordHashPool, PasswordHashPoolSaturated
+
+    pool = PasswordHashPool(workers=1, max_pending=2)
+    release = threading.Event()
+
+    def slow_hash(value: str) -> str:
+        release.wait(timeout=5)
+        return value.upper()
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run(slow_hash, "a"))
+        second = asyncio.ensure_future(pool.run(slow_hash, "b"))
+        await asyncio.sleep(0.05)
+        assert pool.queue_depth == 1
+        assert pool.running == 1
+
+        with pytest.raises(PasswordHashPoolSaturated):
+            await pool.run(slow_hash, "c")
+
+        release.set()
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(scenario()) == ["A", "B"]
+    assert pool.pending == 0
+    assert HASH_REJECTED.samples()[()] >= 1
+    pool.executor.shutdown()
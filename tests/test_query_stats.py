@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+
+
+def test_requests_report_statement_count_and_db_time(client, caplog):
+    caplog.set_level(logging.INFO, logger="app.middleware")
+
+    response = client.get("/admin/resumo")
+    assert response.status_code == 401
+    assert response.headers["Server-Timing"] == 'db;dur=0.0;desc="0 queries"'
+
+    response = client.get("/health")
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=") and timing.endswith('desc="1 queries"')
+
+    record = next(
+        item
+        for item in caplog.records
+        if item.getMessage() == "http_request" and item.path == "/health"
+    )
+    assert record.request_id == response.headers["X-Request-ID"]
+    assert record.db_queries == 1
+    assert record.db_time_ms >= 0
+
+
+def test_slow_statements_are_logged_with_normalized_sql(client, caplog, monkeypatch):
+    from app.db import session
+
+    monkeypatch.setattr(session, "settings", dataclasses.replace(session.settings, slow_query_ms=0.000001))
+    caplog.set_level(logging.WARNING, logger="app.db.slow_query")
+
+    response = client.get("/shop/produtos/paginated?page=2&size=3")
+
+    slow = [item for item in caplog.records if item.getMessage() == "slow_query"]
+    assert slow
+    assert {item.request_id for item in slow} == {response.headers["X-Request-ID"]}
+    sql = " ".join(item.details["sql"] for item in slow)
+    assert "LIMIT ? OFFSET ?" in sql
+    assert "\n" not in sql
+
+
+def test_normalize_sql_collapses_literals_and_in_lists():
+    from app.core.query_stats import normalize_sql
+
+    assert (
+        normalize_sql("SELECT t1.id\n  FROM t1 WHERE t1.id IN (?, ?, ?) AND t1.nome = 'a''b' LIMIT 10")
+        == "SELECT t1.id FROM t1 WHERE t1.id IN (?...) AND t1.nome = ? LIMIT ?"
+    )
+    assert normalize_sql("SELECT x::text FROM t WHERE id = %(id_1)s") == "SELECT x::text FROM t WHERE id = ?"
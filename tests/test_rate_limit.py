@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+
+@pytest.fixture()
+def backends(test_environment, tmp_path):
+    from app.core.rate_limit import DatabaseRateLimitBackend, InMemoryRateLimitBackend
+    from app.db.base import Base
+
+    engine = create_engine(f"sqlite:///{(tmp_path / 'limits.db').as_posix()}")
+    Base.metadata.create_all(bind=engine)
+    yield [InMemoryRateLimitBackend(), DatabaseRateLimitBackend(engine)]
+    engine.dispose()
+
+
+def test_sliding_window_blocks_and_weights_previous_window(backends):
+    for backend in backends:
+        for offset in range(3):
+            assert backend.hit("ip:1", limit=3, window_seconds=60, now=1000 * 60 + offset).allowed
+
+        blocked = backend.hit("ip:1", limit=3, window_seconds=60, now=1000 * 60 + 10)
+        assert not blocked.allowed
+        assert blocked.retry_after == 50
+
+        # Halfway into the next window the previous three hits still weigh 1.5.
+        assert backend.hit("ip:1", limit=3, window_seconds=60, now=1001 * 60 + 30).allowed
+        assert not backend.hit("ip:1", limit=3, window_seconds=60, now=1001 * 60 + 30).allowed
+
+
+def test_cost_is_charged_against_the_limit(backends):
+    for backend in backends:
+        result = backend.hit("ip:2", limit=10, window_seconds=60, cost=4, now=60.0)
+        assert result.allowed and result.remaining == 6
+        assert not backend.hit("ip:2", limit=10, window_seconds=60, cost=7, now=61.0).allowed
+
+
+def test_idle_keys_are_evicted(backends):
+    from app.db.models import RateLimitCounter
+
+    memory, database = backends
+    memory.hit("ip:idle", limit=5, window_seconds=60, now=60.0)
+    memory.hit("ip:other", limit=5, window_seconds=60, now=60.0 * 10)
+    assert list(memory.counters) == ["ip:other"]
+
+    database.hit("ip:idle", limit=5, window_seconds=60, now=60.0)
+    database.hit("ip:other", limit=5, window_seconds=60, now=60.0 * 10)
+    with database.engine.connect() as conn:
+        keys = conn.scalars(select(RateLimitCounter.key)).all()
+        assert keys == ["ip:other"]
+        assert conn.scalar(select(func.count()).select_from(RateLimitCounter)) == 1
+
+
+def test_policies_key_by_identity_and_weight_cost(test_environment):
+    from starlette.responses import PlainTextResponse
+    from starlette.testclient import TestClient
+
+    from app.core.middleware import RateLimitMiddleware
+    from app.core.rate_limit import RateLimitPolicy
+
+    async def endpoint(scope, receive, send):
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    limited = RateLimitMiddleware(
+        endpoint,
+        requests_limit=10,
+        window_seconds=60,
+        policies=(
+            RateLimitPolicy("dump", "/admin/pedidos", exact=True, cost=5, key_by="identity"),
+            RateLimitPolicy("default", "/", limit_factor=10),
+        ),
+    )
+
+    async def app(scope, receive, send):
+        subject = dict(scope["headers"]).get(b"x-sub")
+        scope.setdefault("state", {})["auth_payload"] = {"sub": subject.decode()} if subject else None
+        await limited(scope, receive, send)
+
+    client = TestClient(app)
+    assert client.get("/admin/pedidos", headers={"x-sub": "1"}).headers["X-RateLimit-Remaining"] == "5"
+    assert client.get("/admin/pedidos", headers={"x-sub": "1"}).status_code == 200
+    blocked = client.get("/admin/pedidos", headers={"x-sub": "1"})
+    assert blocked.status_code == 429
+    assert blocked.headers["X-RateLimit-Policy"] == "dump"
+
+    assert client.get("/admin/pedidos", headers={"x-sub": "2"}).status_code == 200
+    cheap = client.get("/site-config")
+    assert cheap.status_code == 200
+    assert cheap.headers["X-RateLimit-Limit"] == "100"
+
+
+def test_oversized_forwarded_for_is_hashed_before_reaching_the_database(test_environment, tmp_path):
+    from starlette.responses import PlainTextResponse
+    from starlette.testclient import TestClient
+
+    from app.core.middleware import RateLimitMiddleware
+    from app.core.rate_limit import DatabaseRateLimitBackend
+    from app.db.base import Base
+    from app.db.models import RateLimitCounter
+
+    async def endpoint(scope, receive, send):
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    engine = create_engine(f"sqlite:///{(tmp_path / 'keys.db').as_posix()}")
+    Base.metadata.create_all(bind=engine)
+    try:
+        limited = RateLimitMiddleware(
+            endpoint,
+            requests_limit=10,
+            window_seconds=60,
+            backend=DatabaseRateLimitBackend(engine),
+        )
+        client = TestClient(limited)
+        assert client.get("/shop/produtos", headers={"X-Forwarded-For": "1" * 5000}).status_code == 200
+
+        with engine.connect() as conn:
+            keys = conn.scalars(select(RateLimitCounter.key)).all()
+        assert len(keys) == 1
+        assert len(keys[0]) <= RateLimitCounter.__table__.c.key.type.length
+    finally:
+        engine.dispose()
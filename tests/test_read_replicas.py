@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import dataclasses
+import time
+
+import pytest
+
+
+@pytest.fixture()
+def routed(test_environment, tmp_path, monkeypatch):
+    from sqlalchemy import create_engine, text
+
+    from app.db import session
+
+    engines = {}
+    for name in ("primary", "replica"):
+        engines[name] = create_engine(f"sqlite:///{(tmp_path / f'{name}.db').as_posix()}")
+        with engines[name].begin() as connection:
+            connection.execute(text("CREATE TABLE origem (nome TEXT)"))
+            connection.execute(text("INSERT INTO origem VALUES (:nome)"), {"nome": name})
+
+    monkeypatch.setattr(
+        session,
+        "settings",
+        dataclasses.replace(session.settings, database_replica_urls=["sqlite:///replica.db"]),
+    )
+    monkeypatch.setattr(session, "_all_clients_primary_until", 0.0)
+    try:
+        yield session, engines
+    finally:
+        for item in engines.values():
+            item.dispose()
+
+
+def _request(method: str, path: str, cookie: str | None = None):
+    from starlette.requests import Request
+
+    headers = [(b"cookie", cookie.encode("latin-1"))] if cookie else []
+    return Request({"type": "http", "method": method, "path": path, "headers": headers, "state": {}})
+
+
+def _origin(db) -> str:
+    from sqlalchemy import text
+
+    return db.execute(text("SELECT nome FROM origem")).scalar()
+
+
+def test_read_only_routes_use_a_replica_and_writes_stay_on_the_primary(routed):
+    from sqlalchemy import column, select, table, text, update
+
+    session, engines = routed
+
+    def new_session():
+        return session.RoutingSession(primary=engines["primary"], replicas=[engines["replica"]])
+
+    for method, path, expected in (
+        ("GET", "/shop/produtos/paginated", "replica"),
+        ("GET", "/admin/pedidos/paginated", "replica"),
+        ("HEAD", "/site-config", "replica"),
+        ("GET", "/admin/resumo", "primary"),
+        ("GET", "/shop/me", "primary"),
+    ):
+        with new_session() as db:
+            session.route_session(db, _request(method, path))
+            assert _origin(db) == expected, path
+
+    with new_session() as db:
+        session.route_session(db, _request("GET", "/admin/pedidos/paginated"))
+        assert db.get_bind(clause=update(table("origem", column("nome"))).values(nome="x")) is engines["primary"]
+        assert db.get_bind(clause=select(text("1")).with_for_update()) is engines["primary"]
+
+
+def test_a_write_keeps_the_same_client_on_the_primary_on_any_worker(routed):
+    from starlette.responses import PlainTextResponse
+    from starlette.testclient import TestClient
+
+    from app.core.middleware import ReadYourWritesMiddleware
+    from app.core.security import sign_write_marker
+
+    session, engines = routed
+
+    def routed_origin(request) -> str:
+        with session.RoutingSession(primary=engines["primary"], replicas=[engines["replica"]]) as db:
+            session.route_session(db, request)
+            return _origin(db)
+
+    async def endpoint(scope, receive, send):
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    client = TestClient(
+        ReadYourWritesMiddleware(endpoint, cookie_name=session.WRITE_MARKER_COOKIE, window_seconds=5)
+    )
+    assert "set-cookie" not in client.get("/admin/produtos/paginated").headers
+    written = client.post("/admin/produtos")
+    marker = written.cookies[session.WRITE_MARKER_COOKIE]
+    assert "HttpOnly" in written.headers["set-cookie"]
+
+    # The cookie comes back to whichever worker serves the next read.
+    cookie = f"{session.WRITE_MARKER_COOKIE}={marker}"
+    assert routed_origin(_request("GET", "/admin/produtos/paginated", cookie)) == "primary"
+    assert routed_origin(_request("GET", "/admin/produtos/paginated")) == "replica"
+
+    expired = f"{session.WRITE_MARKER_COOKIE}={sign_write_marker(int(time.time()) - 1)}"
+    forged = f"{session.WRITE_MARKER_COOKIE}={int(time.time()) + 60}.{'0' * 64}"
+    assert routed_origin(_request("GET", "/admin/produtos/paginated", expired)) == "replica"
+    assert routed_origin(_request("GET", "/admin/produtos/paginated", forged)) == "replica"
+
+    session.stick_to_primary()
+    assert routed_origin(_request("GET", "/shop/produtos")) == "primary"
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import pytest
+
+
+def test_fast_json_matches_the_stock_encoder(test_environment):
+    from datetime import date, datetime, timezone
+    from decimal import Decimal
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from app.core.responses import FastJSONResponse
+
+    payload = {
+        "nome": "Cafe com acao e pao",
+        "unicode": "coração",
+        "preco": 19.9,
+        "inteiro": 10.0,
+        "decimal": Decimal("12.50"),
+        "created_at": datetime(2026, 3, 1, 12, 30, 5),
+        "aware": datetime(2026, 3, 1, 12, 30, 5, 123456, tzinfo=timezone.utc),
+        "dia": date(2026, 3, 1),
+        "ids": (1, 2, 3),
+        1: "chave inteira",
+    }
+
+    assert FastJSONResponse(payload).body == JSONResponse(jsonable_encoder(payload)).body
+
+
+def test_api_routes_skip_jsonable_encoder(client, monkeypatch):
+    import fastapi.routing
+
+    login = client.post("/auth/login-admin", json={"email": "admin@lojacontrol.local", "password": "admin123"})
+    assert login.cookies
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    expected = client.get("/admin/pedidos", headers=headers).json()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("jsonable_encoder should not run for plain API routes")
+
+    monkeypatch.setattr(fastapi.routing, "jsonable_encoder", fail)
+    response = client.get("/admin/pedidos", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == expected
+
+
+def test_api_routes_validate_against_the_response_model(test_environment):
+    from fastapi import APIRouter, FastAPI
+    from fastapi.exceptions import ResponseValidationError
+    from fastapi.testclient import TestClient
+
+    from app.core.responses import FastJSONRoute
+    from app.schemas.shop import ProdutoResponse
+
+    router = APIRouter(route_class=FastJSONRoute)
+
+    @router.get("/extra", response_model=ProdutoResponse)
+    async def extra():
+        return {"id": 1, "nome": "Cafe", "descricao": "Coado", "preco": 10.5, "custo_interno": 4.2}
+
+    @router.get("/ill-typed", response_model=list[ProdutoResponse])
+    async def ill_typed():
+        return [ProdutoResponse(id="nao-e-id", nome="Cafe", descricao="Coado", preco=10.5)]
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    response = client.get("/extra")
+    assert response.status_code == 200
+    assert response.json() == {"id": 1, "nome": "Cafe", "descricao": "Coado", "preco": 10.5}
+    with pytest.raises(ResponseValidationError) as excinfo:
+        client.get("/ill-typed")
+    assert excinfo.value.errors()[0]["loc"] == ("response", 0, "id")
+
+
+def test_openapi_declares_the_response_structs(client):
+    schema = client.get("/openapi.json").json()
+    paths = schema["paths"]
+
+    def response_ref(path: str, method: str = "get") -> dict:
+        return paths[path][method]["responses"]["200"]["content"]["application/json"]["schema"]
+
+    assert response_ref("/admin/pedidos/paginated") == {"$ref": "#/components/schemas/Page_PedidoResponse_"}
+    assert response_ref("/shop/produtos")["items"] == {"$ref": "#/components/schemas/ProdutoResponse"}
+    assert response_ref("/auth/login-user", "post") == {"$ref": "#/components/schemas/SessaoResponse"}
+
+    components = schema["components"]["schemas"]
+    assert set(components["PedidoResponse"]["properties"]) == {
+        "id",
+        "usuario_id",
+        "usuario_nome",
+        "produtos_ids",
+        "produtos",
+        "total",
+        "created_at",
+    }
+    assert components["ContaResponse"]["required"] == ["id", "nome", "email", "role"]
+
+    site_config = client.get("/site-config").json()
+    assert set(site_config) == set(components["SiteConfigResponse"]["properties"])
@@ -53,3 +53,148 @@ def test_user_can_buy_product_and_balance_is_updated(client):
     assert profile_response.status_code == 200
     assert profile_response.json()["saldo"] == 80.0
 
+
+def test_cached_profile_reflects_recharge_immediately(client):
+    user_email = _unique_email("recarga")
+    client.post(
+        "/auth/register-user",
+        json={"nome": "Cliente Recarga", "email": user_email, "password": "senha123", "saldo_inicial": 10.0},
+    )
+    login_user = client.post("/auth/login-user", json={"email": user_email, "password": "senha123"})
+    headers = {"Authorization": f"Bearer {login_user.json()['token']}"}
+
+    assert client.get("/shop/me", headers=headers).json()["saldo"] == 10.0
+    assert client.get("/shop/me", headers=headers).json()["saldo"] == 10.0
+
+    recharge_response = client.post("/shop/recarga", headers=headers, json={"valor": 15.5})
+    assert recharge_response.status_code == 200
+    assert recharge_response.json()["saldo"] == 25.5
+    assert client.get("/shop/me", headers=headers).json()["saldo"] == 25.5
+    assert client.get("/auth/me", headers=headers).json()["account"]["saldo"] == 25.5
+
+
+def test_user_orders_cursor_pagination_is_newest_first(client):
+    admin_login = client.post(
+        "/auth/login-admin",
+        json={"email": "admin@lojacontrol.local", "password": "admin123"},
+    )
+    admin_headers = {"Authorization": f"Bearer {admin_login.json()['token']}"}
+    product_id = client.post(
+        "/admin/produtos",
+        headers=admin_headers,
+        json={"nome": "Caneta", "descricao": "Azul", "preco": 2.0},
+    ).json()["id"]
+
+    user_email = _unique_email("paginas")
+    client.post(
+        "/auth/register-user",
+        json={"nome": "Cliente Paginas", "email": user_email, "password": "senha123", "saldo_inicial": 50.0},
+    )
+    login_user = client.post("/auth/login-user", json={"email": user_email, "password": "senha123"})
+    headers = {"Authorization": f"Bearer {login_user.json()['token']}"}
+
+    order_ids = [
+        client.post("/shop/pedidos", headers=headers, json={"produtos_ids": [product_id]}).json()["id"]
+        for _ in range(3)
+    ]
+
+    first = client.get("/shop/pedidos/paginated?size=2", headers=headers).json()
+    assert first["total"] == 3
+    assert [item["id"] for item in first["items"]] == order_ids[::-1][:2]
+
+    second = client.get(f"/shop/pedidos/paginated?size=2&after={first['next_cursor']}", headers=headers).json()
+    assert [item["id"] for item in second["items"]] == order_ids[:1]
+    assert second["next_cursor"] is None
+    assert second["total"] is None
+
+    export = client.get("/shop/pedidos/export?format=csv", headers=headers)
+    assert export.status_code == 200
+    assert [line.split(",")[0] for line in export.text.splitlines()[1:]] == [str(item) for item in order_ids[::-1]]
+
+
+def test_projected_order_listings_match_orm_payloads(client, monkeypatch):
+    import json
+
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+
+    from app.db.models import Order, OrderItem
+    from app.db.session import SessionLocal
+    from app.services import admin_service, export_service, shop_service
+
+    admin_login = client.post(
+        "/auth/login-admin",
+        json={"email": "admin@lojacontrol.local", "password": "admin123"},
+    )
+    admin_headers = {"Authorization": f"Bearer {admin_login.json()['token']}"}
+    product_ids = [
+        client.post("/admin/produtos", headers=admin_headers, json={"nome": nome, "preco": preco}).json()["id"]
+        for nome, preco in (("Cabo", 9.9), ("Hub", 79.5))
+    ]
+    user_email = _unique_email("projecao")
+    client.post(
+        "/auth/register-user",
+        json={"nome": "Cliente Projecao", "email": user_email, "password": "senha123", "saldo_inicial": 500.0},
+    )
+    login_user = client.post("/auth/login-user", json={"email": user_email, "password": "senha123"})
+    user_headers = {"Authorization": f"Bearer {login_user.json()['token']}"}
+    cabo, hub = product_ids
+    for produtos_ids in ([cabo], [hub, cabo, cabo]):
+        response = client.post("/shop/pedidos", headers=user_headers, json={"produtos_ids": produtos_ids})
+        assert response.status_code == 200
+
+    with SessionLocal() as db:
+        orders = db.scalars(
+            select(Order)
+            .order_by(Order.id.desc())
+            .options(selectinload(Order.user), selectinload(Order.items).selectinload(OrderItem.product))
+        ).all()
+        expected = [shop_service.order_payload(order) for order in orders]
+        assert admin_service.list_orders(db) == expected
+        page = admin_service.list_orders_paginated(db, page=1, size=3)
+        assert page.items == expected[:3]
+
+    mine = client.get("/shop/pedidos", headers=user_headers).json()
+    assert [order["produtos_ids"] for order in mine] == [[hub, cabo, cabo], [cabo]]
+    assert mine[0]["total"] == 99.3
+
+    # Exports read the same columns in keyset batches; a batch of 1 crosses every boundary.
+    monkeypatch.setattr(export_service, "EXPORT_BATCH_SIZE", 1)
+    exported = client.get("/shop/pedidos/export", headers=user_headers)
+    assert [json.loads(line) for line in exported.text.splitlines()] == mine
+    exported_all = client.get("/admin/pedidos/export", headers=admin_headers)
+    assert [json.loads(line)["id"] for line in exported_all.text.splitlines()] == [order.id for order in expected]
+
+
+def test_order_lines_keep_the_price_paid_and_survive_product_removal(client):
+    admin_login = client.post(
+        "/auth/login-admin",
+        json={"email": "admin@lojacontrol.local", "password": "admin123"},
+    )
+    admin_headers = {"Authorization": f"Bearer {admin_login.json()['token']}"}
+    product_id = client.post(
+        "/admin/produtos", headers=admin_headers, json={"nome": "Mousepad", "preco": 25.0}
+    ).json()["id"]
+
+    user_email = _unique_email("snapshot")
+    client.post(
+        "/auth/register-user",
+        json={"nome": "Cliente Snapshot", "email": user_email, "password": "senha123", "saldo_inicial": 100.0},
+    )
+    login_user = client.post("/auth/login-user", json={"email": user_email, "password": "senha123"})
+    user_headers = {"Authorization": f"Bearer {login_user.json()['token']}"}
+
+    checkout = client.post("/shop/pedidos", headers=user_headers, json={"produtos_ids": [product_id, product_id]})
+    assert checkout.status_code == 200
+    assert checkout.json()["produtos"] == [{"id": product_id, "nome": "Mousepad", "preco": 25.0, "quantidade": 2}]
+    assert checkout.json()["produtos_ids"] == [product_id, product_id]
+
+    client.patch(f"/admin/produtos/{product_id}", headers=admin_headers, json={"nome": "Mousepad XL", "preco": 40.0})
+    order = client.get("/shop/pedidos", headers=user_headers).json()[0]
+    assert order["produtos"] == [{"id": product_id, "nome": "Mousepad", "preco": 25.0, "quantidade": 2}]
+    assert order["total"] == 50.0
+
+    assert client.delete(f"/admin/produtos/{product_id}", headers=admin_headers).status_code == 200
+    order = client.get("/shop/pedidos", headers=user_headers).json()[0]
+    assert order["produtos"] == [{"id": None, "nome": "Mousepad", "preco": 25.0, "quantidade": 2}]
+    assert order["produtos_ids"] == []